@@ -0,0 +1,41 @@
+from airport.filters import AirportFilter, RouteFilter
+from airport.models import Airport, Route
+from airport.permissions import IsAdminOrIfAuthenticatedReadOnly
+from airport.serializers import AirportSerializer, RouteListDetailSerializer
+from base.async_views import AsyncListView
+
+
+class AsyncAirportListView(AsyncListView):
+    """
+    Async list of airports, with the filters of `AirportViewSet`.
+
+    Attributes:
+        query_budgets (dict): The queries allowed per request,
+        including the user lookup of the authentication.
+    """
+
+    queryset = Airport.objects.all()
+    serializer_class = AirportSerializer
+    filterset_class = AirportFilter
+    permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    cache_namespace = "airport"
+    query_budgets = {"get": 3}
+
+
+class AsyncRouteListView(AsyncListView):
+    """
+    Async list of routes with their source and destination
+    airports, with the filters of `RouteViewSet`.
+
+    Attributes:
+        query_budgets (dict): The queries allowed per request,
+        including the user lookup of the authentication.
+    """
+
+    queryset = Route.objects.select_related("source", "destination")
+    serializer_class = RouteListDetailSerializer
+    filterset_class = RouteFilter
+    permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    cache_namespace = "route"
+    cache_depends_on = ("airport",)
+    query_budgets = {"get": 3}
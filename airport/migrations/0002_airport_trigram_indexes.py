@@ -0,0 +1,42 @@
+from django.db import migrations
+
+
+TRIGRAM_INDEXES = {
+    "airport_city_trgm_idx": "closest_big_city",
+    "airport_name_trgm_idx": "name",
+}
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """
+    Creates trigram indexes on the upper-cased airport name and
+    closest big city, which serve the `icontains` filters
+    (`UPPER(column::text) LIKE UPPER(%s)`) on PostgreSQL.
+    Other databases have no trigram support and are skipped.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, column in TRIGRAM_INDEXES.items():
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {name} ON airport_airport "
+            f"USING gin ((UPPER({column}::text)) gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name in TRIGRAM_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 
+from base.instrumentation import SerializerTimingMixin
 from airport.models import (
     Route,
     Crew,
@@ -9,7 +10,7 @@ from airport.models import (
 )
 
 
-class AirportSerializer(serializers.ModelSerializer):
+class AirportSerializer(SerializerTimingMixin, serializers.ModelSerializer):
     """
     Serializer for the Airport model.
 
@@ -28,7 +29,7 @@ class AirportSerializer(serializers.ModelSerializer):
         read_only_fields = ("id",)
 
 
-class RouteSerializer(serializers.ModelSerializer):
+class RouteSerializer(SerializerTimingMixin, serializers.ModelSerializer):
     """
     Serializer for the Route model.
 
@@ -67,7 +68,7 @@ class RouteListDetailSerializer(RouteSerializer):
     destination = AirportSerializer(read_only=True)
 
 
-class CrewSerializer(serializers.ModelSerializer):
+class CrewSerializer(SerializerTimingMixin, serializers.ModelSerializer):
     """
     Serializer for the Crew model.
 
@@ -87,7 +88,7 @@ class CrewSerializer(serializers.ModelSerializer):
         read_only_fields = ("id",)
 
 
-class AirplaneTypeSerializer(serializers.ModelSerializer):
+class AirplaneTypeSerializer(SerializerTimingMixin, serializers.ModelSerializer):
     """
     Serializer for the AirplaneType model.
 
@@ -105,7 +106,7 @@ class AirplaneTypeSerializer(serializers.ModelSerializer):
         read_only_fields = ("id",)
 
 
-class AirplaneSerializer(serializers.ModelSerializer):
+class AirplaneSerializer(SerializerTimingMixin, serializers.ModelSerializer):
     """
     Serializer for the Airplane model.
 
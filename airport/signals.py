@@ -1,7 +1,7 @@
 from django.dispatch import receiver
 from django.db.models.signals import post_save, post_delete
-from django.core.cache import cache
 
+from base.cache import invalidate_namespaces, register_cache_namespaces
 from airport.models import (
     Crew,
     Airport,
@@ -11,26 +11,32 @@ from airport.models import (
 )
 
 
+CACHE_NAMESPACES = {
+    Crew: "crew",
+    Airport: "airport",
+    Airplane: "airplane",
+    AirplaneType: "airplane_type",
+    Route: "route",
+}
+
+for model, namespace in CACHE_NAMESPACES.items():
+    register_cache_namespaces(model, namespace)
+
+
 @receiver([post_save, post_delete])
 def invalidate_cache(sender, instance, **kwargs):
     """
-    Invalidate specific cache patterns upon model changes.
+    Invalidate cached views of a namespace upon model changes.
 
     This function is triggered by `post_save` and `post_delete` signals for specific models.
-    It clears cache entries matching predefined patterns to ensure cache consistency
-    when data is modified.
+    It marks the model cache namespace as dirty; its version is bumped once the transaction
+    commits, which makes every cached view built from that namespace (or depending on it)
+    stale without scanning the keyspace.
 
     Args:
         sender (Model): The model class that sent the signal.
         instance (Model instance): The instance of the model that was saved or deleted.
         **kwargs: Additional keyword arguments provided by the signal.
     """
-    pattern_dict = {
-        Crew: "*crew_view*",
-        Airport: "*airport_view*",
-        Airplane: "*airplane_view*",
-        AirplaneType: "*airplane_type_view*",
-        Route: "*route_view*"
-    }
-    if sender in pattern_dict:
-        cache.delete_pattern(pattern_dict[sender])
+    if sender in CACHE_NAMESPACES:
+        invalidate_namespaces(CACHE_NAMESPACES[sender])
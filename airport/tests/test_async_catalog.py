@@ -0,0 +1,71 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.throttling import UserRateThrottle
+from rest_framework_simplejwt.tokens import AccessToken
+
+from airport.models import Airport, Route
+from airport.serializers import AirportSerializer, RouteListDetailSerializer
+from airport.tests.base_test_class import BaseApiTest
+
+
+ASYNC_AIRPORT_URL = reverse("airport:async-airports")
+ASYNC_ROUTE_URL = reverse("airport:async-routes")
+
+
+class AsyncCatalogTests(BaseApiTest):
+    """
+    Test suite for the async airport and route catalog endpoints.
+    """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com", password="test1234"
+        )
+        self.token = AccessToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.token}")
+        self.kyiv = Airport.objects.create(name="Boryspil", closest_big_city="Kyiv")
+        self.lviv = Airport.objects.create(name="Skniliv", closest_big_city="Lviv")
+        Route.objects.create(source=self.kyiv, destination=self.lviv, distance=450)
+
+    def test_airports_with_filters(self):
+        response = self.client.get(ASYNC_AIRPORT_URL, {"city": "lviv"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.json()["results"], AirportSerializer([self.lviv], many=True).data
+        )
+
+    def test_routes(self):
+        response = self.client.get(ASYNC_ROUTE_URL, {"source": "kyiv"})
+        self.assertEqual(
+            response.json()["results"],
+            RouteListDetailSerializer(Route.objects.all(), many=True).data,
+        )
+
+    def test_invalid_token(self):
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer invalid")
+        response = self.client.get(ASYNC_AIRPORT_URL)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @mock.patch.object(UserRateThrottle, "THROTTLE_RATES", {"user": "1/day"})
+    def test_throttled(self):
+        """
+        Test that the DRF throttles of the sync API apply.
+        """
+        self.client.get(ASYNC_AIRPORT_URL)
+        response = self.client.get(ASYNC_AIRPORT_URL)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn("Retry-After", response)
+
+    async def test_served_by_async_handler(self):
+        """
+        Test that the endpoint is served through the async handler
+        and its middleware chain.
+        """
+        response = await self.async_client.get(
+            ASYNC_AIRPORT_URL, headers={"Authorization": f"Bearer {self.token}"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["count"], 2)
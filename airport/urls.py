@@ -1,5 +1,7 @@
+from django.urls import path
 from rest_framework import routers
 
+from airport.async_views import AsyncAirportListView, AsyncRouteListView
 from airport.views import (
     AirportViewSet,
     AirplaneViewSet,
@@ -19,4 +21,7 @@ router.register("airplane-types", AirplaneTypeViewSet, basename="airplane-types"
 router.register("crew", CrewViewSet, basename="crews")
 router.register("routers", RouteViewSet, basename="routers")
 
-urlpatterns = router.urls
+urlpatterns = router.urls + [
+    path("async/airports/", AsyncAirportListView.as_view(), name="async-airports"),
+    path("async/routes/", AsyncRouteListView.as_view(), name="async-routes"),
+]
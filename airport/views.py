@@ -1,8 +1,9 @@
 from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
 from rest_framework import viewsets, mixins
 from django_filters import rest_framework as filters
 
+from base.cache import versioned_cache_page
+from base.db_routers import ReplicaReadMixin
 from airport.permissions import IsAdminOrIfAuthenticatedReadOnly
 from airport.serializers import (
     CrewSerializer,
@@ -29,6 +30,7 @@ from airport.filters import (
 
 
 class CrewViewSet(
+    ReplicaReadMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     viewsets.GenericViewSet,
@@ -49,6 +51,8 @@ class CrewViewSet(
         all Crew instances.
         permission_classes (tuple): A tuple of permission
         classes that determine the access control.
+        query_budgets (dict): The queries allowed per action,
+        including the user lookup of the authentication.
 
     Methods:
         dispatch: Decorates the dispatch method to cache
@@ -58,20 +62,21 @@ class CrewViewSet(
     serializer_class = CrewSerializer
     queryset = Crew.objects.all()
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    query_budgets = {"list": 3}
 
-    @method_decorator(cache_page(60 * 5, key_prefix="crew_view"))
+    @method_decorator(versioned_cache_page(60 * 5, "crew"))
     def dispatch(self, request, *args, **kwargs):
         """
         Method to dispatch the request, with caching applied
         for the crew view.
 
-        The response is cached for 5 minutes using the
-        key prefix 'crew_view'.
+        The response is cached for 5 minutes using
+        versioned keys of the 'crew' namespace.
         """
         return super().dispatch(request, *args, **kwargs)
 
 
-class AirportViewSet(viewsets.ModelViewSet):
+class AirportViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """
     ViewSet for handling the Airport model, allowing for
     CRUD operations on airports.
@@ -92,6 +97,8 @@ class AirportViewSet(viewsets.ModelViewSet):
         to filter airports by specific criteria.
         permission_classes (tuple): A tuple of permission
         classes that determine the access control.
+        query_budgets (dict): The queries allowed per action,
+        including the user lookup of the authentication.
 
     Methods:
         dispatch: Decorates the dispatch method to cache
@@ -103,20 +110,21 @@ class AirportViewSet(viewsets.ModelViewSet):
     filter_backends = (filters.DjangoFilterBackend,)
     filterset_class = AirportFilter
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    query_budgets = {"list": 3, "retrieve": 2}
 
-    @method_decorator(cache_page(60 * 5, key_prefix="airport_view"))
+    @method_decorator(versioned_cache_page(60 * 5, "airport"))
     def dispatch(self, request, *args, **kwargs):
         """
         Method to dispatch the request, with caching
         applied for the airport view.
 
         The response is cached for 5 minutes using
-        the key prefix 'airport_view'.
+        versioned keys of the 'airport' namespace.
         """
         return super().dispatch(request, *args, **kwargs)
 
 
-class AirplaneViewSet(viewsets.ModelViewSet):
+class AirplaneViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """
     ViewSet for handling the Airplane model, providing
     CRUD operations for airplanes.
@@ -135,6 +143,8 @@ class AirplaneViewSet(viewsets.ModelViewSet):
         to filter airplanes by specific criteria.
         permission_classes (tuple): A tuple of permission
         classes that determine the access control.
+        query_budgets (dict): The queries allowed per action,
+        including the user lookup of the authentication.
 
     Methods:
         get_serializer_class: Returns the appropriate serializer
@@ -147,6 +157,7 @@ class AirplaneViewSet(viewsets.ModelViewSet):
     filter_backends = (filters.DjangoFilterBackend,)
     filterset_class = AirplaneFilter
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    query_budgets = {"list": 3, "retrieve": 2}
 
     def get_serializer_class(self):
         """
@@ -161,19 +172,23 @@ class AirplaneViewSet(viewsets.ModelViewSet):
             return AirplaneListDetailSerializer
         return AirplaneSerializer
 
-    @method_decorator(cache_page(60 * 5, key_prefix="airplane_view"))
+    @method_decorator(
+        versioned_cache_page(
+            60 * 5, "airplane", depends_on=("airplane_type",)
+        )
+    )
     def dispatch(self, request, *args, **kwargs):
         """
         Method to dispatch the request, with caching
         applied for the airplane view.
 
         The response is cached for 5 minutes using
-        the key prefix 'airplane_view'.
+        versioned keys of the 'airplane' namespace.
         """
         return super().dispatch(request, *args, **kwargs)
 
 
-class AirplaneTypeViewSet(viewsets.ModelViewSet):
+class AirplaneTypeViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """
     ViewSet for handling the AirplaneType model,
     allowing CRUD operations for airplane types.
@@ -193,6 +208,8 @@ class AirplaneTypeViewSet(viewsets.ModelViewSet):
         used to filter airplane types by specific criteria.
         permission_classes (tuple): A tuple of permission
         classes that determine the access control.
+        query_budgets (dict): The queries allowed per action,
+        including the user lookup of the authentication.
 
     Methods:
         dispatch: Decorates the dispatch method to cache
@@ -204,20 +221,21 @@ class AirplaneTypeViewSet(viewsets.ModelViewSet):
     filter_backends = (filters.DjangoFilterBackend,)
     filterset_class = AirplaneTypeFilter
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    query_budgets = {"list": 3, "retrieve": 2}
 
-    @method_decorator(cache_page(60 * 5, key_prefix="airplane_type_view"))
+    @method_decorator(versioned_cache_page(60 * 5, "airplane_type"))
     def dispatch(self, request, *args, **kwargs):
         """
         Method to dispatch the request, with caching
         applied for the airplane type view.
 
         The response is cached for 5 minutes using
-        the key prefix 'airplane_type_view'.
+        versioned keys of the 'airplane_type' namespace.
         """
         return super().dispatch(request, *args, **kwargs)
 
 
-class RouteViewSet(viewsets.ModelViewSet):
+class RouteViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """
     ViewSet for handling the Route model, allowing
     CRUD operations for flight routes.
@@ -237,6 +255,8 @@ class RouteViewSet(viewsets.ModelViewSet):
         to filter routes by specific criteria.
         permission_classes (tuple): A tuple of permission
         classes that determine the access control.
+        query_budgets (dict): The queries allowed per action,
+        including the user lookup of the authentication.
 
     Methods:
         get_serializer_class: Returns the appropriate
@@ -252,6 +272,7 @@ class RouteViewSet(viewsets.ModelViewSet):
     filter_backends = (filters.DjangoFilterBackend,)
     filterset_class = RouteFilter
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    query_budgets = {"list": 3, "retrieve": 2}
 
     def get_serializer_class(self):
         """
@@ -265,13 +286,15 @@ class RouteViewSet(viewsets.ModelViewSet):
             return RouteListDetailSerializer
         return RouteSerializer
 
-    @method_decorator(cache_page(60 * 5, key_prefix="route_view"))
+    @method_decorator(
+        versioned_cache_page(60 * 5, "route", depends_on=("airport",))
+    )
     def dispatch(self, request, *args, **kwargs):
         """
         Method to dispatch the request, with caching
         applied for the route view.
 
         The response is cached for 5 minutes using
-        the key prefix 'route_view'.
+        versioned keys of the 'route' namespace.
         """
         return super().dispatch(request, *args, **kwargs)
@@ -60,6 +60,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "base.instrumentation.InstrumentationMiddleware",
+    "base.metrics.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "debug_toolbar.middleware.DebugToolbarMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -68,6 +70,8 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "base.query_budget.QueryBudgetMiddleware",
+    "base.db_routers.ReplicaPinningMiddleware",
 ]
 
 ROOT_URLCONF = "airport_service.urls"
@@ -111,8 +115,61 @@ else:
             "PASSWORD": os.environ.get("POSTGRES_PASSWORD", "cinema"),
             "HOST": os.environ.get("POSTGRES_HOST", "db"),
             "PORT": os.environ.get("POSTGRES_PORT", "5432"),
+            # Seconds a connection is reused across requests (0 closes
+            # it after each request), checked before reuse
+            "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", 60)),
+            "CONN_HEALTH_CHECKS": os.environ.get("DB_CONN_HEALTH_CHECKS", "1") == "1",
+            # pgbouncer in transaction mode cannot keep server-side
+            # cursors open across transactions
+            "DISABLE_SERVER_SIDE_CURSORS": (
+                os.environ.get("DB_PGBOUNCER_TRANSACTION_MODE", "0") == "1"
+            ),
+            "OPTIONS": {
+                "connect_timeout": int(os.environ.get("DB_CONNECT_TIMEOUT", 5)),
+            },
+        }
+    }
+
+    # Connection pool of psycopg 3 (`pip install "psycopg[binary,pool]"`),
+    # replacing persistent connections
+    if os.environ.get("DB_POOL", "0") == "1":
+        DATABASES["default"]["CONN_MAX_AGE"] = 0
+        DATABASES["default"]["OPTIONS"]["pool"] = {
+            "min_size": int(os.environ.get("DB_POOL_MIN_SIZE", 2)),
+            "max_size": int(os.environ.get("DB_POOL_MAX_SIZE", 10)),
+            "timeout": float(os.environ.get("DB_POOL_TIMEOUT", 10)),
         }
+
+    if DATABASES["default"]["DISABLE_SERVER_SIDE_CURSORS"]:
+        from django.db.backends.postgresql.psycopg_any import is_psycopg3
+
+        if is_psycopg3:
+            # Prepared statements do not survive a transaction either
+            DATABASES["default"]["OPTIONS"]["prepare_threshold"] = None
+
+# Read replicas of the primary (e.g. `DB_REPLICA_HOSTS=replica-1,replica-2`),
+# serving the safe requests of the views using `base.db_routers.ReplicaReadMixin`
+REPLICA_DATABASES = []
+for index, host in enumerate(
+    filter(None, map(str.strip, os.environ.get("DB_REPLICA_HOSTS", "").split(","))),
+    start=1,
+):
+    alias = f"replica_{index}"
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "OPTIONS": {**DATABASES["default"]["OPTIONS"]},
+        "TEST": {"MIRROR": "default"},
     }
+    REPLICA_DATABASES.append(alias)
+
+DATABASE_ROUTERS = ["base.db_routers.ReplicaRouter"]
+
+# Seconds of replication lag above which reads fall back to the primary
+REPLICA_MAX_LAG = float(os.environ.get("DB_REPLICA_MAX_LAG", 5))
+REPLICA_LAG_CHECK_INTERVAL = float(os.environ.get("DB_REPLICA_LAG_CHECK_INTERVAL", 5))
+# Seconds a user reads from the primary after writing
+REPLICA_PIN_SECONDS = int(os.environ.get("DB_REPLICA_PIN_SECONDS", 10))
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
@@ -131,7 +188,7 @@ REST_FRAMEWORK = {
 if os.environ.get("ENVIRONMENT") == "local":
     CACHES = {
         "default": {
-            "BACKEND": "django_redis.cache.RedisCache",
+            "BACKEND": "base.instrumentation.InstrumentedRedisCache",
             "LOCATION": "redis://127.0.0.1:6379/1",
             "OPTIONS": {
                 "CLIENT_CLASS": "django_redis.client.DefaultClient",
@@ -141,7 +198,7 @@ if os.environ.get("ENVIRONMENT") == "local":
 else:
     CACHES = {
         "default": {
-            "BACKEND": "django_redis.cache.RedisCache",
+            "BACKEND": "base.instrumentation.InstrumentedRedisCache",
             "LOCATION": "redis://redis:6379/1",
             "OPTIONS": {
                 "CLIENT_CLASS": "django_redis.client.DefaultClient",
@@ -157,6 +214,21 @@ SIMPLE_JWT = {
     "BLACKLIST_AFTER_ROTATION": True,
 }
 
+# Checks of the query budgets declared on views: off, warn or raise
+QUERY_BUDGET_MODE = os.environ.get("QUERY_BUDGET_MODE", "off")
+
+# Share of requests measured by the instrumentation middleware (0 to 1)
+INSTRUMENTATION_SAMPLE_RATE = float(os.environ.get("INSTRUMENTATION_SAMPLE_RATE", 0))
+
+# Prometheus metrics aggregated in Redis, scraped at /metrics/ with
+# `Authorization: Bearer <METRICS_TOKEN>` (not served without a token)
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") == "1"
+METRICS_FLUSH_INTERVAL = float(os.environ.get("METRICS_FLUSH_INTERVAL", 5))
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+
+# Seconds a seat hold reserves a seat before it expires
+SEAT_HOLD_TIMEOUT = int(os.environ.get("SEAT_HOLD_TIMEOUT", 60 * 10))
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "API-Airport",
     "DESCRIPTION": "Service for airport management",
@@ -201,6 +273,7 @@ AUTH_USER_MODEL = "accounts.User"
 # https://docs.djangoproject.com/en/5.1/howto/static-files/
 
 STATIC_URL = "static/"
+STATIC_ROOT = BASE_DIR / "staticfiles"
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
@@ -0,0 +1,51 @@
+"""
+Production settings profile of airport_service.
+
+Extends the default settings with debug mode off, the debug
+toolbar app and middleware removed and the static files (admin,
+API docs) served by WhiteNoise from `STATIC_ROOT`, collected when
+the image is built. Select it with
+`DJANGO_SETTINGS_MODULE=airport_service.settings_production`.
+"""
+
+import os
+
+from airport_service.settings import *  # noqa: F401, F403
+from airport_service.settings import INSTALLED_APPS, MIDDLEWARE
+
+
+DEBUG = False
+
+ALLOWED_HOSTS = [
+    host.strip()
+    for host in os.environ.get("ALLOWED_HOSTS", "localhost,127.0.0.1").split(",")
+    if host.strip()
+]
+
+CSRF_TRUSTED_ORIGINS = [
+    origin.strip()
+    for origin in os.environ.get("CSRF_TRUSTED_ORIGINS", "").split(",")
+    if origin.strip()
+]
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app != "debug_toolbar"]
+
+MIDDLEWARE = [
+    middleware
+    for middleware in MIDDLEWARE
+    if not middleware.startswith("debug_toolbar.")
+]
+MIDDLEWARE.insert(
+    MIDDLEWARE.index("django.middleware.security.SecurityMiddleware") + 1,
+    "whitenoise.middleware.WhiteNoiseMiddleware",
+)
+
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {
+        "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
+    },
+}
+
+# TLS is terminated by the load balancer
+SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
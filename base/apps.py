@@ -0,0 +1,15 @@
+from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+
+
+class BaseConfig(AppConfig):
+    """
+    Configuration for the base application.
+    """
+
+    name = "base"
+
+    def ready(self):
+        from base.query_budget import install_execute_wrappers
+
+        connection_created.connect(install_execute_wrappers)
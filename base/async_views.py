@@ -0,0 +1,224 @@
+import hashlib
+import logging
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.views import View
+from redis.exceptions import RedisError
+from rest_framework import exceptions
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from base.cache import aget_namespace_versions, get_async_client
+from base.db_routers import caching_namespaces, get_replica_for, read_from
+from base.instrumentation import get_request_metrics, record_page_cache
+
+
+logger = logging.getLogger(__name__)
+
+
+async def fetch_all(queryset) -> list:
+    """
+    Evaluates a queryset with the async ORM, including its
+    `prefetch_related` lookups.
+    """
+    return [instance async for instance in queryset]
+
+
+class AsyncListView(View):
+    """
+    Base class of async read-only list endpoints.
+
+    Under ASGI (`SERVER_INTERFACE=asgi`) the request does not
+    hold a worker thread while the database, Redis or a slow
+    client are awaited:
+
+    - authentication, permissions and throttling use the DRF
+      settings of the sync API, in a single thread hop;
+    - the total count and the page are read with Django's async
+      ORM, from a replica when one is up to date and the view
+      namespaces were not changed within the replica lag bound
+      (see `base.db_routers`). The ORM runs the queries of a request
+      one after the other on one thread and connection, so they
+      are awaited in sequence;
+    - responses are cached in Redis with `redis.asyncio`, keyed
+      by the versions of the view namespaces, so the writes
+      invalidating the sync endpoints invalidate these as well.
+
+    Responses match the sync list endpoints: JSON rendered by
+    `JSONRenderer`, with limit/offset pagination.
+
+    Attributes:
+        queryset (QuerySet): The objects listed.
+        serializer_class (Serializer): The serializer of the objects.
+        filterset_class (FilterSet): The filters of the endpoint.
+        permission_classes (tuple): The DRF permission classes.
+        cache_namespace (str): The namespace of the view,
+        e.g. `flight`.
+        cache_depends_on (tuple): Other namespaces whose changes
+        make the cached responses stale.
+        cache_timeout (int): The cache timeout in seconds.
+    """
+
+    http_method_names = ["get", "head", "options"]
+    queryset = None
+    serializer_class = None
+    filterset_class = None
+    permission_classes = ()
+    cache_namespace = None
+    cache_depends_on = ()
+    cache_timeout = 60 * 5
+
+    async def get(self, request, *args, **kwargs):
+        drf_request = Request(
+            request,
+            authenticators=[
+                authenticator()
+                for authenticator in api_settings.DEFAULT_AUTHENTICATION_CLASSES
+            ],
+        )
+        namespaces = (self.cache_namespace, *self.cache_depends_on)
+        try:
+            with caching_namespaces(namespaces):
+                replica = await sync_to_async(self.check_request)(drf_request)
+        except exceptions.APIException as error:
+            return self.error_response(drf_request, error)
+
+        key = await self.get_cache_key(request)
+        body = await self.get_cached_body(key)
+        record_page_cache(body is not None, f"{self.cache_namespace}_async")
+        if body is not None:
+            return HttpResponse(body, content_type="application/json")
+
+        with read_from(replica):
+            response = await self.list(drf_request)
+        if response.status_code == 200:
+            await self.cache_body(key, response.content)
+        return response
+
+    def check_request(self, request):
+        """
+        Authenticates, authorizes and throttles the request,
+        running the blocking lookups (user, throttle history,
+        replica lag) in one thread hop.
+
+        Returns:
+            str: The replica alias to read from, None for the
+            primary.
+        """
+        for permission_class in self.permission_classes:
+            if not permission_class().has_permission(request, self):
+                if request.successful_authenticator is None:
+                    raise exceptions.NotAuthenticated()
+                raise exceptions.PermissionDenied()
+        for throttle_class in api_settings.DEFAULT_THROTTLE_CLASSES:
+            throttle = throttle_class()
+            if not throttle.allow_request(request, self):
+                raise exceptions.Throttled(throttle.wait())
+        return get_replica_for(request.user)
+
+    def error_response(self, request, error) -> HttpResponse:
+        """
+        Renders an API exception like the DRF exception handler.
+        """
+        detail = error.detail
+        if not isinstance(detail, (list, dict)):
+            detail = {"detail": detail}
+        response = HttpResponse(
+            JSONRenderer().render(detail),
+            content_type="application/json",
+            status=error.status_code,
+        )
+        if isinstance(
+            error, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)
+        ):
+            authenticator = request.authenticators[0]
+            response["WWW-Authenticate"] = authenticator.authenticate_header(request)
+        if getattr(error, "wait", None):
+            response["Retry-After"] = "%d" % error.wait
+        return response
+
+    def get_queryset(self, request):
+        """
+        Returns the filtered queryset, without evaluating it.
+        """
+        queryset = self.queryset.all()
+        if self.filterset_class is None:
+            return queryset
+        filterset = self.filterset_class(
+            request.query_params, queryset=queryset, request=request
+        )
+        if not filterset.is_valid():
+            raise exceptions.ValidationError(filterset.errors)
+        return filterset.qs
+
+    async def list(self, request) -> HttpResponse:
+        """
+        Returns a page of the filtered objects with the total count.
+        """
+        try:
+            queryset = self.get_queryset(request)
+        except exceptions.ValidationError as error:
+            return self.error_response(request, error)
+
+        paginator = LimitOffsetPagination()
+        paginator.request = request
+        paginator.limit = paginator.get_limit(request)
+        paginator.offset = paginator.get_offset(request)
+        paginator.count = await queryset.acount()
+        page = await fetch_all(
+            queryset[paginator.offset : paginator.offset + paginator.limit]
+        )
+
+        serializer = self.serializer_class(
+            page, many=True, context={"request": request, "view": self}
+        )
+        data = paginator.get_paginated_response(serializer.data).data
+        return HttpResponse(
+            JSONRenderer().render(data), content_type="application/json"
+        )
+
+    async def get_cache_key(self, request):
+        """
+        Returns the cache key of the request, None if Redis is
+        unavailable.
+        """
+        namespaces = (self.cache_namespace, *self.cache_depends_on)
+        try:
+            versions = await aget_namespace_versions(namespaces)
+        except RedisError:
+            logger.warning("Response cache skipped, Redis is unavailable.")
+            return None
+        path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+        return cache.make_key(
+            f"{self.cache_namespace}_async:"
+            + ".".join(f"{name}{versions[name]}" for name in namespaces)
+            + f":{path}"
+        )
+
+    async def get_cached_body(self, key):
+        if key is None:
+            return None
+        try:
+            body = await get_async_client().get(key)
+        except RedisError:
+            logger.warning("Response cache skipped, Redis is unavailable.")
+            return None
+        metrics = get_request_metrics()
+        if metrics is not None:
+            if body is None:
+                metrics.cache_misses += 1
+            else:
+                metrics.cache_hits += 1
+        return body
+
+    async def cache_body(self, key, body: bytes) -> None:
+        if key is None:
+            return
+        try:
+            await get_async_client().set(key, body, ex=self.cache_timeout)
+        except RedisError:
+            logger.warning("Response not cached, Redis is unavailable.")
@@ -0,0 +1,392 @@
+import asyncio
+import hashlib
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from functools import wraps
+
+import redis.asyncio
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.views.decorators.cache import cache_page
+from rest_framework.response import Response
+
+from base.db_routers import caching_namespaces, fence_namespaces
+from base.instrumentation import record_page_cache
+
+
+VERSION_KEY = "cache_version:{namespace}"
+
+_model_namespaces = {}
+_async_clients = weakref.WeakKeyDictionary()
+
+
+class _PendingInvalidation:
+    """
+    `on_commit` callback bumping the namespaces dirtied inside
+    one atomic block.
+
+    Django discards the callbacks of a rolled back transaction or
+    savepoint, so the namespaces collected here are dropped with
+    the writes that dirtied them.
+
+    Attributes:
+        namespaces (set): The dirty namespaces.
+        done (bool): Whether the namespaces were already bumped.
+    """
+
+    def __init__(self) -> None:
+        self.namespaces = set()
+        self.done = False
+
+    def __call__(self) -> None:
+        """
+        Bumps the collected namespaces, once.
+        """
+        if self.done:
+            return
+        self.done = True
+        if self.namespaces:
+            bump_namespace_versions(*sorted(self.namespaces))
+
+
+class _InvalidationBatch(threading.local):
+    """
+    Per-thread state of pending cache invalidations.
+
+    Attributes:
+        namespaces (set): The namespaces dirtied in autocommit mode
+        inside a `batched_invalidation` block.
+        depth (int): The nesting level of `batched_invalidation`
+        blocks, namespaces are not flushed while it is positive.
+        pending (WeakValueDictionary): The `_PendingInvalidation`
+        registered for each open atomic block, keyed by the
+        connection's savepoint ids. Entries disappear once Django
+        runs or discards the callback.
+    """
+
+    def __init__(self) -> None:
+        self.namespaces = set()
+        self.depth = 0
+        self.pending = weakref.WeakValueDictionary()
+
+
+_batch = _InvalidationBatch()
+
+
+def _version_key(namespace: str) -> str:
+    return VERSION_KEY.format(namespace=namespace)
+
+
+def _initial_version() -> int:
+    """
+    Returns a time based initial version, so a version counter
+    evicted from the cache never restarts at a value that was
+    already used by stale entries.
+    """
+    return time.time_ns() // 1000
+
+
+def get_namespace_versions(namespaces) -> dict:
+    """
+    Returns the current version of each namespace
+    in a single cache round trip.
+
+    Args:
+        namespaces (Iterable[str]): The namespaces to look up.
+
+    Returns:
+        dict: Mapping of namespace to its version.
+    """
+    keys = {_version_key(namespace): namespace for namespace in namespaces}
+    versions = cache.get_many(keys)
+    for key in keys.keys() - versions.keys():
+        cache.add(key, _initial_version(), timeout=None)
+        versions[key] = cache.get(key)
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def get_async_client():
+    """
+    Returns the `redis.asyncio` client of the running event loop,
+    connected to the Redis server of the default cache.
+
+    Clients are kept per loop, as their connections are bound
+    to the loop that opened them.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        location = settings.CACHES["default"]["LOCATION"]
+        if isinstance(location, (list, tuple)):
+            location = location[0]
+        client = _async_clients[loop] = redis.asyncio.Redis.from_url(location)
+    return client
+
+
+async def aget_namespace_versions(namespaces) -> dict:
+    """
+    Async variant of `get_namespace_versions`, reading the same
+    version counters with `redis.asyncio` in one `MGET`.
+
+    Args:
+        namespaces (Iterable[str]): The namespaces to look up.
+
+    Returns:
+        dict: Mapping of namespace to its version.
+    """
+    client = get_async_client()
+    keys = {
+        cache.make_key(_version_key(namespace)): namespace for namespace in namespaces
+    }
+    values = dict(zip(keys, await client.mget(list(keys))))
+    for key, value in values.items():
+        if value is None:
+            await client.set(key, _initial_version(), nx=True)
+            values[key] = await client.get(key)
+    return {keys[key]: int(value) for key, value in values.items()}
+
+
+def bump_namespace_versions(*namespaces: str) -> None:
+    """
+    Invalidates every cache entry built from the given namespaces
+    by incrementing their version counters.
+
+    Entries keyed with the previous versions are not deleted,
+    they are never read again and expire with their timeout.
+    With read replicas, the namespaces are fenced, so the entries
+    of the new versions are not filled from lagging replicas.
+
+    Args:
+        *namespaces (str): The namespaces to invalidate.
+    """
+    for namespace in namespaces:
+        key = _version_key(namespace)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, _initial_version(), timeout=None)
+    fence_namespaces(namespaces)
+
+
+def register_cache_namespaces(
+    model, *namespaces: str, per_instance=None, fallback=()
+) -> None:
+    """
+    Declares the cache namespaces made stale by changes of a model.
+
+    Args:
+        model (Model): The model class.
+        *namespaces (str): The namespaces invalidated by any
+        change of the model.
+        per_instance (callable, optional): Returns extra namespaces
+        for a changed instance, e.g. the namespace of its owner
+        (see `user_namespace`).
+        fallback (Iterable[str]): Namespaces invalidated instead of
+        the per-instance ones by queryset-wide writes
+        (`QuerySet.update`/`delete`), whose instances are unknown.
+    """
+    _model_namespaces[model] = (namespaces, per_instance, tuple(fallback))
+
+
+def get_instance_namespaces(instance) -> tuple:
+    """
+    Returns the cache namespaces made stale by a change of an instance.
+
+    Args:
+        instance (Model): The saved or deleted instance.
+
+    Returns:
+        tuple: The namespaces to invalidate.
+    """
+    namespaces, per_instance, _ = _model_namespaces.get(type(instance), ((), None, ()))
+    if per_instance is None:
+        return namespaces
+    return (*namespaces, *per_instance(instance))
+
+
+def get_queryset_namespaces(model) -> tuple:
+    """
+    Returns the cache namespaces made stale by a queryset-wide
+    write of a model.
+
+    Args:
+        model (Model): The model class.
+
+    Returns:
+        tuple: The namespaces to invalidate.
+    """
+    namespaces, _, fallback = _model_namespaces.get(model, ((), None, ()))
+    return (*namespaces, *fallback)
+
+
+def user_namespace(user_id) -> str:
+    """
+    Returns the cache namespace of the data owned by a user,
+    e.g. their orders and tickets.
+    """
+    return f"user:{user_id}"
+
+
+def invalidate_namespaces(*namespaces: str) -> None:
+    """
+    Marks namespaces as dirty and schedules their invalidation.
+
+    Inside an atomic block the namespaces are added to a single
+    `on_commit` callback registered for that block, so saving
+    thousands of rows in one transaction registers one callback
+    and invalidates each namespace once, and a rollback discards
+    the namespaces together with the callback. In autocommit mode
+    the namespaces are bumped immediately, or when the outermost
+    `batched_invalidation` block exits.
+
+    Args:
+        *namespaces (str): The namespaces to invalidate.
+    """
+    if not namespaces:
+        return
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        if _batch.depth:
+            _batch.namespaces.update(namespaces)
+        else:
+            bump_namespace_versions(*sorted(set(namespaces)))
+        return
+    key = tuple(connection.savepoint_ids)
+    callback = _batch.pending.get(key)
+    if callback is None or callback.done:
+        callback = _batch.pending[key] = _PendingInvalidation()
+        transaction.on_commit(callback)
+    callback.namespaces.update(namespaces)
+
+
+def flush_invalidations() -> None:
+    """
+    Bumps the versions of all dirty namespaces of the current
+    thread right away, including those waiting for a commit.
+    """
+    namespaces, _batch.namespaces = _batch.namespaces, set()
+    for callback in list(_batch.pending.values()):
+        if not callback.done:
+            callback.done = True
+            namespaces |= callback.namespaces
+    if namespaces:
+        bump_namespace_versions(*sorted(namespaces))
+
+
+@contextmanager
+def batched_invalidation():
+    """
+    Context manager deferring cache invalidation until the
+    outermost block exits, for code writing many rows outside
+    of a single transaction (management commands, admin actions).
+
+    Writes made inside a transaction are still invalidated when
+    that transaction commits, see `invalidate_namespaces`.
+    """
+    _batch.depth += 1
+    try:
+        yield
+    finally:
+        _batch.depth -= 1
+        if not _batch.depth:
+            namespaces, _batch.namespaces = _batch.namespaces, set()
+            if namespaces:
+                bump_namespace_versions(*sorted(namespaces))
+
+
+def versioned_cache_page(timeout: int, namespace: str, depends_on=()):
+    """
+    Variant of `cache_page` that builds the cache key prefix from
+    the versions of the view namespace and of the namespaces its
+    responses depend on, so invalidating a namespace is a single
+    `INCR` instead of a pattern delete over the keyspace.
+
+    Args:
+        timeout (int): The cache timeout in seconds.
+        namespace (str): The namespace of the view, e.g. `flight`.
+        depends_on (Iterable[str]): Other namespaces whose changes
+        make the cached responses stale, e.g. `route`.
+
+    Returns:
+        callable: The view decorator.
+    """
+    namespaces = (namespace, *depends_on)
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            versions = get_namespace_versions(namespaces)
+            key_prefix = f"{namespace}_view:" + ".".join(
+                f"{name}{versions[name]}" for name in namespaces
+            )
+            cached_view = cache_page(timeout, key_prefix=key_prefix)(view_func)
+            with caching_namespaces(namespaces):
+                response = cached_view(request, *args, **kwargs)
+            if request.method in ("GET", "HEAD"):
+                # Set by `cache_page`: False when served from the cache.
+                record_page_cache(not request._cache_update_cache, f"{namespace}_view")
+            return response
+
+        return _wrapped_view
+
+    return decorator
+
+
+class UserScopedCacheMixin:
+    """
+    Viewset mixin caching `list` and `retrieve` responses per
+    authenticated user.
+
+    Cache keys are built from the user id, the request path and
+    the versions of the view namespaces and of the user namespace
+    (`user_namespace`). Changes of a user's data bump only that
+    user's namespace, so other users keep their cached pages.
+    Response data (not rendered content) is cached, so content
+    negotiation still happens per request.
+
+    Attributes:
+        cache_namespace (str): The namespace of the view,
+        e.g. `order`.
+        cache_depends_on (tuple): Other namespaces whose changes
+        make the cached responses stale.
+        cache_timeout (int): The cache timeout in seconds.
+    """
+
+    cache_namespace = None
+    cache_depends_on = ()
+    cache_timeout = 60 * 5
+
+    def list(self, request, *args, **kwargs):
+        return self._get_cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._get_cached_response(super().retrieve, request, *args, **kwargs)
+
+    def get_user_cache_key(self, request) -> str:
+        """
+        Returns the cache key of the request for the current user.
+        """
+        namespaces = (
+            self.cache_namespace,
+            *self.cache_depends_on,
+            user_namespace(request.user.pk),
+        )
+        versions = get_namespace_versions(namespaces)
+        path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+        return f"{self.cache_namespace}_view:user:{request.user.pk}:" + (
+            ".".join(f"{versions[name]}" for name in namespaces) + f":{path}"
+        )
+
+    def _get_cached_response(self, action, request, *args, **kwargs):
+        key = self.get_user_cache_key(request)
+        data = cache.get(key)
+        record_page_cache(data is not None, f"{self.cache_namespace}_view:user")
+        if data is not None:
+            return Response(data)
+        response = action(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, self.cache_timeout)
+        return response
@@ -0,0 +1,285 @@
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from rest_framework.permissions import SAFE_METHODS
+
+from base.middleware import AsyncCapableMiddleware
+
+
+logger = logging.getLogger(__name__)
+
+PIN_KEY = "db_pin:user:{user_id}"
+FENCE_KEY = "db_fence:{namespace}"
+
+_read_database = ContextVar("read_database", default=None)
+_cached_namespaces = ContextVar("cached_namespaces", default=())
+
+REPLICA_LAG_SQL = {
+    "postgresql": """
+        SELECT CASE
+            WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+            ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+        END
+    """,
+}
+
+
+class ReplicaRouter:
+    """
+    Database router sending the reads of requests marked by
+    `ReplicaReadMixin` to a read replica.
+
+    Outside of such requests (writes, other views, management
+    commands, background work) every query goes to the primary.
+    Replicas are copies of the primary, so relations are always
+    allowed and migrations only run on the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_database.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.REPLICA_DATABASES
+
+
+def get_read_database():
+    """
+    Returns the replica alias the current request reads from,
+    None when reading from the primary.
+    """
+    return _read_database.get()
+
+
+class ReplicaLagMonitor:
+    """
+    Per-process cache of the replication lag of each replica,
+    measured at most every `REPLICA_LAG_CHECK_INTERVAL` seconds.
+
+    Attributes:
+        lags (dict): `(checked_at, lag)` by replica alias; the
+        lag is None when the replica could not be queried.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.lags = {}
+
+    def get_lag(self, alias: str):
+        """
+        Returns the replication lag of a replica in seconds,
+        None if it is unavailable.
+        """
+        now = time.monotonic()
+        with self.lock:
+            checked_at, lag = self.lags.get(alias, (None, None))
+            if (
+                checked_at is not None
+                and now - checked_at < settings.REPLICA_LAG_CHECK_INTERVAL
+            ):
+                return lag
+            lag = measure_replica_lag(alias)
+            self.lags[alias] = (now, lag)
+        return lag
+
+    def clear(self) -> None:
+        with self.lock:
+            self.lags.clear()
+
+
+def measure_replica_lag(alias: str):
+    """
+    Queries the replication lag of a replica in seconds. Backends
+    without a lag query (e.g. SQLite in development) report none.
+
+    Returns:
+        float: The lag, None if the replica cannot be queried.
+    """
+    connection = connections[alias]
+    sql = REPLICA_LAG_SQL.get(connection.vendor)
+    if sql is None:
+        return 0.0
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql)
+            (lag,) = cursor.fetchone()
+    except DatabaseError:
+        logger.warning("Replica %s is unavailable.", alias, exc_info=True)
+        return None
+    return float(lag or 0)
+
+
+lag_monitor = ReplicaLagMonitor()
+
+
+def choose_replica():
+    """
+    Picks a random replica lagging at most `REPLICA_MAX_LAG`
+    seconds behind the primary.
+
+    Returns:
+        str: The replica alias, None if no replica is usable.
+    """
+    replicas = [
+        alias
+        for alias in settings.REPLICA_DATABASES
+        if (lag := lag_monitor.get_lag(alias)) is not None
+        and lag <= settings.REPLICA_MAX_LAG
+    ]
+    return random.choice(replicas) if replicas else None
+
+
+def pin_to_primary(user_id) -> None:
+    """
+    Sends the reads of a user to the primary for
+    `REPLICA_PIN_SECONDS`, so they see their own writes.
+    """
+    cache.set(PIN_KEY.format(user_id=user_id), 1, settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned_to_primary(user_id) -> bool:
+    return cache.get(PIN_KEY.format(user_id=user_id)) is not None
+
+
+def fence_namespaces(namespaces) -> None:
+    """
+    Sends the reads of responses cached under the given
+    namespaces to the primary while replicas may not have
+    replayed their last change yet: `REPLICA_MAX_LAG` plus the
+    lag check interval. Called when the namespaces are bumped,
+    so a lagging replica never fills the cache entries of the
+    new versions with data older than the change.
+    """
+    if settings.REPLICA_DATABASES and namespaces:
+        cache.set_many(
+            {FENCE_KEY.format(namespace=namespace): 1 for namespace in namespaces},
+            settings.REPLICA_MAX_LAG + settings.REPLICA_LAG_CHECK_INTERVAL,
+        )
+
+
+def is_fenced(namespaces) -> bool:
+    """
+    Returns whether any of the namespaces changed too recently
+    to be read from a replica.
+    """
+    if not namespaces:
+        return False
+    keys = [FENCE_KEY.format(namespace=namespace) for namespace in namespaces]
+    return bool(cache.get_many(keys))
+
+
+@contextmanager
+def caching_namespaces(namespaces):
+    """
+    Context manager declaring that the reads of the block fill
+    shared caches versioned by the given namespaces, so they
+    are served by the primary while the namespaces are fenced.
+    """
+    token = _cached_namespaces.set((*_cached_namespaces.get(), *namespaces))
+    try:
+        yield
+    finally:
+        _cached_namespaces.reset(token)
+
+
+def get_replica_for(user):
+    """
+    Returns the replica serving the reads of a user, None when
+    they read from the primary: no replica is configured or up
+    to date, the user wrote recently, or the response is cached
+    under a namespace changed within the replica lag bound.
+    """
+    if not settings.REPLICA_DATABASES:
+        return None
+    if user.is_authenticated and is_pinned_to_primary(user.pk):
+        return None
+    if is_fenced(_cached_namespaces.get()):
+        return None
+    return choose_replica()
+
+
+@contextmanager
+def read_from(alias):
+    """
+    Context manager routing the reads of the block to a replica
+    (None for the primary).
+    """
+    token = _read_database.set(alias)
+    try:
+        yield
+    finally:
+        _read_database.reset(token)
+
+
+class ReplicaReadMixin:
+    """
+    View mixin reading from a replica for safe requests.
+
+    Requests of the actions in `replica_actions` (all actions
+    when None) are routed to a replica chosen by `choose_replica`,
+    unless the user wrote something in the last
+    `REPLICA_PIN_SECONDS` (see `ReplicaPinningMiddleware`) or all
+    replicas lag behind. Views caching their responses in shared
+    caches (`cache_namespace` and `cache_depends_on`, or
+    `versioned_cache_page`) read from the primary while those
+    namespaces are fenced (see `fence_namespaces`). Authentication
+    runs before the choice, so it always reads from the primary.
+
+    Attributes:
+        replica_actions (tuple): The actions served by replicas.
+    """
+
+    replica_actions = None
+
+    def dispatch(self, request, *args, **kwargs):
+        namespace = getattr(self, "cache_namespace", None)
+        namespaces = (
+            (namespace, *getattr(self, "cache_depends_on", ())) if namespace else ()
+        )
+        with read_from(None), caching_namespaces(namespaces):
+            return super().dispatch(request, *args, **kwargs)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if self.can_use_replica(request):
+            _read_database.set(get_replica_for(request.user))
+
+    def can_use_replica(self, request) -> bool:
+        """
+        Returns whether the action of the request may read
+        from a replica.
+        """
+        if request.method not in SAFE_METHODS:
+            return False
+        action = getattr(self, "action", None)
+        return self.replica_actions is None or action in self.replica_actions
+
+
+class ReplicaPinningMiddleware(AsyncCapableMiddleware):
+    """
+    Middleware pinning users to the primary after successful
+    writes (read-your-writes), when replicas are configured.
+    """
+
+    def process_response(self, request, response, state):
+        if (
+            settings.REPLICA_DATABASES
+            and request.method not in SAFE_METHODS
+            and response.status_code < 400
+        ):
+            user = getattr(request, "user", None)
+            if user is not None and user.is_authenticated:
+                pin_to_primary(user.pk)
+        return response
@@ -0,0 +1,235 @@
+import json
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django_redis.cache import RedisCache
+
+from base.middleware import AsyncCapableMiddleware
+from base.query_budget import execute_wrapper, get_view_name
+
+
+logger = logging.getLogger(__name__)
+
+_metrics = ContextVar("request_metrics", default=None)
+_MISSING = object()
+
+
+class RequestMetrics:
+    """
+    Performance metrics of one request.
+
+    Database queries are timed with an execute wrapper, cache
+    lookups are counted by `InstrumentedRedisCache`, page cache
+    outcomes by `versioned_cache_page` and `UserScopedCacheMixin`,
+    and serialization time by `SerializerTimingMixin`.
+
+    Attributes:
+        view (str): The `View.action` name handling the request.
+        db_time (float): The time spent in queries, in seconds.
+        db_queries (int): The number of queries.
+        cache_hits (int): The number of cache keys found.
+        cache_misses (int): The number of cache keys not found.
+        page_cache (str): `hit` or `miss` for cached views.
+        page_cache_name (str): The key prefix (without versions)
+        of the cached view, e.g. `flight_view`.
+        serializer_time (float): The time spent serializing
+        responses, in seconds.
+    """
+
+    def __init__(self) -> None:
+        self.view = None
+        self.db_time = 0.0
+        self.db_queries = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.page_cache = None
+        self.page_cache_name = None
+        self.serializer_time = 0.0
+        self.serializer_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.db_queries += 1
+
+    def server_timing(self, total: float) -> str:
+        """
+        Returns the `Server-Timing` header value, durations in
+        milliseconds.
+        """
+        entries = [
+            f'db;dur={self.db_time * 1000:.2f};desc="{self.db_queries} queries"',
+            f'cache;desc="{self.cache_hits} hits, {self.cache_misses} misses"',
+        ]
+        if self.page_cache is not None:
+            entries.append(f"page-cache-{self.page_cache}")
+        entries.append(f"serializer;dur={self.serializer_time * 1000:.2f}")
+        entries.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(entries)
+
+    def as_dict(self, total: float) -> dict:
+        return {
+            "view": self.view,
+            "db_ms": round(self.db_time * 1000, 2),
+            "db_queries": self.db_queries,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "page_cache": self.page_cache,
+            "serializer_ms": round(self.serializer_time * 1000, 2),
+            "total_ms": round(total * 1000, 2),
+        }
+
+
+def get_request_metrics():
+    """
+    Returns the metrics of the current request, None if the
+    request is not measured.
+    """
+    return _metrics.get()
+
+
+@contextmanager
+def collect_request_metrics():
+    """
+    Context manager collecting the metrics of the current
+    request, or joining the collection already in progress,
+    so several middlewares share one execute wrapper.
+
+    Returns:
+        RequestMetrics: The metrics of the request.
+    """
+    metrics = _metrics.get()
+    if metrics is not None:
+        yield metrics
+        return
+
+    metrics = RequestMetrics()
+    token = _metrics.set(metrics)
+    try:
+        with execute_wrapper(metrics):
+            yield metrics
+    finally:
+        _metrics.reset(token)
+
+
+def record_page_cache(hit: bool, name: str) -> None:
+    """
+    Records whether a cached view was served from the cache.
+
+    Args:
+        hit (bool): Whether the response was cached.
+        name (str): The key prefix of the view, e.g. `flight_view`.
+    """
+    metrics = _metrics.get()
+    if metrics is not None:
+        metrics.page_cache = "hit" if hit else "miss"
+        metrics.page_cache_name = name
+
+
+class InstrumentedRedisCache(RedisCache):
+    """
+    Redis cache backend counting the hits and misses of lookups
+    made while handling a measured request.
+    """
+
+    def get(self, key, default=None, version=None, client=None):
+        value = super().get(key, _MISSING, version=version, client=client)
+        metrics = _metrics.get()
+        if metrics is not None:
+            if value is _MISSING:
+                metrics.cache_misses += 1
+            else:
+                metrics.cache_hits += 1
+        return default if value is _MISSING else value
+
+    def get_many(self, keys, version=None, client=None):
+        keys = list(keys)
+        values = super().get_many(keys, version=version, client=client)
+        metrics = _metrics.get()
+        if metrics is not None:
+            metrics.cache_hits += len(values)
+            metrics.cache_misses += len(keys) - len(values)
+        return values
+
+
+class SerializerTimingMixin:
+    """
+    Serializer mixin adding the time spent in `to_representation`
+    to the metrics of the current request. Nested serializers
+    using the mixin are only counted once, with their parent.
+    """
+
+    def to_representation(self, instance):
+        metrics = _metrics.get()
+        if metrics is None:
+            return super().to_representation(instance)
+
+        metrics.serializer_depth += 1
+        started = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            metrics.serializer_depth -= 1
+            if not metrics.serializer_depth:
+                metrics.serializer_time += time.perf_counter() - started
+
+
+class InstrumentationMiddleware(AsyncCapableMiddleware):
+    """
+    Middleware measuring the database time and query count,
+    cache hits and misses, page cache outcome, serialization
+    time and total time of requests.
+
+    A share of `INSTRUMENTATION_SAMPLE_RATE` requests is sampled
+    (`0` removes the middleware, `1` samples every request). The
+    metrics of sampled requests are exposed in the
+    `Server-Timing` header and logged as one JSON line.
+    """
+
+    def __init__(self, get_response) -> None:
+        self.sample_rate = getattr(settings, "INSTRUMENTATION_SAMPLE_RATE", 0)
+        if self.sample_rate <= 0:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    @contextmanager
+    def wrap_response(self, request):
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            yield None
+            return
+
+        started = time.perf_counter()
+        with collect_request_metrics() as metrics:
+            yield metrics, started
+
+    def process_response(self, request, response, state):
+        if state is None:
+            return response
+
+        metrics, started = state
+        total = time.perf_counter() - started
+        response["Server-Timing"] = metrics.server_timing(total)
+        logger.info(
+            json.dumps(
+                {
+                    "method": request.method,
+                    "path": request.path,
+                    "status": response.status_code,
+                    **metrics.as_dict(total),
+                }
+            )
+        )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = _metrics.get()
+        if metrics is not None:
+            metrics.view = get_view_name(view_func, request.method)
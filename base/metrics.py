@@ -0,0 +1,303 @@
+import atexit
+import hmac
+import logging
+import re
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse, HttpResponseForbidden
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
+
+from base.instrumentation import collect_request_metrics, get_request_metrics
+from base.middleware import AsyncCapableMiddleware
+from base.query_budget import get_view_name
+
+
+logger = logging.getLogger(__name__)
+
+METRICS_KEY = "metrics:series"
+LE_LABEL = re.compile(r',?le="([^"]*)"')
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+METRICS = {
+    "airport_http_requests_total": (
+        "counter",
+        "HTTP requests by view action, method and status.",
+    ),
+    "airport_http_request_duration_seconds": (
+        "histogram",
+        "HTTP request latency by view action.",
+    ),
+    "airport_db_queries_total": (
+        "counter",
+        "Database queries by view action.",
+    ),
+    "airport_db_query_duration_seconds": (
+        "histogram",
+        "Time spent in database queries per request, by view action.",
+    ),
+    "airport_cache_lookups_total": (
+        "counter",
+        "Cache key lookups made by requests, by result.",
+    ),
+    "airport_page_cache_requests_total": (
+        "counter",
+        "Requests to cached views by key prefix and result (hit or miss).",
+    ),
+    "airport_tickets_sold_total": (
+        "counter",
+        "Tickets booked.",
+    ),
+    "airport_booking_conflicts_total": (
+        "counter",
+        "Seat requests rejected because the seats were sold or held.",
+    ),
+}
+
+
+def escape_label(value) -> str:
+    return str(value).replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def series_name(name: str, labels: dict) -> str:
+    """
+    Returns the series of a metric in the exposition format,
+    e.g. `airport_http_requests_total{method="GET",view="..."}`.
+    """
+    if not labels:
+        return name
+    pairs = ",".join(
+        f'{key}="{escape_label(value)}"' for key, value in sorted(labels.items())
+    )
+    return f"{name}{{{pairs}}}"
+
+
+class MetricsBuffer:
+    """
+    Per-process buffer of metric increments, flushed to Redis.
+
+    Requests only update an in-memory dictionary; the increments
+    are added to one Redis hash (`HINCRBYFLOAT` in a single
+    pipeline) at most every `METRICS_FLUSH_INTERVAL` seconds, so
+    the series of all gunicorn workers (and hosts) are aggregated
+    in Redis and any worker can answer a scrape.
+
+    Attributes:
+        values (defaultdict): The pending increments by series.
+        flushed_at (float): The monotonic time of the last flush.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.values = defaultdict(float)
+        self.flushed_at = time.monotonic()
+
+    def increment(self, name: str, value: float = 1, **labels) -> None:
+        """
+        Adds `value` to a counter.
+        """
+        series = series_name(name, labels)
+        with self.lock:
+            self.values[series] += value
+
+    def observe(self, name: str, value: float, buckets=LATENCY_BUCKETS, **labels):
+        """
+        Records an observation of a histogram. Buckets are stored
+        cumulatively, as they are exposed.
+        """
+        with self.lock:
+            for bound in (*buckets, "+Inf"):
+                series = series_name(f"{name}_bucket", {**labels, "le": bound})
+                self.values[series] += bound == "+Inf" or value <= bound
+            self.values[series_name(f"{name}_sum", labels)] += value
+            self.values[series_name(f"{name}_count", labels)] += 1
+
+    def is_due(self) -> bool:
+        """
+        Returns whether the flush interval has passed.
+        """
+        return time.monotonic() - self.flushed_at >= settings.METRICS_FLUSH_INTERVAL
+
+    def flush(self, force: bool = False) -> None:
+        """
+        Adds the pending increments to Redis, if the flush
+        interval has passed or `force` is set.
+        """
+        now = time.monotonic()
+        if not force and not self.is_due():
+            return
+        with self.lock:
+            values, self.values = self.values, defaultdict(float)
+            self.flushed_at = now
+        if not values:
+            return
+
+        try:
+            pipeline = get_redis_connection("default").pipeline(transaction=False)
+            for series, value in values.items():
+                pipeline.hincrbyfloat(METRICS_KEY, series, value)
+            pipeline.execute()
+        except RedisError:
+            logger.warning("Metrics not flushed, Redis is unavailable.", exc_info=True)
+
+
+buffer = MetricsBuffer()
+atexit.register(lambda: settings.METRICS_ENABLED and buffer.flush(force=True))
+
+
+def increment(name: str, value: float = 1, **labels) -> None:
+    """
+    Adds `value` to a counter, e.g.
+    `increment("airport_tickets_sold_total", len(tickets))`.
+    """
+    if settings.METRICS_ENABLED:
+        buffer.increment(name, value, **labels)
+
+
+def observe(name: str, value: float, **labels) -> None:
+    """
+    Records an observation of a histogram.
+    """
+    if settings.METRICS_ENABLED:
+        buffer.observe(name, value, **labels)
+
+
+def render_metrics() -> str:
+    """
+    Renders the aggregated series of all processes in the
+    Prometheus text exposition format.
+
+    Returns:
+        str: The exposition, with `HELP` and `TYPE` lines.
+    """
+    buffer.flush(force=True)
+    stored = get_redis_connection("default").hgetall(METRICS_KEY)
+
+    series_by_metric = defaultdict(list)
+    for series, value in stored.items():
+        series = series.decode()
+        base = series.split("{", 1)[0]
+        for suffix in ("_bucket", "_sum", "_count"):
+            if base.endswith(suffix) and base.removesuffix(suffix) in METRICS:
+                base = base.removesuffix(suffix)
+        series_by_metric[base].append((series, float(value)))
+
+    lines = []
+    for name, (kind, description) in METRICS.items():
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {kind}")
+        for series, value in sorted(series_by_metric[name], key=series_sort_key):
+            lines.append(f"{series} {value:g}")
+    return "\n".join(lines) + "\n"
+
+
+def series_sort_key(item) -> tuple:
+    """
+    Orders series by name and labels, and histogram buckets
+    by their numeric bound.
+    """
+    series, _ = item
+    match = LE_LABEL.search(series)
+    bound = float(match.group(1)) if match else 0.0
+    return LE_LABEL.sub("", series), bound
+
+
+def metrics_view(request):
+    """
+    Scrape endpoint of the Prometheus metrics.
+
+    Requests must send `METRICS_TOKEN` as
+    `Authorization: Bearer <token>`; without a configured token
+    the metrics are not served at all, as they expose the routes
+    and traffic of the service.
+    """
+    token = settings.METRICS_TOKEN
+    if not token or not hmac.compare_digest(
+        request.headers.get("Authorization", ""), f"Bearer {token}"
+    ):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+class MetricsMiddleware(AsyncCapableMiddleware):
+    """
+    Middleware recording the rate, latency and status of requests
+    per view action, their database queries and time, cache
+    lookups and page cache outcomes.
+
+    Removed when `METRICS_ENABLED` is off. The buffered series
+    are flushed to Redis after requests, at most every
+    `METRICS_FLUSH_INTERVAL` seconds; under ASGI the blocking
+    flush runs in a thread, off the event loop.
+    """
+
+    def __init__(self, get_response) -> None:
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = super().__call__(request)
+        buffer.flush()
+        return response
+
+    async def __acall__(self, request):
+        response = await super().__acall__(request)
+        if buffer.is_due():
+            await sync_to_async(buffer.flush, thread_sensitive=False)()
+        return response
+
+    @contextmanager
+    def wrap_response(self, request):
+        started = time.perf_counter()
+        with collect_request_metrics() as metrics:
+            yield metrics, started
+
+    def process_response(self, request, response, state):
+        metrics, started = state
+        duration = time.perf_counter() - started
+
+        view = metrics.view or "unresolved"
+        if view != "metrics_view":
+            buffer.increment(
+                "airport_http_requests_total",
+                view=view,
+                method=request.method,
+                status=response.status_code,
+            )
+            buffer.observe("airport_http_request_duration_seconds", duration, view=view)
+            buffer.increment("airport_db_queries_total", metrics.db_queries, view=view)
+            buffer.observe(
+                "airport_db_query_duration_seconds", metrics.db_time, view=view
+            )
+            if metrics.cache_hits:
+                buffer.increment(
+                    "airport_cache_lookups_total", metrics.cache_hits, result="hit"
+                )
+            if metrics.cache_misses:
+                buffer.increment(
+                    "airport_cache_lookups_total", metrics.cache_misses, result="miss"
+                )
+            if metrics.page_cache is not None:
+                buffer.increment(
+                    "airport_page_cache_requests_total",
+                    cache=metrics.page_cache_name,
+                    result=metrics.page_cache,
+                )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = get_request_metrics()
+        if metrics is not None:
+            metrics.view = get_view_name(view_func, request.method)
@@ -0,0 +1,47 @@
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+
+class AsyncCapableMiddleware:
+    """
+    Base class of middlewares running natively in both sync (WSGI)
+    and async (ASGI) handler chains, so requests to async views
+    are not switched to a thread to run the middleware.
+
+    Subclasses wrap the inner handler with `wrap_response` (a
+    context manager) and post-process responses in
+    `process_response`; neither may perform database queries,
+    as they run on the event loop under ASGI.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response) -> None:
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with self.wrap_response(request) as state:
+            response = self.get_response(request)
+        return self.process_response(request, response, state)
+
+    async def __acall__(self, request):
+        with self.wrap_response(request) as state:
+            response = await self.get_response(request)
+        return self.process_response(request, response, state)
+
+    @contextmanager
+    def wrap_response(self, request):
+        """
+        Context manager around the inner handler; the yielded
+        value is passed to `process_response`.
+        """
+        yield None
+
+    def process_response(self, request, response, state):
+        return response
@@ -2,6 +2,56 @@ import uuid
 
 from django.db import models
 
+from base.cache import (
+    get_instance_namespaces,
+    get_queryset_namespaces,
+    invalidate_namespaces,
+)
+
+
+class CacheInvalidatingQuerySet(models.QuerySet):
+    """
+    QuerySet invalidating the cache namespaces registered for
+    its model on bulk writes, which do not send `post_save`
+    signals. Bulk inserts and updates know their instances and
+    invalidate per-instance namespaces, queryset-wide updates
+    invalidate the fallback ones. `QuerySet.delete` is not
+    overridden, it sends `post_delete` for every deleted row
+    as long as the model has signal receivers.
+
+    Methods:
+        bulk_create(objs, ...): Inserts objects in bulk.
+        bulk_update(objs, fields, ...): Updates objects in bulk.
+        update(**kwargs): Updates all rows of the queryset.
+    """
+
+    def _invalidate_instances(self, objs) -> None:
+        namespaces = set()
+        for obj in objs:
+            namespaces.update(get_instance_namespaces(obj))
+        invalidate_namespaces(*namespaces)
+
+    def _invalidate_queryset(self) -> None:
+        invalidate_namespaces(*get_queryset_namespaces(self.model))
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+        self._invalidate_instances(objs)
+        return objs
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        rows = super().bulk_update(objs, fields, *args, **kwargs)
+        if rows:
+            self._invalidate_instances(objs)
+        return rows
+
+    def update(self, **kwargs):
+        rows = super().update(**kwargs)
+        if rows:
+            self._invalidate_queryset()
+        return rows
+
 
 class UUIDBaseModel(models.Model):
     """
@@ -17,6 +67,8 @@ class UUIDBaseModel(models.Model):
     Attributes:
         id (UUIDField): A universally unique
         identifier (UUID) for each model instance.
+        objects (Manager): The default manager, invalidating
+        the cache namespaces of the model on bulk writes.
 
     Meta:
         abstract (bool): Indicates that this model
@@ -27,5 +79,7 @@ class UUIDBaseModel(models.Model):
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
 
+    objects = CacheInvalidatingQuerySet.as_manager()
+
     class Meta:
         abstract = True
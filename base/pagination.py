@@ -0,0 +1,264 @@
+import base64
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param, remove_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination seeking on a unique ordering key.
+
+    The cursor stores the ordering key values of the last row of
+    the page, and the next page is selected with a row comparison
+    on those values (`WHERE (a, b) < (x, y)` spelled out as
+    `a <= x AND (a < x OR (a = x AND b < y))`). The leading
+    `a <= x` is a range condition on the first column of the
+    ordering index, so the database seeks into the index instead
+    of skipping `OFFSET` rows or filtering every row. The total count is only
+    computed when `with_count=true` is passed.
+
+    Attributes:
+        ordering (tuple): The default ordering key, overridden by
+        the `keyset_ordering` attribute of the view. The last
+        field must be unique (usually `id`).
+        page_size (int): The default number of rows per page.
+        max_page_size (int): The maximum allowed `limit`.
+    """
+
+    ordering = ("-id",)
+    page_size = 15
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    page_size_query_param = "limit"
+    count_query_param = "with_count"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering = getattr(view, "keyset_ordering", self.ordering)
+        self.limit = self.get_limit(request)
+        self.count = None
+        if request.query_params.get(self.count_query_param) == "true":
+            self.count = queryset.count()
+
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request, queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self.get_seek_filter(position))
+
+        rows = list(queryset[: self.limit + 1])
+        self.has_next = len(rows) > self.limit
+        rows = rows[: self.limit]
+        self.next_position = self.get_position(rows[-1]) if rows else None
+        return rows
+
+    def get_limit(self, request) -> int:
+        try:
+            limit = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(limit, self.max_page_size))
+
+    def get_position(self, row) -> list:
+        position = []
+        for field in self.ordering:
+            value = row
+            for attr in field.lstrip("-").split("__"):
+                value = getattr(value, attr)
+            if hasattr(value, "isoformat"):
+                value = value.isoformat()
+            position.append(str(value))
+        return position
+
+    def get_seek_filter(self, position) -> Q:
+        """
+        Builds the filter selecting rows after the given position
+        in the ordering: the expanded row comparison, AND-ed with
+        an inclusive bound on the first ordering field, which
+        the database turns into an index range.
+
+        Args:
+            position (list): The ordering key values of the last
+            row of the previous page.
+
+        Returns:
+            Q: The seek filter.
+        """
+        conditions = []
+        for index, field in enumerate(self.ordering):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            equal = {
+                previous.lstrip("-"): value
+                for previous, value in zip(self.ordering[:index], position)
+            }
+            conditions.append(Q(**equal, **{f"{name}__{lookup}": position[index]}))
+        if len(conditions) == 1:
+            return conditions[0]
+        first = self.ordering[0]
+        bound = "lte" if first.startswith("-") else "gte"
+        return Q(**{f"{first.lstrip('-')}__{bound}": position[0]}) & reduce(
+            or_, conditions
+        )
+
+    def encode_cursor(self, position) -> str:
+        return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+    def decode_cursor(self, request, model):
+        """
+        Decodes the cursor of the request into the ordering key
+        values, converted with the ordering fields.
+
+        Args:
+            request (Request): The request.
+            model (Model): The model of the paginated queryset.
+
+        Returns:
+            list: The position, None without a cursor.
+
+        Raises:
+            NotFound: The cursor is malformed or holds values
+            invalid for the ordering fields.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if (
+            not isinstance(position, list)
+            or len(position) != len(self.ordering)
+            or not all(isinstance(value, str) for value in position)
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            return [
+                self.get_ordering_field(model, field).to_python(value)
+                for field, value in zip(self.ordering, position)
+            ]
+        except (ValidationError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    @staticmethod
+    def get_ordering_field(model, field: str):
+        """
+        Returns the model field of an ordering entry, following
+        relations (e.g. `-route__distance`).
+        """
+        *relations, name = field.lstrip("-").split("__")
+        for relation in relations:
+            model = model._meta.get_field(relation).related_model
+        return model._meta.get_field(name)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(self.next_position)
+        )
+
+    def get_paginated_response(self, data):
+        response = {"next": self.get_next_link(), "results": data}
+        if self.count is not None:
+            response = {"count": self.count, **response}
+        return Response(response)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "count": {"type": "integer", "example": 123},
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+
+class SelectablePagination(LimitOffsetPagination):
+    """
+    Limit/offset pagination that switches to `KeysetPagination`
+    per request.
+
+    Keyset (cursor) pagination is used when `pagination=cursor`
+    or a `cursor` is passed. In limit/offset mode, `with_count=false`
+    skips the `COUNT(*)` query and detects the next page by
+    fetching one extra row.
+
+    Attributes:
+        keyset_class (type): The keyset pagination class.
+    """
+
+    keyset_class = KeysetPagination
+    mode_query_param = "pagination"
+    count_query_param = "with_count"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if (
+            request.query_params.get(self.mode_query_param) == "cursor"
+            or self.keyset_class.cursor_query_param in request.query_params
+        ):
+            self.keyset = self.keyset_class()
+            self.keyset.page_size = self.default_limit or self.keyset.page_size
+            return self.keyset.paginate_queryset(queryset, request, view)
+
+        if request.query_params.get(self.count_query_param) != "false":
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+        self.offset = self.get_offset(request)
+        self.count = None
+        rows = list(queryset[self.offset : self.offset + self.limit + 1])
+        self.has_next = len(rows) > self.limit
+        return rows[: self.limit]
+
+    def get_next_link(self):
+        if self.count is not None:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        return replace_query_param(
+            url, self.offset_query_param, self.offset + self.limit
+        )
+
+    def get_previous_link(self):
+        if self.count is not None:
+            return super().get_previous_link()
+        if self.offset <= 0:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        if self.offset - self.limit <= 0:
+            return remove_query_param(url, self.offset_query_param)
+        return replace_query_param(
+            url, self.offset_query_param, self.offset - self.limit
+        )
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        if self.count is not None:
+            return super().get_paginated_response(data)
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
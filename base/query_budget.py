@@ -0,0 +1,294 @@
+import logging
+from contextlib import ContextDecorator, contextmanager
+from contextvars import ContextVar
+from functools import partial
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS
+from django.urls import resolve
+
+from base.middleware import AsyncCapableMiddleware
+
+
+logger = logging.getLogger(__name__)
+
+QUERY_BUDGET_MODES = ("off", "warn", "raise")
+
+_execute_wrappers = ContextVar("execute_wrappers", default=())
+
+
+class QueryBudgetExceeded(AssertionError):
+    """
+    Raised when a block of code or a view action runs more
+    queries than its budget allows.
+    """
+
+
+def run_execute_wrappers(execute, sql, params, many, context):
+    """
+    Execute wrapper installed on every database connection (see
+    `install_execute_wrappers`), running the wrappers registered
+    with `execute_wrapper` in the current context.
+
+    Django connections belong to threads, while a request may
+    run its queries in other threads, e.g. the `sync_to_async`
+    worker of an async view. Context variables follow the
+    request into those threads, so its wrappers see every query
+    it runs, whichever connection runs it.
+    """
+    alias = context["connection"].alias
+    for using, wrapper in reversed(_execute_wrappers.get()):
+        if using is None or using == alias:
+            execute = partial(wrapper, execute)
+    return execute(sql, params, many, context)
+
+
+def install_execute_wrappers(sender, connection, **kwargs) -> None:
+    """
+    `connection_created` receiver installing
+    `run_execute_wrappers` on new connections.
+    """
+    if run_execute_wrappers not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, run_execute_wrappers)
+
+
+@contextmanager
+def execute_wrapper(wrapper, using=None):
+    """
+    Context manager running an execute wrapper around the
+    queries of the current context, in any thread it continues
+    in (unlike `connection.execute_wrapper`, bound to the
+    connection of the calling thread).
+
+    Args:
+        wrapper (callable): The execute wrapper.
+        using (str): The database alias, None for all databases.
+    """
+    token = _execute_wrappers.set((*_execute_wrappers.get(), (using, wrapper)))
+    try:
+        yield
+    finally:
+        _execute_wrappers.reset(token)
+
+
+class QueryCounter:
+    """
+    Context manager recording the queries run in the current
+    context, including the `sync_to_async` threads of async
+    views.
+
+    Queries are recorded with an execute wrapper, so counting
+    works with `DEBUG = False` and is not affected by the bounded
+    `connection.queries` log being reset on each request.
+
+    Attributes:
+        using (str): The database alias, None for all databases.
+        queries (list): The SQL of the recorded queries.
+    """
+
+    def __init__(self, using: str = DEFAULT_DB_ALIAS) -> None:
+        self.using = using
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries.append(sql)
+        return execute(sql, params, many, context)
+
+    def __len__(self) -> int:
+        return len(self.queries)
+
+    def __enter__(self):
+        self.wrapper = execute_wrapper(self, self.using)
+        self.wrapper.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.wrapper.__exit__(exc_type, exc_value, traceback)
+
+
+def format_queries(queries) -> str:
+    return "\n".join(f"{index}. {sql}" for index, sql in enumerate(queries, start=1))
+
+
+class query_budget(ContextDecorator):
+    """
+    Context manager and decorator failing when the wrapped code
+    runs more than `limit` queries.
+
+    Example:
+        with query_budget(3):
+            client.get(url)
+
+        @query_budget(3)
+        def test_list(self):
+            ...
+
+    Attributes:
+        limit (int): The maximum number of queries.
+        using (str): The database alias.
+
+    Raises:
+        QueryBudgetExceeded: If the budget is exceeded, listing
+        the recorded queries.
+    """
+
+    def __init__(self, limit: int, using: str = DEFAULT_DB_ALIAS) -> None:
+        self.limit = limit
+        self.using = using
+
+    def __enter__(self) -> QueryCounter:
+        self.counter = QueryCounter(self.using).__enter__()
+        return self.counter
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.counter.__exit__(exc_type, exc_value, traceback)
+        if exc_type is None and len(self.counter) > self.limit:
+            raise QueryBudgetExceeded(
+                f"{len(self.counter)} queries executed, the budget is "
+                f"{self.limit}:\n{format_queries(self.counter.queries)}"
+            )
+
+
+def get_view_action(view_func, method: str) -> tuple:
+    """
+    Returns the view class and the action handling a request.
+
+    Args:
+        view_func (callable): The resolved view function.
+        method (str): The HTTP method of the request.
+
+    Returns:
+        tuple: The view class (None for function views) and
+        the viewset action, or the lowercase HTTP method for
+        other views.
+    """
+    view_class = getattr(view_func, "cls", None) or getattr(
+        view_func, "view_class", None
+    )
+    actions = getattr(view_func, "actions", None) or {}
+    return view_class, actions.get(method.lower(), method.lower())
+
+
+def get_view_name(view_func, method: str) -> str:
+    """
+    Returns the `View.action` name of the view action handling
+    a request, e.g. `FlightViewSet.list`.
+    """
+    view_class, action = get_view_action(view_func, method)
+    if view_class is None:
+        return getattr(view_func, "__name__", repr(view_func))
+    return f"{view_class.__name__}.{action}"
+
+
+def get_view_budget(view_func, method: str) -> tuple:
+    """
+    Returns the name and the declared query budget of the view
+    action handling a request.
+
+    Budgets are declared on views as `query_budgets`, a mapping
+    of viewset actions (`list`, `retrieve`, ...) or, for plain
+    API views, lowercase HTTP methods to query counts.
+
+    Args:
+        view_func (callable): The resolved view function.
+        method (str): The HTTP method of the request.
+
+    Returns:
+        tuple: The `View.action` name and the budget, None if
+        no budget is declared.
+    """
+    view_class, action = get_view_action(view_func, method)
+    budget = getattr(view_class, "query_budgets", {}).get(action)
+    return get_view_name(view_func, method), budget
+
+
+class QueryBudgetMiddleware(AsyncCapableMiddleware):
+    """
+    Middleware checking the number of queries of each request
+    against the budget declared on the view action.
+
+    The mode is set by `QUERY_BUDGET_MODE`: `warn` logs requests
+    exceeding their budget, `raise` fails them with
+    `QueryBudgetExceeded` (meant for tests and development),
+    `off` removes the middleware. Queries are counted on all
+    databases, replicas included, and the counts of all requests
+    are logged at the debug level.
+    """
+
+    def __init__(self, get_response) -> None:
+        self.mode = getattr(settings, "QUERY_BUDGET_MODE", "off")
+        if self.mode not in QUERY_BUDGET_MODES:
+            raise ValueError(
+                f"QUERY_BUDGET_MODE must be one of {QUERY_BUDGET_MODES}, "
+                f"not {self.mode!r}."
+            )
+        if self.mode == "off":
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    @contextmanager
+    def wrap_response(self, request):
+        request.query_budget = None
+        with QueryCounter(using=None) as counter:
+            yield counter
+
+    def process_response(self, request, response, counter):
+        if request.query_budget is None:
+            return response
+
+        name, budget = request.query_budget
+        logger.debug("%s %s: %d queries", request.method, name, len(counter))
+        if budget is not None and len(counter) > budget:
+            message = (
+                f"{request.method} {request.path} ({name}) executed "
+                f"{len(counter)} queries, the budget is {budget}"
+            )
+            if self.mode == "raise":
+                raise QueryBudgetExceeded(
+                    f"{message}:\n{format_queries(counter.queries)}"
+                )
+            logger.warning(message)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = get_view_budget(view_func, request.method)
+
+
+class QueryBudgetTestMixin:
+    """
+    Test case mixin checking API endpoints against the query
+    budgets declared on their views.
+    """
+
+    def assertQueryBudget(self, url: str, page_sizes=(1, 10), **params):
+        """
+        Asserts that listing `url` at each page size stays within
+        the budget of its view action and runs the same number of
+        queries, i.e. does not scale with the page size.
+
+        Args:
+            url (str): The list endpoint.
+            page_sizes (tuple): The `limit` values to request.
+            **params: Extra query parameters.
+
+        Returns:
+            list: The query counts per page size.
+        """
+        match = resolve(url)
+        name, budget = get_view_budget(match.func, "GET")
+        self.assertIsNotNone(budget, f"{name} declares no query budget.")
+
+        counts = []
+        for page_size in page_sizes:
+            with query_budget(budget) as counter:
+                response = self.client.get(url, {**params, "limit": page_size})
+            self.assertEqual(response.status_code, 200, response.content)
+            counts.append(len(counter))
+        self.assertEqual(
+            len(set(counts)),
+            1,
+            f"{name} queries scale with the page size: "
+            f"{dict(zip(page_sizes, counts))}",
+        )
+        return counts
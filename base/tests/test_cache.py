@@ -0,0 +1,238 @@
+from datetime import datetime
+
+from django.db import transaction
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from airport.models import Airplane, AirplaneType, Airport, Crew, Route
+from airport.tests.base_test_class import BaseApiTest
+from base.cache import (
+    batched_invalidation,
+    bump_namespace_versions,
+    flush_invalidations,
+    get_namespace_versions,
+    user_namespace,
+)
+from management.models import Flight
+
+
+ROUTE_URL = reverse("airport:routers-list")
+ORDER_URL = reverse("management:orders-list")
+
+
+class NamespaceVersionTests(BaseApiTest):
+    """
+    Test suite for cache namespace version counters.
+    """
+
+    def test_bump_increments_only_given_namespace(self):
+        """
+        Test that bumping a namespace leaves other namespaces untouched.
+        """
+        before = get_namespace_versions(("route", "crew"))
+        bump_namespace_versions("route")
+        after = get_namespace_versions(("route", "crew"))
+        self.assertEqual(after["route"], before["route"] + 1)
+        self.assertEqual(after["crew"], before["crew"])
+
+
+class VersionedCachePageTests(BaseApiTest):
+    """
+    Test suite for views cached with versioned keys.
+    """
+
+    def setUp(self):
+        """
+        Sets up an authenticated user and a route between two airports.
+        """
+        self.user = get_user_model().objects.create_user(
+            email="test@mail.com", password="test1234"
+        )
+        self.client.force_authenticate(self.user)
+        self.source = Airport.objects.create(
+            name="first_test_airport", closest_big_city="Kyiv"
+        )
+        self.destination = Airport.objects.create(
+            name="second_test_airport", closest_big_city="Lviv"
+        )
+        Route.objects.create(
+            source=self.source, destination=self.destination, distance=450
+        )
+        flush_invalidations()
+
+    def test_dependent_namespace_change_invalidates_view(self):
+        """
+        Test that changing an airport invalidates cached route views.
+        """
+        self.client.get(ROUTE_URL)
+        self.source.closest_big_city = "Odesa"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.source.save()
+
+        response = self.client.get(ROUTE_URL)
+
+        self.assertEqual(
+            response.data["results"][0]["source"]["closest_big_city"], "Odesa"
+        )
+
+    def test_unrelated_namespace_change_keeps_cached_view(self):
+        """
+        Test that changing crew does not invalidate cached route views.
+        """
+        self.client.get(ROUTE_URL)
+        flush_invalidations()
+        versions = get_namespace_versions(("route", "airport"))
+        with self.captureOnCommitCallbacks(execute=True):
+            Crew.objects.create(first_name="John", last_name="Doe")
+
+        self.assertEqual(get_namespace_versions(("route", "airport")), versions)
+
+
+class InvalidationBatchingTests(BaseApiTest):
+    """
+    Test suite for batched cache invalidation.
+    """
+
+    def test_transaction_invalidates_once(self):
+        """
+        Test that many saves in one transaction bump the namespace once.
+        """
+        before = get_namespace_versions(("crew",))["crew"]
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                for index in range(10):
+                    Crew.objects.create(first_name=f"John{index}", last_name="Doe")
+        self.assertEqual(get_namespace_versions(("crew",))["crew"], before + 1)
+
+    def test_transaction_registers_one_callback(self):
+        """
+        Test that many saves in one transaction register a single
+        on_commit callback.
+        """
+        with self.captureOnCommitCallbacks() as callbacks:
+            with transaction.atomic():
+                for index in range(10):
+                    Crew.objects.create(first_name=f"John{index}", last_name="Doe")
+        self.assertEqual(len(callbacks), 1)
+
+    def test_rolled_back_savepoint_is_not_flushed(self):
+        """
+        Test that namespaces dirtied in a rolled back savepoint are
+        discarded instead of being flushed by a later commit.
+        """
+        before = get_namespace_versions(("crew", "airport"))
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                Airport.objects.create(name="kbp", closest_big_city="Kyiv")
+                try:
+                    with transaction.atomic():
+                        Crew.objects.create(first_name="John", last_name="Doe")
+                        raise ValueError
+                except ValueError:
+                    pass
+        after = get_namespace_versions(("crew", "airport"))
+        self.assertEqual(after["crew"], before["crew"])
+        self.assertEqual(after["airport"], before["airport"] + 1)
+
+    def test_bulk_create_invalidates(self):
+        """
+        Test that bulk inserts, which send no signals, invalidate the namespace.
+        """
+        before = get_namespace_versions(("crew",))["crew"]
+        with self.captureOnCommitCallbacks(execute=True):
+            Crew.objects.bulk_create([Crew(first_name="John", last_name="Doe")])
+        self.assertEqual(get_namespace_versions(("crew",))["crew"], before + 1)
+
+    def test_batched_invalidation_defers_flush(self):
+        """
+        Test that invalidation is deferred until the batch block exits.
+        """
+        before = get_namespace_versions(("crew",))["crew"]
+        with self.captureOnCommitCallbacks(execute=True):
+            with batched_invalidation():
+                Crew.objects.create(first_name="John", last_name="Doe")
+                Crew.objects.filter(first_name="John").update(last_name="Roe")
+                self.assertEqual(get_namespace_versions(("crew",))["crew"], before)
+        self.assertEqual(get_namespace_versions(("crew",))["crew"], before + 1)
+
+
+class UserScopedCacheTests(BaseApiTest):
+    """
+    Test suite for per-user cached order views.
+    """
+
+    def setUp(self):
+        """
+        Sets up two users and a flight to book tickets on.
+        """
+        self.user = get_user_model().objects.create_user(
+            email="test@mail.com", password="test1234"
+        )
+        self.other_user = get_user_model().objects.create_user(
+            email="other@mail.com", password="test1234"
+        )
+        airplane = Airplane.objects.create(
+            name="test_airplane",
+            airplane_type=AirplaneType.objects.create(name="test_air_type"),
+            rows=10,
+            seats_in_row=6,
+        )
+        route = Route.objects.create(
+            source=Airport.objects.create(name="kbp", closest_big_city="Kyiv"),
+            destination=Airport.objects.create(name="lwo", closest_big_city="Lviv"),
+            distance=450,
+        )
+        self.flight = Flight.objects.create(
+            route=route,
+            airplane=airplane,
+            departure_time=datetime(2024, 12, 24, 16, 0, 0),
+            arrival_time=datetime(2024, 12, 24, 22, 0, 0),
+        )
+        flush_invalidations()
+
+    def book(self, user, row):
+        """
+        Books a seat on the flight for the given user.
+        """
+        self.client.force_authenticate(user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                ORDER_URL,
+                {"tickets": [{"row": row, "seat": 1, "flight": self.flight.id}]},
+                format="json",
+            )
+
+    def test_own_order_invalidates_cached_list(self):
+        """
+        Test that a new order of the user shows up in their cached list.
+        """
+        self.client.force_authenticate(self.user)
+        self.client.get(ORDER_URL)
+        self.book(self.user, row=1)
+
+        response = self.client.get(ORDER_URL)
+
+        self.assertEqual(response.data["count"], 1)
+
+    def test_other_user_order_keeps_cached_list(self):
+        """
+        Test that orders of another user do not invalidate the user cache.
+        """
+        namespaces = ("order", "ticket", user_namespace(self.user.pk))
+        versions = get_namespace_versions(namespaces)
+        self.book(self.other_user, row=2)
+
+        self.assertEqual(get_namespace_versions(namespaces), versions)
+
+    def test_cached_list_is_not_shared_between_users(self):
+        """
+        Test that a cached order list is never served to another user.
+        """
+        self.book(self.user, row=1)
+        self.client.force_authenticate(self.user)
+        self.client.get(ORDER_URL)
+
+        self.client.force_authenticate(self.other_user)
+        response = self.client.get(ORDER_URL)
+
+        self.assertEqual(response.data["count"], 0)
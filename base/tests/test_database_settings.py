@@ -0,0 +1,60 @@
+import importlib
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+
+POSTGRES_ENV = {"ENVIRONMENT": "docker", "SECRET_KEY": "x"}
+
+
+def load_database_settings(**env) -> dict:
+    """
+    Evaluates the settings module with the given environment and
+    returns the default database settings.
+    """
+    with mock.patch.dict("os.environ", {**POSTGRES_ENV, **env}), mock.patch(
+        "dotenv.load_dotenv"
+    ):
+        module = importlib.reload(importlib.import_module("airport_service.settings"))
+    database = module.DATABASES["default"]
+    importlib.reload(module)
+    return database
+
+
+class DatabaseConnectionSettingsTests(SimpleTestCase):
+    """
+    Test suite for the PostgreSQL connection management settings.
+    """
+
+    def test_persistent_connections_by_default(self):
+        """
+        Test that connections persist with health checks and
+        server-side cursors enabled.
+        """
+        database = load_database_settings()
+        self.assertEqual(database["CONN_MAX_AGE"], 60)
+        self.assertTrue(database["CONN_HEALTH_CHECKS"])
+        self.assertFalse(database["DISABLE_SERVER_SIDE_CURSORS"])
+        self.assertNotIn("pool", database["OPTIONS"])
+
+    def test_pool_replaces_persistent_connections(self):
+        """
+        Test that the psycopg pool is configured from the
+        environment, with persistent connections turned off.
+        """
+        database = load_database_settings(DB_POOL="1", DB_POOL_MAX_SIZE="20")
+        self.assertEqual(database["CONN_MAX_AGE"], 0)
+        self.assertEqual(
+            database["OPTIONS"]["pool"],
+            {"min_size": 2, "max_size": 20, "timeout": 10.0},
+        )
+
+    def test_pgbouncer_transaction_mode(self):
+        """
+        Test that server-side cursors are disabled behind pgbouncer.
+        """
+        database = load_database_settings(
+            DB_PGBOUNCER_TRANSACTION_MODE="1", DB_CONN_MAX_AGE="0"
+        )
+        self.assertTrue(database["DISABLE_SERVER_SIDE_CURSORS"])
+        self.assertEqual(database["CONN_MAX_AGE"], 0)
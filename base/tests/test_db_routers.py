@@ -0,0 +1,204 @@
+import importlib
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+from airport.models import Airport
+from airport.tests.base_test_class import BaseApiTest
+from rest_framework_simplejwt.tokens import AccessToken
+
+from base import db_routers
+from base.cache import bump_namespace_versions
+from base.db_routers import (
+    FENCE_KEY,
+    ReplicaRouter,
+    choose_replica,
+    get_read_database,
+    is_fenced,
+    is_pinned_to_primary,
+    lag_monitor,
+)
+from management.models import Order
+
+
+AIRPORT_URL = reverse("airport:airports-list")
+FLIGHT_URL = reverse("management:flights-list")
+ORDER_URL = reverse("management:orders-list")
+ASYNC_FLIGHT_URL = reverse("management:async-flights")
+
+
+class ReplicaSettingsTests(SimpleTestCase):
+    """
+    Test suite for the replica database settings.
+    """
+
+    def test_replicas_from_environment(self):
+        """
+        Test that each replica host gets a database alias copying
+        the primary settings and mirroring it in tests.
+        """
+        env = {
+            "ENVIRONMENT": "docker",
+            "SECRET_KEY": "x",
+            "DB_REPLICA_HOSTS": "replica-1, replica-2",
+        }
+        with mock.patch.dict("os.environ", env), mock.patch("dotenv.load_dotenv"):
+            module = importlib.reload(
+                importlib.import_module("airport_service.settings")
+            )
+        databases, replicas = module.DATABASES, module.REPLICA_DATABASES
+        importlib.reload(module)
+
+        self.assertEqual(replicas, ["replica_1", "replica_2"])
+        self.assertEqual(databases["replica_2"]["HOST"], "replica-2")
+        self.assertEqual(databases["replica_1"]["NAME"], databases["default"]["NAME"])
+        self.assertEqual(databases["replica_1"]["TEST"], {"MIRROR": "default"})
+        self.assertIsNot(
+            databases["replica_1"]["OPTIONS"], databases["default"]["OPTIONS"]
+        )
+
+
+@override_settings(REPLICA_DATABASES=["replica_1", "replica_2"], REPLICA_MAX_LAG=5)
+class ReplicaRouterTests(SimpleTestCase):
+    """
+    Test suite for the replica router and the lag check.
+    """
+
+    def setUp(self):
+        lag_monitor.clear()
+
+    def test_reads_follow_the_request(self):
+        """
+        Test that reads only go to a replica inside requests
+        marked for it, and writes always go to the primary.
+        """
+        router = ReplicaRouter()
+        self.assertIsNone(router.db_for_read(Airport))
+
+        token = db_routers._read_database.set("replica_1")
+        try:
+            self.assertEqual(router.db_for_read(Airport), "replica_1")
+            self.assertEqual(router.db_for_write(Airport), "default")
+        finally:
+            db_routers._read_database.reset(token)
+        self.assertIsNone(get_read_database())
+
+    def test_migrations_only_run_on_primary(self):
+        router = ReplicaRouter()
+        self.assertTrue(router.allow_migrate("default", "airport"))
+        self.assertFalse(router.allow_migrate("replica_1", "airport"))
+
+    def test_lagging_replicas_are_skipped(self):
+        """
+        Test that replicas lagging too far behind or unavailable
+        are not chosen, and the primary is used without any.
+        """
+        lags = {"replica_1": 30.0, "replica_2": 0.5}
+        with mock.patch.object(db_routers, "measure_replica_lag", lags.get):
+            self.assertEqual(choose_replica(), "replica_2")
+
+        lag_monitor.clear()
+        lags = {"replica_1": None, "replica_2": 6.0}
+        with mock.patch.object(db_routers, "measure_replica_lag", lags.get):
+            self.assertIsNone(choose_replica())
+
+    def test_lag_is_measured_periodically(self):
+        """
+        Test that the lag of a replica is measured once per
+        check interval.
+        """
+        with mock.patch.object(
+            db_routers, "measure_replica_lag", return_value=0.0
+        ) as measure:
+            choose_replica()
+            choose_replica()
+        self.assertEqual(measure.call_count, 2)
+
+
+@override_settings(REPLICA_DATABASES=["default"])
+class ReplicaReadMixinTests(BaseApiTest):
+    """
+    Test suite for routing the reads of requests to replicas.
+    The replica alias is the primary itself, so queries run.
+    """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="user@test.com", password="testpassword"
+        )
+        self.client.force_authenticate(self.user)
+        patcher = mock.patch.object(
+            db_routers, "choose_replica", return_value="default"
+        )
+        self.choose_replica = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_catalog_reads_use_replica(self):
+        response = self.client.get(AIRPORT_URL)
+        self.assertEqual(response.status_code, 200)
+        self.choose_replica.assert_called_once()
+
+    def test_only_listed_actions_use_replica(self):
+        """
+        Test that the flight search reads from a replica, but not
+        the flight detail.
+        """
+        self.client.get(FLIGHT_URL)
+        self.assertEqual(self.choose_replica.call_count, 1)
+        self.client.get(reverse("management:flights-detail", args=(1,)))
+        self.assertEqual(self.choose_replica.call_count, 1)
+
+    def test_writes_pin_user_to_primary(self):
+        """
+        Test that a successful write pins the user to the primary,
+        so their next reads see it.
+        """
+        order = Order.objects.create(user=self.user)
+        self.client.get(ORDER_URL)
+        self.assertEqual(self.choose_replica.call_count, 1)
+
+        response = self.client.delete(
+            reverse("management:orders-detail", args=(order.id,))
+        )
+        self.assertEqual(response.status_code, 204)
+        self.assertTrue(is_pinned_to_primary(self.user.pk))
+
+        self.client.get(ORDER_URL)
+        self.assertEqual(self.choose_replica.call_count, 1)
+
+    def test_changed_namespaces_are_read_from_primary(self):
+        """
+        Test that responses cached under a namespace changed
+        within the replica lag bound are read from the primary,
+        so a lagging replica does not fill the new cache entries.
+        """
+        bump_namespace_versions("crew")
+        self.assertTrue(is_fenced(("flight", "crew")))
+        self.client.get(FLIGHT_URL)
+        self.client.get(ORDER_URL)
+        self.assertEqual(self.choose_replica.call_count, 1)
+
+        cache.delete(FENCE_KEY.format(namespace="crew"))
+        self.client.get(FLIGHT_URL, {"limit": 1})
+        self.assertEqual(self.choose_replica.call_count, 2)
+
+    def test_changed_namespaces_are_read_from_primary_by_async_views(self):
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+        bump_namespace_versions("flight")
+        self.client.get(ASYNC_FLIGHT_URL)
+        self.choose_replica.assert_not_called()
+
+        cache.delete(FENCE_KEY.format(namespace="flight"))
+        self.client.get(ASYNC_FLIGHT_URL, {"limit": 1})
+        self.choose_replica.assert_called_once()
+
+    def test_replicas_disabled_without_aliases(self):
+        with override_settings(REPLICA_DATABASES=[]):
+            self.client.get(AIRPORT_URL)
+        self.choose_replica.assert_not_called()
+        self.assertIsNone(get_read_database())
@@ -0,0 +1,113 @@
+import json
+from datetime import datetime
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+
+from airport.models import Airplane, AirplaneType, Airport, Route
+from airport.tests.base_test_class import BaseApiTest
+from management.models import Flight
+
+
+FLIGHT_URL = reverse("management:flights-list")
+ORDER_URL = reverse("management:orders-list")
+
+
+def parse_server_timing(header: str) -> dict:
+    """
+    Parses a `Server-Timing` header into a mapping of metric
+    names to their parameters.
+    """
+    metrics = {}
+    for entry in header.split(", "):
+        name, *params = entry.split(";")
+        metrics[name] = dict(param.split("=", 1) for param in params)
+    return metrics
+
+
+@override_settings(INSTRUMENTATION_SAMPLE_RATE=1)
+class InstrumentationMiddlewareTests(BaseApiTest):
+    """
+    Test suite for the request instrumentation middleware.
+    """
+
+    def setUp(self):
+        """
+        Sets up an authenticated user and a flight.
+        """
+        self.user = get_user_model().objects.create_user(
+            email="test@mail.com", password="test1234"
+        )
+        self.client.force_authenticate(self.user)
+        route = Route.objects.create(
+            source=Airport.objects.create(name="KBP", closest_big_city="Kyiv"),
+            destination=Airport.objects.create(name="LWO", closest_big_city="Lviv"),
+            distance=450,
+        )
+        airplane = Airplane.objects.create(
+            name="UR-0001",
+            rows=10,
+            seats_in_row=4,
+            airplane_type=AirplaneType.objects.create(name="Embraer E190"),
+        )
+        Flight.objects.create(
+            route=route,
+            airplane=airplane,
+            departure_time=datetime(2025, 1, 1, 8),
+            arrival_time=datetime(2025, 1, 1, 10),
+        )
+
+    def test_server_timing_of_page_cache_miss_and_hit(self):
+        """
+        Test that a cold request reports its queries and
+        serialization, and the next one a page cache hit
+        without queries.
+        """
+        with self.assertLogs("base.instrumentation", "INFO") as logs:
+            cold = self.client.get(FLIGHT_URL)
+            warm = self.client.get(FLIGHT_URL)
+
+        cold_timing = parse_server_timing(cold["Server-Timing"])
+        self.assertIn("page-cache-miss", cold_timing)
+        self.assertNotEqual(cold_timing["db"]["desc"], '"0 queries"')
+        self.assertGreater(float(cold_timing["serializer"]["dur"]), 0)
+
+        warm_timing = parse_server_timing(warm["Server-Timing"])
+        self.assertIn("page-cache-hit", warm_timing)
+        self.assertEqual(warm_timing["db"]["desc"], '"0 queries"')
+        self.assertEqual(float(warm_timing["serializer"]["dur"]), 0)
+
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(line["view"], "FlightViewSet.list")
+        self.assertEqual(line["status"], 200)
+        self.assertEqual(line["page_cache"], "miss")
+        self.assertGreater(line["db_queries"], 0)
+        self.assertGreater(line["cache_misses"], 0)
+        self.assertGreater(json.loads(logs.records[1].getMessage())["cache_hits"], 0)
+
+    def test_user_scoped_cache_outcome(self):
+        """
+        Test that responses cached per user report their outcome.
+        """
+        self.client.get(ORDER_URL)
+        response = self.client.get(ORDER_URL)
+        self.assertIn("page-cache-hit", response["Server-Timing"])
+
+    def test_unsampled_requests_are_not_measured(self):
+        """
+        Test that requests outside the sample get no metrics.
+        """
+        with override_settings(INSTRUMENTATION_SAMPLE_RATE=0.5), mock.patch(
+            "base.instrumentation.random.random", return_value=0.9
+        ):
+            response = self.client.get(FLIGHT_URL)
+        self.assertNotIn("Server-Timing", response)
+
+        # Middleware is loaded by the first request of a client.
+        client = self.client_class()
+        client.force_authenticate(self.user)
+        with override_settings(INSTRUMENTATION_SAMPLE_RATE=0):
+            response = client.get(FLIGHT_URL)
+        self.assertNotIn("Server-Timing", response)
@@ -0,0 +1,195 @@
+import threading
+from datetime import datetime
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import AsyncClient, override_settings
+from django.urls import reverse
+from django_redis import get_redis_connection
+
+from airport.models import Airplane, AirplaneType, Airport, Route
+from airport.tests.base_test_class import BaseApiTest
+from base.metrics import METRICS_KEY, buffer, render_metrics
+from management.models import Flight
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+FLIGHT_URL = reverse("management:flights-list")
+ORDER_URL = reverse("management:orders-list")
+METRICS_URL = reverse("metrics")
+
+
+def parse_metrics(text: str) -> dict:
+    """
+    Parses an exposition into a mapping of series to values.
+    """
+    return {
+        series: float(value)
+        for series, value in (
+            line.rsplit(" ", 1) for line in text.splitlines() if line[:1] != "#"
+        )
+    }
+
+
+@override_settings(METRICS_FLUSH_INTERVAL=0, METRICS_TOKEN="secret")
+class MetricsTests(BaseApiTest):
+    """
+    Test suite for the Prometheus metrics.
+    """
+
+    def setUp(self):
+        """
+        Sets up an authenticated user and a flight.
+        """
+        buffer.flush(force=True)
+        get_redis_connection("default").delete(METRICS_KEY)
+        self.user = get_user_model().objects.create_user(
+            email="test@mail.com", password="test1234"
+        )
+        self.client.force_authenticate(self.user)
+        route = Route.objects.create(
+            source=Airport.objects.create(name="KBP", closest_big_city="Kyiv"),
+            destination=Airport.objects.create(name="LWO", closest_big_city="Lviv"),
+            distance=450,
+        )
+        airplane = Airplane.objects.create(
+            name="UR-0001",
+            rows=10,
+            seats_in_row=4,
+            airplane_type=AirplaneType.objects.create(name="Embraer E190"),
+        )
+        self.flight = Flight.objects.create(
+            route=route,
+            airplane=airplane,
+            departure_time=datetime(2025, 1, 1, 8),
+            arrival_time=datetime(2025, 1, 1, 10),
+        )
+
+    def test_request_metrics_per_view_action(self):
+        """
+        Test that requests are counted and timed per view action,
+        with the page cache outcomes of their key prefix.
+        """
+        self.client.get(FLIGHT_URL)
+        self.client.get(FLIGHT_URL)
+
+        response = self.client.get(METRICS_URL, HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        metrics = parse_metrics(response.content.decode())
+
+        view = 'view="FlightViewSet.list"'
+        self.assertEqual(
+            metrics[f'airport_http_requests_total{{method="GET",status="200",{view}}}'],
+            2,
+        )
+        self.assertEqual(
+            metrics[
+                f'airport_http_request_duration_seconds_bucket{{le="+Inf",{view}}}'
+            ],
+            2,
+        )
+        self.assertEqual(
+            metrics[f"airport_http_request_duration_seconds_count{{{view}}}"], 2
+        )
+        self.assertGreater(metrics[f"airport_db_queries_total{{{view}}}"], 0)
+        self.assertEqual(
+            metrics[
+                'airport_page_cache_requests_total{cache="flight_view",result="hit"}'
+            ],
+            1,
+        )
+        self.assertEqual(
+            metrics[
+                'airport_page_cache_requests_total{cache="flight_view",result="miss"}'
+            ],
+            1,
+        )
+        self.assertNotIn("metrics_view", response.content.decode())
+
+    @override_settings(
+        MIDDLEWARE=[
+            name
+            for name in settings.MIDDLEWARE
+            if not name.startswith("debug_toolbar.")
+        ]
+    )
+    async def test_flush_runs_off_the_event_loop(self):
+        """
+        Test that under ASGI the metrics are flushed to Redis in
+        a thread, so the event loop is not blocked. The debug
+        toolbar is left out like in production, as its sync-only
+        middleware would move the chain off the loop.
+        """
+        loop_thread = threading.current_thread()
+        flush_threads = []
+        flush = buffer.flush
+
+        def record_flush(*args, **kwargs):
+            flush_threads.append(threading.current_thread())
+            return flush(*args, **kwargs)
+
+        token = AccessToken.for_user(self.user)
+        with mock.patch.object(buffer, "flush", side_effect=record_flush):
+            response = await AsyncClient().get(
+                reverse("management:async-flights"),
+                headers={"Authorization": f"Bearer {token}"},
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(flush_threads), 1)
+        self.assertIsNot(flush_threads[0], loop_thread)
+        self.assertTrue(
+            get_redis_connection("default").hget(
+                METRICS_KEY,
+                'airport_http_requests_total{method="GET",status="200",'
+                'view="AsyncFlightSearchView.get"}',
+            )
+        )
+
+    def test_sales_and_conflicts(self):
+        """
+        Test that sold tickets and rejected seats are counted.
+        """
+        payload = {"tickets": [{"flight": self.flight.id, "row": 1, "seat": 1}]}
+        self.client.post(ORDER_URL, payload, format="json")
+        self.client.post(ORDER_URL, payload, format="json")
+
+        metrics = parse_metrics(render_metrics())
+        self.assertEqual(metrics["airport_tickets_sold_total"], 1)
+        self.assertEqual(metrics["airport_booking_conflicts_total"], 1)
+
+    def test_histogram_buckets_are_cumulative_and_ordered(self):
+        """
+        Test that histogram buckets are exposed in bound order.
+        """
+        buffer.observe("airport_db_query_duration_seconds", 0.02, view="test")
+
+        lines = [
+            line
+            for line in render_metrics().splitlines()
+            if line.startswith("airport_db_query_duration_seconds_bucket")
+            and 'view="test"' in line
+        ]
+        self.assertIn('le="0.005"', lines[0])
+        self.assertIn('le="+Inf"', lines[-1])
+        values = [float(line.rsplit(" ", 1)[1]) for line in lines]
+        self.assertEqual(values, sorted(values))
+        self.assertEqual(values[:2], [0, 0])
+
+    def test_token_is_required(self):
+        """
+        Test that the scrape endpoint checks the configured token.
+        """
+        self.assertEqual(self.client.get(METRICS_URL).status_code, 403)
+        response = self.client.get(METRICS_URL, HTTP_AUTHORIZATION="Bearer wrong")
+        self.assertEqual(response.status_code, 403)
+        response = self.client.get(METRICS_URL, HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(METRICS_TOKEN=None)
+    def test_not_served_without_token(self):
+        """
+        Test that metrics are never served when no token is set.
+        """
+        self.assertEqual(self.client.get(METRICS_URL).status_code, 403)
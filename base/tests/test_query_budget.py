@@ -0,0 +1,153 @@
+from unittest import mock
+
+from django.db.models import Count
+from django.test import override_settings
+from django.urls import reverse
+
+from airport.models import Airport
+from airport.tests.base_test_class import BaseApiTest
+from base.query_budget import (
+    QueryBudgetExceeded,
+    QueryBudgetTestMixin,
+    query_budget,
+)
+from management.datasets import DatasetBuilder
+from management.models import Flight, Order
+from management.schedule_import import ScheduleImporter
+from management.views import FlightViewSet
+
+
+FLIGHT_URL = reverse("management:flights-list")
+
+SCALE = {
+    "airports": 4,
+    "routes_per_airport": 1,
+    "airplanes": 2,
+    "crews": 4,
+    "months": 1,
+    "flights_per_week": 3,
+    "users": 2,
+}
+
+
+class QueryBudgetTests(BaseApiTest):
+    """
+    Test suite for the query budget context manager and decorator.
+    """
+
+    def test_within_budget(self):
+        """
+        Test that the queries of the block are counted.
+        """
+        with query_budget(2) as counter:
+            list(Airport.objects.all())
+            list(Airport.objects.all())
+        self.assertEqual(len(counter), 2)
+
+    def test_exceeded_budget_lists_queries(self):
+        """
+        Test that exceeding the budget fails with the executed queries.
+        """
+        with self.assertRaises(QueryBudgetExceeded) as error:
+            with query_budget(1):
+                list(Airport.objects.all())
+                list(Flight.objects.all())
+        self.assertIn("2 queries executed, the budget is 1", str(error.exception))
+        self.assertIn("management_flight", str(error.exception))
+
+    def test_decorator(self):
+        """
+        Test that a decorated function is checked against its budget.
+        """
+
+        @query_budget(0)
+        def count_airports():
+            return Airport.objects.count()
+
+        with self.assertRaises(QueryBudgetExceeded):
+            count_airports()
+
+
+class ViewQueryBudgetTests(QueryBudgetTestMixin, BaseApiTest):
+    """
+    Test suite for the query budgets declared on the viewsets.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """
+        Generates a small dataset with enough rows for two pages.
+        """
+        builder = DatasetBuilder(seed=3, scale=SCALE)
+        importer = ScheduleImporter()
+        importer.run(builder.build_schedule())
+        builder.generate_bookings(importer.flight_ids, load_factor=0.1)
+
+    def setUp(self):
+        """
+        Authenticates as the user with the most orders.
+        """
+        user_id = (
+            Order.objects.values("user")
+            .annotate(orders=Count("id"))
+            .order_by("-orders")
+            .values_list("user", flat=True)
+            .first()
+        )
+        self.user = Order.objects.filter(user_id=user_id).first().user
+        self.client.force_authenticate(self.user)
+
+    def test_list_endpoints_are_within_budget(self):
+        """
+        Test that the list endpoints stay within their budgets
+        at any page size.
+        """
+        for url in (
+            FLIGHT_URL,
+            reverse("management:orders-list"),
+            reverse("management:tickets-list"),
+            reverse("airport:airports-list"),
+            reverse("airport:airplanes-list"),
+            reverse("airport:routers-list"),
+            reverse("airport:crews-list"),
+        ):
+            with self.subTest(url=url):
+                self.assertQueryBudget(url)
+
+    def test_queries_scaling_with_page_size_fail(self):
+        """
+        Test that an N+1 query, here crews fetched per flight,
+        is reported.
+        """
+        queryset = Flight.objects.select_related(
+            "route__source", "route__destination", "airplane__airplane_type"
+        )
+        with mock.patch.object(FlightViewSet, "queryset", queryset):
+            with self.assertRaises(AssertionError):
+                self.assertQueryBudget(FLIGHT_URL)
+
+    @override_settings(QUERY_BUDGET_MODE="raise")
+    def test_middleware_raises_over_budget(self):
+        """
+        Test that the middleware fails requests over the budget
+        in `raise` mode.
+        """
+        with mock.patch.object(FlightViewSet, "query_budgets", {"list": 1}):
+            with self.assertRaises(QueryBudgetExceeded) as error:
+                self.client.get(FLIGHT_URL)
+        self.assertIn("FlightViewSet.list", str(error.exception))
+
+    @override_settings(QUERY_BUDGET_MODE="warn")
+    def test_middleware_warns_over_budget(self):
+        """
+        Test that the middleware logs requests over the budget
+        in `warn` mode and leaves the others alone.
+        """
+        with self.assertNoLogs("base.query_budget", "WARNING"):
+            self.client.get(FLIGHT_URL)
+
+        with mock.patch.object(FlightViewSet, "query_budgets", {"list": 1}):
+            with self.assertLogs("base.query_budget", "WARNING") as logs:
+                response = self.client.get(FLIGHT_URL, {"limit": 5})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("FlightViewSet.list", logs.output[0])
@@ -0,0 +1,76 @@
+import importlib
+import runpy
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+
+GUNICORN_CONFIG = Path(settings.BASE_DIR) / "gunicorn.conf.py"
+
+
+class ProductionProfileTests(SimpleTestCase):
+    """
+    Test suite for the production serving profile.
+    """
+
+    def test_settings_strip_debug_tooling(self):
+        """
+        Test that the production settings turn debug mode off and
+        drop the debug toolbar.
+        """
+        with mock.patch.dict("os.environ", {"ALLOWED_HOSTS": "api.example.com, "}):
+            production = importlib.reload(
+                importlib.import_module("airport_service.settings_production")
+            )
+        self.assertFalse(production.DEBUG)
+        self.assertEqual(production.ALLOWED_HOSTS, ["api.example.com"])
+        self.assertNotIn("debug_toolbar", production.INSTALLED_APPS)
+        self.assertFalse(
+            any(name.startswith("debug_toolbar.") for name in production.MIDDLEWARE)
+        )
+        self.assertIn("rest_framework", production.INSTALLED_APPS)
+
+    def test_settings_serve_static_files(self):
+        """
+        Test that the production settings serve the collected
+        static files with WhiteNoise, right after the security
+        middleware.
+        """
+        production = importlib.reload(
+            importlib.import_module("airport_service.settings_production")
+        )
+        self.assertEqual(production.STATIC_ROOT, settings.BASE_DIR / "staticfiles")
+        security = production.MIDDLEWARE.index(
+            "django.middleware.security.SecurityMiddleware"
+        )
+        self.assertEqual(
+            production.MIDDLEWARE[security + 1],
+            "whitenoise.middleware.WhiteNoiseMiddleware",
+        )
+        self.assertEqual(
+            production.STORAGES["staticfiles"]["BACKEND"],
+            "whitenoise.storage.CompressedManifestStaticFilesStorage",
+        )
+
+    def test_gunicorn_workers_are_sized_from_cpus(self):
+        """
+        Test that workers are sized from the available CPUs and
+        the interface selects the application and worker class.
+        """
+        with mock.patch("os.sched_getaffinity", return_value={0, 1, 2}):
+            config = runpy.run_path(str(GUNICORN_CONFIG))
+        self.assertEqual(config["workers"], 7)
+        self.assertEqual(config["worker_class"], "gthread")
+        self.assertEqual(config["wsgi_app"], "airport_service.wsgi:application")
+        self.assertTrue(config["preload_app"])
+
+        env = {"SERVER_INTERFACE": "asgi", "GUNICORN_MAX_WORKERS": "4"}
+        with mock.patch.dict("os.environ", env), mock.patch(
+            "os.sched_getaffinity", return_value=set(range(32))
+        ):
+            config = runpy.run_path(str(GUNICORN_CONFIG))
+        self.assertEqual(config["workers"], 4)
+        self.assertEqual(config["wsgi_app"], "airport_service.asgi:application")
+        self.assertEqual(config["worker_class"], "uvicorn.workers.UvicornWorker")
@@ -0,0 +1,87 @@
+"""
+Gunicorn configuration of the production serving mode.
+
+Run with `gunicorn -c gunicorn.conf.py` and
+`DJANGO_SETTINGS_MODULE=airport_service.settings_production`.
+
+- `SERVER_INTERFACE=wsgi` (default) serves `airport_service/wsgi.py`
+  with threaded workers; `asgi` serves `airport_service/asgi.py`
+  with uvicorn workers, for the async views.
+- Workers are sized from the CPUs available to the process
+  (`2 * CPUs + 1`, capped by `GUNICORN_MAX_WORKERS`), threads per
+  worker default to 4. Each thread may hold a database connection,
+  so keep `workers * threads` below the PostgreSQL connection limit.
+- The application is preloaded in the master process, so workers
+  start fast and share memory. `kill -HUP` restarts the workers
+  gracefully with the new configuration; with preloading, new
+  code needs `GUNICORN_PRELOAD=0` or a full restart
+  (`kill -USR2`, then `kill -WINCH` and `kill -QUIT` the old master).
+- Workers are recycled after `GUNICORN_MAX_REQUESTS` requests
+  (with jitter, so they do not restart at once).
+"""
+
+import os
+
+
+def available_cpus() -> int:
+    """
+    Returns the number of CPUs the process may run on, which
+    respects container CPU sets, unlike `os.cpu_count()`.
+    """
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+cpus = available_cpus()
+interface = os.environ.get("SERVER_INTERFACE", "wsgi")
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(
+    os.environ.get(
+        "GUNICORN_WORKERS",
+        min(2 * cpus + 1, int(os.environ.get("GUNICORN_MAX_WORKERS", 16))),
+    )
+)
+
+if interface == "asgi":
+    wsgi_app = "airport_service.asgi:application"
+    worker_class = "uvicorn.workers.UvicornWorker"
+else:
+    wsgi_app = "airport_service.wsgi:application"
+    worker_class = "gthread"
+    threads = int(os.environ.get("GUNICORN_THREADS", 4))
+
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") == "1"
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 2000))
+max_requests_jitter = max_requests // 10
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 5))
+
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG", "-")
+errorlog = "-"
+forwarded_allow_ips = os.environ.get("FORWARDED_ALLOW_IPS", "*")
+
+
+def post_fork(server, worker):
+    """
+    Drops the database connections inherited from the preloaded
+    master, so workers never share a socket.
+    """
+    from django.db import connections
+
+    connections.close_all()
+
+
+def worker_exit(server, worker):
+    """
+    Flushes the metrics buffered by the worker before it exits.
+    """
+    from django.conf import settings
+
+    if settings.METRICS_ENABLED:
+        from base.metrics import buffer
+
+        buffer.flush(force=True)
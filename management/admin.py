@@ -3,10 +3,12 @@ from django.contrib import admin
 from management.models import (
     Flight,
     Ticket,
-    Order
+    Order,
+    SeatHold,
 )
 
 
 admin.site.register(Flight)
 admin.site.register(Ticket)
 admin.site.register(Order)
+admin.site.register(SeatHold)
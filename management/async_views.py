@@ -0,0 +1,30 @@
+from airport.permissions import IsAdminOrIfAuthenticatedReadOnly
+from base.async_views import AsyncListView
+from management.filters import FlightFilter
+from management.models import Flight
+from management.serializers import FlightListSerializer
+
+
+class AsyncFlightSearchView(AsyncListView):
+    """
+    Async flight search, with the filters and the response of
+    `FlightViewSet.list` (limit/offset pagination only).
+
+    The available seats of the flights come from the denormalized
+    `tickets_sold` counter, loaded with the flight rows.
+
+    Attributes:
+        query_budgets (dict): The queries allowed per request,
+        including the user lookup of the authentication and the
+        crew prefetch.
+    """
+
+    queryset = Flight.objects.select_related(
+        "route__source", "route__destination", "airplane__airplane_type"
+    ).prefetch_related("crew")
+    serializer_class = FlightListSerializer
+    filterset_class = FlightFilter
+    permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    cache_namespace = "flight"
+    cache_depends_on = ("route", "airport", "airplane", "airplane_type", "crew")
+    query_budgets = {"get": 4}
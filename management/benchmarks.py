@@ -0,0 +1,361 @@
+import copy
+import statistics
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, reset_queries
+from django.db.models import Count, F
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework.views import APIView
+
+from base.cache import bump_namespace_versions, user_namespace
+from management.datasets import DatasetBuilder
+from management.models import Flight, Order, Ticket
+from management.schedule_import import ScheduleImporter
+
+
+BENCHMARK_SIZES = {
+    "tiny": {
+        "airports": 6,
+        "routes_per_airport": 2,
+        "airplanes": 4,
+        "crews": 12,
+        "months": 1,
+        "flights_per_week": 2,
+        "users": 50,
+    },
+    "small": {
+        "airports": 12,
+        "routes_per_airport": 3,
+        "airplanes": 10,
+        "crews": 40,
+        "months": 1,
+        "flights_per_week": 3,
+        "users": 200,
+    },
+    "medium": {
+        "airports": 24,
+        "routes_per_airport": 3,
+        "airplanes": 30,
+        "crews": 120,
+        "months": 2,
+        "flights_per_week": 5,
+        "users": 1000,
+    },
+}
+
+CACHE_NAMESPACES = (
+    "flight",
+    "route",
+    "airport",
+    "airplane",
+    "airplane_type",
+    "crew",
+    "order",
+    "ticket",
+    "schedule",
+)
+
+BENCHMARK_CACHE_DB = 15
+BENCHMARK_CACHE_KEY_PREFIX = "benchmark"
+
+
+@contextmanager
+def benchmark_settings():
+    """
+    Isolates benchmark runs from the running services sharing
+    the Redis server: the cache moves to its own database and
+    key prefix, so the namespace bumps of the runner do not
+    invalidate the cached responses of the API, and the metrics
+    middleware is off, so benchmark requests do not show up in
+    the scraped metrics. `DEBUG` is off like in the test runner,
+    so debug-only tooling is not measured.
+
+    The settings, `DEBUG` included, are restored on exit and the
+    benchmark cache database is flushed.
+    """
+    caches = copy.deepcopy(settings.CACHES)
+    caches["default"].update(
+        LOCATION=urlsplit(caches["default"]["LOCATION"])
+        ._replace(path=f"/{BENCHMARK_CACHE_DB}")
+        .geturl(),
+        KEY_PREFIX=BENCHMARK_CACHE_KEY_PREFIX,
+    )
+    with override_settings(CACHES=caches, METRICS_ENABLED=False, DEBUG=False):
+        try:
+            yield
+        finally:
+            cache.clear()
+
+
+@contextmanager
+def throttling_disabled():
+    """
+    Disables the default throttles, which would otherwise answer
+    `429` after the daily rate of the benchmark user.
+    """
+    throttle_classes = APIView.throttle_classes
+    APIView.throttle_classes = ()
+    try:
+        yield
+    finally:
+        APIView.throttle_classes = throttle_classes
+
+
+class BenchmarkRunner:
+    """
+    Runner measuring latency, query count and allocations of
+    the hot API endpoints on a generated dataset.
+
+    Every scenario is requested `repeat` times through the DRF
+    test client. GET scenarios are measured `cold`, with the
+    cache namespaces bumped before each request so responses
+    are rendered from the database, and `warm`, served from the
+    cache. Query counts come from `CaptureQueriesContext` and
+    allocations from `tracemalloc` on a separate request, so
+    tracing does not skew the timings.
+
+    Attributes:
+        repeat (int): The number of timed requests per scenario.
+        seed (int): The dataset seed.
+    """
+
+    def __init__(self, repeat: int = 20, seed: int = 0) -> None:
+        self.repeat = repeat
+        self.seed = seed
+
+    def load_dataset(self, scale: dict) -> dict:
+        """
+        Generates the dataset of a size in the current database.
+        """
+        builder = DatasetBuilder(seed=self.seed, scale=scale)
+        importer = ScheduleImporter()
+        created = importer.run(builder.build_schedule())
+        created.update(builder.generate_bookings(importer.flight_ids))
+        return created
+
+    def run_size(self, size: str, scale: dict) -> list:
+        """
+        Loads the dataset of a size and runs all scenarios on it.
+
+        Args:
+            size (str): The name of the size.
+            scale (dict): The dataset dimensions.
+
+        Returns:
+            list: The scenario results.
+        """
+        created = self.load_dataset(scale)
+        self.client = APIClient()
+        bump_namespace_versions(*CACHE_NAMESPACES)
+        user_id = (
+            Order.objects.values("user")
+            .annotate(orders=Count("id"))
+            .order_by("-orders", "user")
+            .values_list("user", flat=True)
+            .first()
+        )
+        self.user = Order.objects.filter(user_id=user_id).first().user
+        self.client.force_authenticate(self.user)
+
+        results = []
+        with throttling_disabled():
+            for scenario in self.get_scenarios():
+                results.extend(self.run_scenario(size, created, *scenario))
+        return results
+
+    def get_scenarios(self) -> list:
+        """
+        Returns the `(name, method, path, params, payloads)`
+        tuples of the measured requests.
+        """
+        flight = (
+            Flight.objects.select_related("route__source")
+            .order_by("departure_time", "id")
+            .first()
+        )
+        date = flight.departure_time.date()
+        return [
+            ("flights_list", "get", reverse("management:flights-list"), {}, None),
+            (
+                "flights_list_filtered",
+                "get",
+                reverse("management:flights-list"),
+                {
+                    "city_from": flight.route.source.closest_big_city,
+                    "departure_after": date.isoformat(),
+                    "departure_before": (date + timedelta(days=7)).isoformat(),
+                },
+                None,
+            ),
+            (
+                "flights_list_cursor",
+                "get",
+                reverse("management:flights-list"),
+                {"pagination": "cursor"},
+                None,
+            ),
+            (
+                "flights_retrieve",
+                "get",
+                reverse("management:flights-detail", args=(flight.id,)),
+                {},
+                None,
+            ),
+            ("orders_list", "get", reverse("management:orders-list"), {}, None),
+            (
+                "orders_create",
+                "post",
+                reverse("management:orders-list"),
+                {},
+                self.get_order_payloads(),
+            ),
+            ("tickets_list", "get", reverse("management:tickets-list"), {}, None),
+            ("airports_list", "get", reverse("airport:airports-list"), {}, None),
+            ("routes_list", "get", reverse("airport:routers-list"), {}, None),
+            ("airplanes_list", "get", reverse("airport:airplanes-list"), {}, None),
+        ]
+
+    def get_order_payloads(self) -> list:
+        """
+        Returns order payloads of two free seats each, one per
+        request (timed and traced), on flights with free seats.
+        """
+        needed = (self.repeat + 2) * 2
+        seats = []
+        flights = (
+            Flight.objects.select_related("airplane")
+            .filter(tickets_sold__lt=F("airplane__rows") * F("airplane__seats_in_row"))
+            .order_by("departure_time", "id")
+        )
+        for flight in flights.iterator():
+            sold = set(Ticket.objects.filter(flight=flight).values_list("row", "seat"))
+            seats.extend(
+                {"flight": str(flight.id), "row": row, "seat": seat}
+                for row in range(1, flight.airplane.rows + 1)
+                for seat in range(1, flight.airplane.seats_in_row + 1)
+                if (row, seat) not in sold
+            )
+            if len(seats) >= needed:
+                break
+        return [{"tickets": seats[index : index + 2]} for index in range(0, needed, 2)]
+
+    def request(self, method: str, path: str, params: dict, payload):
+        if method == "get":
+            return self.client.get(path, params)
+        return self.client.post(path, payload, format="json")
+
+    def invalidate(self) -> None:
+        bump_namespace_versions(*CACHE_NAMESPACES, user_namespace(self.user.pk))
+
+    def run_scenario(self, size, created, name, method, path, params, payloads):
+        """
+        Measures one scenario, cold and (for GET requests) warm.
+
+        Returns:
+            list: The results of the scenario modes.
+        """
+        modes = ("cold", "warm") if method == "get" else ("cold",)
+        payloads = iter(payloads or ())
+        results = []
+        for mode in modes:
+            timings = []
+            for _ in range(self.repeat):
+                if mode == "cold":
+                    self.invalidate()
+                else:
+                    self.request(method, path, params, None)
+                payload = next(payloads, None)
+                started = time.perf_counter()
+                response = self.request(method, path, params, payload)
+                timings.append((time.perf_counter() - started) * 1000)
+
+            if mode == "cold":
+                self.invalidate()
+            payload = next(payloads, None)
+            # With `DEBUG = True` the bounded log may be full.
+            reset_queries()
+            with CaptureQueriesContext(connection) as queries:
+                self.request(method, path, params, payload)
+            # Counted right away, the next request resets the log.
+            query_count = len(queries)
+
+            if mode == "cold":
+                self.invalidate()
+            payload = next(payloads, None)
+            tracemalloc.start()
+            try:
+                self.request(method, path, params, payload)
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+
+            timings.sort()
+            results.append(
+                {
+                    "size": size,
+                    "dataset": created,
+                    "scenario": name,
+                    "mode": mode,
+                    "method": method.upper(),
+                    "path": path,
+                    "params": params,
+                    "status": response.status_code,
+                    "latency_ms": {
+                        "min": round(timings[0], 3),
+                        "median": round(statistics.median(timings), 3),
+                        "p95": round(
+                            timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+                            3,
+                        ),
+                    },
+                    "queries": query_count,
+                    "alloc_peak_kb": round(peak / 1024, 1),
+                }
+            )
+        return results
+
+
+def result_key(result: dict) -> tuple:
+    return result["size"], result["scenario"], result["mode"]
+
+
+def compare_reports(baseline: dict, report: dict) -> list:
+    """
+    Compares the results of a report with a baseline report,
+    e.g. of the previous commit.
+
+    Args:
+        baseline (dict): The baseline report.
+        report (dict): The current report.
+
+    Returns:
+        list: Per result present in both reports, the key, the
+        median latency change in percent and the query count change.
+    """
+    previous = {result_key(result): result for result in baseline["results"]}
+    changes = []
+    for result in report["results"]:
+        before = previous.get(result_key(result))
+        if before is None:
+            continue
+        median = before["latency_ms"]["median"]
+        changes.append(
+            {
+                "key": result_key(result),
+                "median_change": (
+                    (result["latency_ms"]["median"] - median) / median * 100
+                    if median
+                    else 0.0
+                ),
+                "queries_change": result["queries"] - before["queries"],
+            }
+        )
+    return changes
@@ -0,0 +1,373 @@
+from collections import Counter
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from base.metrics import increment
+from management.models import Flight, SeatHold, Ticket
+from management.seat_map import get_seat_map, mark_seats_sold
+
+
+SEATS_FILTER_LIMIT = 100
+ALLOCATION_ATTEMPTS = 3
+
+
+class SeatsUnavailable(APIException):
+    """
+    Raised when requested seats are sold or held by another
+    user, answered with `409 Conflict` and the taken seats.
+
+    Attributes:
+        seats (list): The taken `(flight_id, row, seat)` triples.
+    """
+
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Some of the requested seats are not available."
+    default_code = "seats_unavailable"
+
+    def __init__(self, seats, detail=None) -> None:
+        super().__init__(detail)
+        increment("airport_booking_conflicts_total")
+        self.seats = sorted(seats, key=lambda seat: (str(seat[0]), seat[1], seat[2]))
+        # Kept apart from `super().__init__`, which would turn
+        # the seat numbers into strings.
+        self.detail = {
+            "detail": self.detail,
+            "seats": [
+                {"flight": flight_id, "row": row, "seat": seat}
+                for flight_id, row, seat in self.seats
+            ],
+        }
+
+
+def seat_key(ticket) -> tuple:
+    """
+    Returns the `(flight_id, row, seat)` triple of a ticket or hold.
+    """
+    return ticket.flight_id, ticket.row, ticket.seat
+
+
+def seats_filter(seats) -> Q:
+    """
+    Builds a filter matching the given seats, i.e.
+    `(flight_id, row, seat) IN (...)`.
+
+    Args:
+        seats (Iterable): The `(flight_id, row, seat)` triples.
+
+    Returns:
+        Q: The filter.
+    """
+    return reduce(
+        or_,
+        (Q(flight_id=flight_id, row=row, seat=seat) for flight_id, row, seat in seats),
+        Q(pk__in=[]),
+    )
+
+
+def lock_flights(flight_ids) -> dict:
+    """
+    Locks the rows of the given flights with `SELECT ... FOR UPDATE`
+    until the end of the transaction, serializing seat allocation
+    per flight. Rows are locked in primary key order, so concurrent
+    bookings spanning several flights cannot deadlock.
+
+    Args:
+        flight_ids (Iterable): The IDs of the flights to lock.
+
+    Returns:
+        dict: The locked flights, with their airplanes, by ID.
+    """
+    flights = (
+        Flight.objects.select_for_update(of=("self",))
+        .select_related("airplane")
+        .filter(pk__in=set(flight_ids))
+        .order_by("pk")
+    )
+    return {flight.pk: flight for flight in flights}
+
+
+def filter_seats(queryset, seats):
+    """
+    Narrows a queryset of tickets or holds down to the given seats.
+
+    Up to `SEATS_FILTER_LIMIT` seats are matched exactly with
+    `(flight_id, row, seat) IN (...)`; larger sets, e.g. block
+    bookings of whole cabins, select the rows of the involved
+    flights instead of sending thousands of conditions, so the
+    caller intersects the result with the seats.
+
+    Args:
+        queryset (QuerySet): Tickets or holds.
+        seats (list): The `(flight_id, row, seat)` triples.
+
+    Returns:
+        QuerySet: The narrowed queryset.
+    """
+    if len(seats) <= SEATS_FILTER_LIMIT:
+        return queryset.filter(seats_filter(seats))
+    return queryset.filter(flight_id__in={flight_id for flight_id, _, _ in seats})
+
+
+def find_taken_seats(seats, user=None) -> set:
+    """
+    Returns the seats that are sold, held by another user,
+    or requested more than once.
+
+    Args:
+        seats (list): The requested `(flight_id, row, seat)` triples.
+        user (User): The user booking the seats; their own
+        active holds do not make a seat taken.
+
+    Returns:
+        set: The taken `(flight_id, row, seat)` triples.
+    """
+    taken = {seat for seat, count in Counter(seats).items() if count > 1}
+    if not seats:
+        return taken
+
+    requested = set(seats)
+    tickets = filter_seats(Ticket.objects.all(), seats)
+    taken.update(
+        requested.intersection(tickets.values_list("flight_id", "row", "seat"))
+    )
+    holds = filter_seats(SeatHold.objects.active(), seats)
+    if user is not None:
+        holds = holds.exclude(user=user)
+    taken.update(requested.intersection(holds.values_list("flight_id", "row", "seat")))
+    return taken
+
+
+@transaction.atomic
+def hold_seats(user, seats) -> list:
+    """
+    Holds seats for a user for `SEAT_HOLD_TIMEOUT` seconds.
+
+    Holding a seat the user already holds extends the hold.
+    Expired holds of the requested seats are purged first.
+
+    Args:
+        user (User): The user holding the seats.
+        seats (list): The `(flight_id, row, seat)` triples.
+
+    Returns:
+        list: The created `SeatHold` instances.
+
+    Raises:
+        SeatsUnavailable: If any of the seats is taken.
+    """
+    seats = list(seats)
+    lock_flights(flight_id for flight_id, _, _ in seats)
+
+    now = timezone.now()
+    SeatHold.objects.filter(
+        Q(expires_at__lte=now) | Q(user=user), seats_filter(seats)
+    ).delete()
+    taken = find_taken_seats(seats, user=user)
+    if taken:
+        raise SeatsUnavailable(taken)
+
+    expires_at = now + timedelta(seconds=settings.SEAT_HOLD_TIMEOUT)
+    holds = [
+        SeatHold(
+            flight_id=flight_id, row=row, seat=seat, user=user, expires_at=expires_at
+        )
+        for flight_id, row, seat in seats
+    ]
+    try:
+        with transaction.atomic():
+            SeatHold.objects.bulk_create(holds)
+    except IntegrityError:
+        raise SeatsUnavailable(find_taken_seats(seats, user=user) or seats)
+    return holds
+
+
+def release_holds(user, seats) -> None:
+    """
+    Releases holds of the given seats owned by the user.
+
+    Args:
+        user (User): The user holding the seats.
+        seats (list): The `(flight_id, row, seat)` triples.
+    """
+    seats = set(seats)
+    held = SeatHold.objects.filter(
+        user=user, flight_id__in={flight_id for flight_id, _, _ in seats}
+    ).values_list("pk", "flight_id", "row", "seat")
+    pks = [pk for pk, *seat in held if tuple(seat) in seats]
+    if pks:
+        SeatHold.objects.filter(pk__in=pks).delete()
+
+
+@transaction.atomic
+def book_tickets(tickets, user, batch_size=None) -> list:
+    """
+    Inserts tickets, allocating their seats under per-flight
+    row locks.
+
+    The flights are locked, the seats are checked against sold
+    tickets and holds of other users, and the tickets are
+    inserted in bulk. The `unique_ticket` constraint remains
+    the last line of defence: a violation is reported as
+    a conflict instead of an error. The `tickets_sold` counters
+    and seat maps are updated, and the user's holds of the
+    booked seats are released.
+
+    Args:
+        tickets (list): Unsaved `Ticket` instances.
+        user (User): The user booking the tickets.
+        batch_size (int): The number of rows per `INSERT`,
+        all at once by default.
+
+    Returns:
+        list: The inserted tickets.
+
+    Raises:
+        SeatsUnavailable: If any of the seats is taken.
+    """
+    seats = [seat_key(ticket) for ticket in tickets]
+    flights = lock_flights(flight_id for flight_id, _, _ in seats)
+    for ticket in tickets:
+        if not Ticket.flight.is_cached(ticket):
+            ticket.flight = flights[ticket.flight_id]
+
+    taken = find_taken_seats(seats, user=user)
+    if taken:
+        raise SeatsUnavailable(taken)
+
+    try:
+        with transaction.atomic():
+            Ticket.objects.bulk_create(tickets, batch_size=batch_size)
+    except IntegrityError:
+        raise SeatsUnavailable(find_taken_seats(seats, user=user) or seats)
+
+    Flight.adjust_tickets_sold(Counter(ticket.flight_id for ticket in tickets))
+    mark_seats_sold(tickets)
+    release_holds(user, seats)
+    increment("airport_tickets_sold_total", len(tickets))
+    return tickets
+
+
+def delete_tickets(tickets) -> None:
+    """
+    Deletes tickets with a single queryset `delete()`.
+
+    The `tickets_sold` counters, seat maps and cache namespaces
+    of all the deleted tickets are updated at once by the ticket
+    delete signal receivers, so the number of queries does not
+    grow with the number of tickets.
+
+    Args:
+        tickets (list): The `Ticket` instances to delete.
+    """
+    Ticket.objects.filter(pk__in=[ticket.pk for ticket in tickets]).delete()
+
+
+@transaction.atomic
+def update_order_tickets(order, seats) -> tuple:
+    """
+    Replaces the tickets of an order with the given seats by
+    applying only the difference.
+
+    Tickets of seats that are kept are left untouched (keeping
+    their IDs), tickets of seats that are gone are deleted at
+    once with `delete_tickets`, and
+    new seats are booked with `book_tickets`, all under the row
+    locks of the involved flights, so released seats cannot be
+    taken by other buyers in between.
+
+    Args:
+        order (Order): The order to update.
+        seats (list): The requested `(flight_id, row, seat)` triples.
+
+    Returns:
+        tuple: The added and the removed tickets.
+
+    Raises:
+        SeatsUnavailable: If any of the new seats is taken
+        or a seat is requested more than once.
+    """
+    duplicates = {seat for seat, count in Counter(seats).items() if count > 1}
+    if duplicates:
+        raise SeatsUnavailable(duplicates)
+
+    current = {seat_key(ticket): ticket for ticket in order.tickets.all()}
+    lock_flights(
+        {flight_id for flight_id, _, _ in seats}
+        | {flight_id for flight_id, _, _ in current}
+    )
+
+    requested = set(seats)
+    removed = [ticket for seat, ticket in current.items() if seat not in requested]
+    added = [
+        Ticket(flight_id=flight_id, row=row, seat=seat, order=order)
+        for flight_id, row, seat in seats
+        if (flight_id, row, seat) not in current
+    ]
+
+    if removed:
+        delete_tickets(removed)
+    if added:
+        book_tickets(added, order.user)
+    return added, removed
+
+
+@transaction.atomic
+def allocate_seats(order, flight, party_size, together=True, preference=None):
+    """
+    Finds and books the best available seats of a flight for
+    a party.
+
+    The flight is locked, free seats are looked up in its cached
+    seat map (see `SeatMap.find_seats`) with seats held by other
+    users marked as taken, and the chosen seats are booked with
+    `book_tickets`. If the cached map missed a sale, the taken
+    seats are marked and another block is tried.
+
+    Args:
+        order (Order): The order to add the tickets to.
+        flight (Flight): The flight.
+        party_size (int): The number of seats.
+        together (bool): Whether the seats must be adjacent.
+        preference (str): `window`, `aisle` or None.
+
+    Returns:
+        list: The booked tickets.
+
+    Raises:
+        SeatsUnavailable: If there are not enough free seats.
+    """
+    flight = lock_flights([flight.pk])[flight.pk]
+    seat_map = get_seat_map(flight)
+    held = (
+        SeatHold.objects.active()
+        .filter(flight=flight)
+        .exclude(user=order.user)
+        .values_list("row", "seat")
+    )
+    for row, seat in held:
+        seat_map.mark_sold(row, seat)
+
+    detail = f"No {party_size} {'adjacent ' if together else ''}seats available."
+    for _ in range(ALLOCATION_ATTEMPTS):
+        seats = seat_map.find_seats(party_size, together, preference)
+        if seats is None:
+            break
+        tickets = [
+            Ticket(flight=flight, row=row, seat=seat, order=order)
+            for row, seat in seats
+        ]
+        try:
+            return book_tickets(tickets, order.user)
+        except SeatsUnavailable as error:
+            taken = error.seats or [(flight.pk, row, seat) for row, seat in seats]
+            for _, row, seat in taken:
+                seat_map.mark_sold(row, seat)
+    raise SeatsUnavailable([], detail=detail)
@@ -0,0 +1,342 @@
+import math
+import random
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from base.cache import batched_invalidation
+from management.models import Flight, Order, Ticket
+
+
+CITIES = (
+    ("KBP", "Kyiv"),
+    ("LWO", "Lviv"),
+    ("ODS", "Odesa"),
+    ("WAW", "Warsaw"),
+    ("KRK", "Krakow"),
+    ("BER", "Berlin"),
+    ("MUC", "Munich"),
+    ("FRA", "Frankfurt"),
+    ("VIE", "Vienna"),
+    ("PRG", "Prague"),
+    ("BUD", "Budapest"),
+    ("OTP", "Bucharest"),
+    ("SOF", "Sofia"),
+    ("ATH", "Athens"),
+    ("IST", "Istanbul"),
+    ("FCO", "Rome"),
+    ("MXP", "Milan"),
+    ("CDG", "Paris"),
+    ("AMS", "Amsterdam"),
+    ("BRU", "Brussels"),
+    ("LHR", "London"),
+    ("DUB", "Dublin"),
+    ("MAD", "Madrid"),
+    ("BCN", "Barcelona"),
+    ("LIS", "Lisbon"),
+    ("CPH", "Copenhagen"),
+    ("ARN", "Stockholm"),
+    ("OSL", "Oslo"),
+    ("HEL", "Helsinki"),
+    ("RIX", "Riga"),
+    ("VNO", "Vilnius"),
+    ("TLL", "Tallinn"),
+)
+
+AIRPLANE_TYPES = (
+    ("Embraer E190", 25, 4),
+    ("Airbus A320", 30, 6),
+    ("Boeing 737-800", 32, 6),
+    ("Airbus A321", 36, 6),
+    ("Boeing 787-9", 40, 9),
+    ("Airbus A330-300", 42, 8),
+)
+
+FIRST_NAMES = (
+    "Olena",
+    "Andrii",
+    "Maria",
+    "Taras",
+    "Iryna",
+    "Dmytro",
+    "Sofia",
+    "Oleh",
+    "Anna",
+    "Maksym",
+    "Kateryna",
+    "Serhii",
+    "Yulia",
+    "Bohdan",
+)
+LAST_NAMES = (
+    "Shevchenko",
+    "Kovalenko",
+    "Bondarenko",
+    "Tkachenko",
+    "Kravchenko",
+    "Melnyk",
+    "Boyko",
+    "Koval",
+    "Oliynyk",
+    "Lysenko",
+    "Moroz",
+    "Savchenko",
+)
+
+DATASET_SCALES = {
+    "small": {
+        "airports": 12,
+        "routes_per_airport": 3,
+        "airplanes": 10,
+        "crews": 40,
+        "months": 1,
+        "flights_per_week": 3,
+        "users": 100,
+    },
+    "medium": {
+        "airports": 32,
+        "routes_per_airport": 4,
+        "airplanes": 50,
+        "crews": 200,
+        "months": 3,
+        "flights_per_week": 7,
+        "users": 2000,
+    },
+    "large": {
+        "airports": 100,
+        "routes_per_airport": 4,
+        "airplanes": 150,
+        "crews": 600,
+        "months": 6,
+        "flights_per_week": 7,
+        "users": 20000,
+    },
+}
+
+
+class DatasetBuilder:
+    """
+    Builder of realistic, reproducible datasets for benchmarks
+    and profiling.
+
+    All choices are drawn from a `random.Random` seeded with
+    `seed`, so the same seed and scale always produce the same
+    airports, routes, fleet, crews, flights and bookings
+    (primary keys are random UUIDs as usual).
+
+    The schedule is built as records for `ScheduleImporter`, so
+    it is inserted with the same bulk import path. Users, orders
+    and tickets are then generated in bulk at the target load
+    factor, and the `tickets_sold` counters are set accordingly.
+
+    Attributes:
+        seed (int): The random seed.
+        scale (dict): The dataset dimensions (see `DATASET_SCALES`).
+        start (date): The first day of the schedule.
+        batch_size (int): The number of rows per `INSERT`.
+    """
+
+    def __init__(self, seed: int = 0, scale=None, start=None, batch_size=5000):
+        self.seed = seed
+        self.scale = {**DATASET_SCALES["small"], **(scale or {})}
+        self.start = start or datetime(2025, 1, 1).date()
+        self.batch_size = batch_size
+
+    def build_schedule(self) -> dict:
+        """
+        Builds the schedule records: airports spread over a map,
+        routes between nearby airports in both directions,
+        a fleet of common airplane types, crews, and flights on
+        every route over the configured number of months.
+
+        Returns:
+            dict: Records per section, see `SCHEDULE_SECTIONS`.
+        """
+        rng = random.Random(self.seed)
+        scale = self.scale
+
+        airports = []
+        for index in range(scale["airports"]):
+            code, city = CITIES[index % len(CITIES)]
+            suffix = index // len(CITIES)
+            airports.append(
+                {
+                    "name": f"{code}{suffix or ''}",
+                    "closest_big_city": city,
+                    "position": (rng.uniform(0, 3000), rng.uniform(0, 2000)),
+                }
+            )
+
+        routes = {}
+        for airport in airports:
+            others = sorted(
+                (other for other in airports if other is not airport),
+                key=lambda other: math.dist(airport["position"], other["position"]),
+            )
+            for other in others[: scale["routes_per_airport"]]:
+                distance = max(
+                    150, round(math.dist(airport["position"], other["position"]))
+                )
+                for source, destination in ((airport, other), (other, airport)):
+                    routes[(source["name"], destination["name"])] = distance
+
+        airplanes = []
+        for index in range(scale["airplanes"]):
+            type_name, rows, seats_in_row = rng.choice(AIRPLANE_TYPES)
+            airplanes.append(
+                {
+                    "name": f"UR-{index + 1:04}",
+                    "rows": rows,
+                    "seats_in_row": seats_in_row,
+                    "airplane_type": type_name,
+                }
+            )
+
+        crews = []
+        for index in range(scale["crews"]):
+            first_name = FIRST_NAMES[index % len(FIRST_NAMES)]
+            last_name = LAST_NAMES[(index // len(FIRST_NAMES)) % len(LAST_NAMES)]
+            suffix = index // (len(FIRST_NAMES) * len(LAST_NAMES))
+            crews.append(
+                {
+                    "first_name": first_name,
+                    "last_name": f"{last_name}{f'-{suffix}' if suffix else ''}",
+                }
+            )
+        crew_names = [f"{crew['first_name']} {crew['last_name']}" for crew in crews]
+
+        flights = []
+        days = scale["months"] * 30
+        for (source, destination), distance in sorted(routes.items()):
+            duration = timedelta(minutes=30 + round(distance / 800 * 60))
+            for day in range(days):
+                if rng.random() >= scale["flights_per_week"] / 7:
+                    continue
+                departure = datetime.combine(
+                    self.start + timedelta(days=day), time(rng.randint(6, 22))
+                ) + timedelta(minutes=5 * rng.randrange(12))
+                flights.append(
+                    {
+                        "source": source,
+                        "destination": destination,
+                        "airplane": rng.choice(airplanes)["name"],
+                        "departure_time": departure.isoformat(),
+                        "arrival_time": (departure + duration).isoformat(),
+                        "crew": rng.sample(crew_names, min(len(crew_names), 3)),
+                    }
+                )
+
+        return {
+            "airplane_types": [{"name": name} for name, _, _ in AIRPLANE_TYPES],
+            "airports": [
+                {
+                    "name": airport["name"],
+                    "closest_big_city": airport["closest_big_city"],
+                }
+                for airport in airports
+            ],
+            "airplanes": airplanes,
+            "crews": crews,
+            "routes": [
+                {"source": source, "destination": destination, "distance": distance}
+                for (source, destination), distance in sorted(routes.items())
+            ],
+            "flights": flights,
+        }
+
+    def create_users(self) -> list:
+        """
+        Inserts the passenger accounts, all with the password
+        `password`, hashed once.
+
+        Returns:
+            list: The IDs of the users.
+        """
+        password = make_password("password")
+        users = [
+            get_user_model()(
+                email=f"passenger{self.seed}-{index}@example.com", password=password
+            )
+            for index in range(self.scale["users"])
+        ]
+        get_user_model().objects.bulk_create(
+            users, batch_size=self.batch_size, ignore_conflicts=True
+        )
+        return list(
+            get_user_model()
+            .objects.filter(email__in=[user.email for user in users])
+            .order_by("email")
+            .values_list("id", flat=True)
+        )
+
+    def generate_bookings(self, flight_ids, load_factor: float = 0.8) -> dict:
+        """
+        Books seats on the flights generated by this run, in
+        orders of 1-4 tickets of random users, at about
+        `load_factor` of the airplane capacity.
+
+        Args:
+            flight_ids (list): The IDs of the generated flights,
+            see `ScheduleImporter.flight_ids`.
+            load_factor (float): The average share of sold seats.
+
+        Returns:
+            dict: The number of created users, orders and tickets.
+
+        Raises:
+            ValueError: If the scale has no users.
+        """
+        if self.scale["users"] < 1:
+            raise ValueError("Bookings need at least one user.")
+        rng = random.Random(self.seed + 1)
+        user_ids = self.create_users()
+        created = {"users": len(user_ids), "orders": 0, "tickets": 0}
+        capacities = {}
+        for offset in range(0, len(flight_ids), self.batch_size):
+            capacities.update(
+                (flight_id, (rows, seats_in_row))
+                for flight_id, rows, seats_in_row in Flight.objects.filter(
+                    id__in=flight_ids[offset : offset + self.batch_size]
+                ).values_list("id", "airplane__rows", "airplane__seats_in_row")
+            )
+
+        with batched_invalidation(), transaction.atomic():
+            orders, tickets, counters = [], [], []
+            for flight_id in flight_ids:
+                rows, seats_in_row = capacities[flight_id]
+                capacity = rows * seats_in_row
+                sold = min(
+                    capacity, round(capacity * load_factor * rng.uniform(0.7, 1.3))
+                )
+                offsets = rng.sample(range(capacity), sold)
+                while offsets:
+                    order = Order(user_id=rng.choice(user_ids))
+                    orders.append(order)
+                    for _ in range(min(len(offsets), rng.randint(1, 4))):
+                        offset = offsets.pop()
+                        tickets.append(
+                            Ticket(
+                                flight_id=flight_id,
+                                row=offset // seats_in_row + 1,
+                                seat=offset % seats_in_row + 1,
+                                order=order,
+                            )
+                        )
+                counters.append(Flight(id=flight_id, tickets_sold=sold))
+
+                if len(tickets) >= self.batch_size:
+                    self.insert_bookings(orders, tickets, counters, created)
+                    orders, tickets, counters = [], [], []
+            self.insert_bookings(orders, tickets, counters, created)
+        return created
+
+    def insert_bookings(self, orders, tickets, counters, created: dict) -> None:
+        Order.objects.bulk_create(orders, batch_size=self.batch_size)
+        Ticket.objects.bulk_create(tickets, batch_size=self.batch_size)
+        Flight.objects.bulk_update(
+            counters, ["tickets_sold"], batch_size=self.batch_size
+        )
+        created["orders"] += len(orders)
+        created["tickets"] += len(tickets)
@@ -0,0 +1,182 @@
+import csv
+import json
+
+from django.db.models import Count
+
+from management.models import Flight, Order, Ticket
+
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+class Export:
+    """
+    Description of a streaming export of a model.
+
+    Rows are read with `values_list(...).iterator(chunk_size=...)`,
+    which uses a server-side cursor on PostgreSQL, and rendered
+    straight from the tuples without serializers, so memory use
+    does not depend on the size of the table.
+
+    Attributes:
+        queryset (QuerySet): The exported rows.
+        columns (tuple): `(header, lookup)` pairs of the columns.
+        date_field (str): The lookup the `since`/`until` range
+        applies to; rows are exported in its order.
+    """
+
+    def __init__(self, queryset, columns: tuple, date_field: str) -> None:
+        self.queryset = queryset
+        self.columns = columns
+        self.date_field = date_field
+
+    @property
+    def headers(self) -> list:
+        return [header for header, _ in self.columns]
+
+    def rows(self, since=None, until=None, chunk_size: int = EXPORT_CHUNK_SIZE):
+        """
+        Iterates over the exported rows.
+
+        Args:
+            since (datetime): Only rows at or after this moment.
+            until (datetime): Only rows before this moment.
+            chunk_size (int): The number of rows fetched at once.
+
+        Returns:
+            Iterator[tuple]: The row values.
+        """
+        queryset = self.queryset
+        if since is not None:
+            queryset = queryset.filter(**{f"{self.date_field}__gte": since})
+        if until is not None:
+            queryset = queryset.filter(**{f"{self.date_field}__lt": until})
+        return (
+            queryset.order_by(self.date_field, "id")
+            .values_list(*(lookup for _, lookup in self.columns))
+            .iterator(chunk_size=chunk_size)
+        )
+
+
+EXPORTS = {
+    "flights": Export(
+        Flight.objects.all(),
+        (
+            ("id", "id"),
+            ("source", "route__source__name"),
+            ("source_city", "route__source__closest_big_city"),
+            ("destination", "route__destination__name"),
+            ("destination_city", "route__destination__closest_big_city"),
+            ("distance", "route__distance"),
+            ("airplane", "airplane__name"),
+            ("departure_time", "departure_time"),
+            ("arrival_time", "arrival_time"),
+            ("tickets_sold", "tickets_sold"),
+        ),
+        date_field="departure_time",
+    ),
+    "orders": Export(
+        Order.objects.annotate(tickets_count=Count("tickets")),
+        (
+            ("id", "id"),
+            ("created_at", "created_at"),
+            ("user", "user__email"),
+            ("tickets", "tickets_count"),
+        ),
+        date_field="created_at",
+    ),
+    "tickets": Export(
+        Ticket.objects.all(),
+        (
+            ("id", "id"),
+            ("order", "order_id"),
+            ("ordered_at", "order__created_at"),
+            ("user", "order__user__email"),
+            ("flight", "flight_id"),
+            ("source", "flight__route__source__name"),
+            ("destination", "flight__route__destination__name"),
+            ("departure_time", "flight__departure_time"),
+            ("row", "row"),
+            ("seat", "seat"),
+        ),
+        date_field="order__created_at",
+    ),
+}
+
+
+def format_value(value):
+    if value is None:
+        return None
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if isinstance(value, (int, float, str)):
+        return value
+    return str(value)
+
+
+class _Echo:
+    """
+    File-like object returning what is written to it, letting
+    `csv.writer` render one line at a time.
+    """
+
+    def write(self, value):
+        return value
+
+
+def render_csv(headers, rows):
+    """
+    Renders rows as CSV lines, starting with the headers.
+
+    Args:
+        headers (list): The column headers.
+        rows (Iterable[tuple]): The row values.
+
+    Returns:
+        Iterator[str]: The CSV lines.
+    """
+    writer = csv.writer(_Echo())
+    yield writer.writerow(headers)
+    for row in rows:
+        yield writer.writerow([format_value(value) for value in row])
+
+
+def render_ndjson(headers, rows):
+    """
+    Renders rows as newline-delimited JSON objects.
+
+    Args:
+        headers (list): The object keys.
+        rows (Iterable[tuple]): The row values.
+
+    Returns:
+        Iterator[str]: The JSON lines.
+    """
+    for row in rows:
+        yield json.dumps(
+            dict(zip(headers, (format_value(value) for value in row)))
+        ) + "\n"
+
+
+RENDERERS = {
+    "csv": (render_csv, "text/csv"),
+    "ndjson": (render_ndjson, "application/x-ndjson"),
+}
+
+
+def stream_export(name: str, output: str = "csv", since=None, until=None):
+    """
+    Streams an export in the given output format.
+
+    Args:
+        name (str): The export name, a key of `EXPORTS`.
+        output (str): `csv` or `ndjson`.
+        since (datetime): Only rows at or after this moment.
+        until (datetime): Only rows before this moment.
+
+    Returns:
+        Iterator[str]: The rendered lines.
+    """
+    export = EXPORTS[name]
+    render, _ = RENDERERS[output]
+    return render(export.headers, export.rows(since=since, until=until))
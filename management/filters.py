@@ -1,3 +1,7 @@
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.utils.timezone import make_aware
 from django_filters import rest_framework as filters
 
 from management.models import Flight
@@ -6,6 +10,24 @@ from management.models import Flight
 class FlightFilter(filters.FilterSet):
     """
     Filter class for filtering flights based on various criteria.
+
+    Date and time filters compile to range predicates
+    (`>=` / `<` on the timestamp column), so they are served
+    by the `departure_time` indexes instead of casting the
+    timestamps to text.
+
+    Filters:
+        city_from, city_to: Source and destination cities
+        (case-insensitive substring).
+        departure_date, arrival_date: Flights departing or
+        arriving on a date (`YYYY-MM-DD`); `departure_time`
+        is kept as an alias of `departure_date`.
+        departure_after, arrival_after: Flights departing or
+        arriving at or after a date/time.
+        departure_before, arrival_before: Flights departing or
+        arriving strictly before a date/time.
+        departure_window_after/_before,
+        arrival_window_after/_before: Inclusive date/time range.
     """
 
     city_from = filters.CharFilter(
@@ -15,9 +37,62 @@ class FlightFilter(filters.FilterSet):
         field_name="route__destination__closest_big_city", lookup_expr="icontains"
     )
     departure_time = filters.DateFilter(
-        field_name="departure_time", lookup_expr="icontains"
+        field_name="departure_time", method="filter_by_date"
+    )
+    departure_date = filters.DateFilter(
+        field_name="departure_time", method="filter_by_date"
+    )
+    departure_after = filters.DateTimeFilter(
+        field_name="departure_time", lookup_expr="gte"
+    )
+    departure_before = filters.DateTimeFilter(
+        field_name="departure_time", lookup_expr="lt"
     )
+    departure_window = filters.DateTimeFromToRangeFilter(field_name="departure_time")
+    arrival_date = filters.DateFilter(
+        field_name="arrival_time", method="filter_by_date"
+    )
+    arrival_after = filters.DateTimeFilter(
+        field_name="arrival_time", lookup_expr="gte"
+    )
+    arrival_before = filters.DateTimeFilter(
+        field_name="arrival_time", lookup_expr="lt"
+    )
+    arrival_window = filters.DateTimeFromToRangeFilter(field_name="arrival_time")
 
     class Meta:
         model = Flight
-        fields = ("city_from", "city_to", "departure_time")
+        fields = (
+            "city_from",
+            "city_to",
+            "departure_time",
+            "departure_date",
+            "departure_after",
+            "departure_before",
+            "departure_window",
+            "arrival_date",
+            "arrival_after",
+            "arrival_before",
+            "arrival_window",
+        )
+
+    @staticmethod
+    def filter_by_date(queryset, name, value):
+        """
+        Filters a timestamp field by a calendar date with
+        a half-open range `[date, date + 1 day)`.
+
+        Args:
+            queryset (QuerySet): The flights queryset.
+            name (str): The timestamp field name.
+            value (date): The date to filter by.
+
+        Returns:
+            QuerySet: The filtered queryset.
+        """
+        start = datetime.combine(value, time.min)
+        if settings.USE_TZ:
+            start = make_aware(start)
+        return queryset.filter(
+            **{f"{name}__gte": start, f"{name}__lt": start + timedelta(days=1)}
+        )
@@ -0,0 +1,281 @@
+import logging
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import timedelta
+from heapq import heappush, heapreplace
+from itertools import count
+from typing import NamedTuple
+
+from django.db import connection
+from django.utils import timezone
+
+from base.cache import get_namespace_versions
+from airport.models import Airport
+from management.models import Flight
+
+
+ITINERARY_INDEX_NAMESPACES = ("schedule", "route", "airport")
+ITINERARY_INDEX_MAX_AGE = 60 * 5
+ITINERARY_INDEX_HORIZON = timedelta(days=90)
+
+logger = logging.getLogger(__name__)
+
+
+class Leg(NamedTuple):
+    """
+    A flight as an edge of the airport graph.
+    """
+
+    flight_id: object
+    source_id: object
+    destination_id: object
+    departure_time: object
+    arrival_time: object
+    distance: int
+
+
+class ItineraryIndex:
+    """
+    In-memory, time-dependent adjacency index of the flight network.
+
+    Airports are the nodes and flights the edges. For every
+    source airport the departing legs are kept sorted by departure
+    time, next to a parallel list of departure times, so the legs
+    departing within a time window are found with two bisections.
+
+    Attributes:
+        departures (dict): Source airport id to its legs,
+        sorted by departure time.
+        departure_times (dict): Source airport id to the sorted
+        departure times of its legs.
+        airports (dict): Airport id to `(name, closest_big_city)`.
+        airports_by_city (dict): Lower-cased city to airport ids.
+    """
+
+    def __init__(self, legs, airports: dict) -> None:
+        self.departures = defaultdict(list)
+        for leg in sorted(legs, key=lambda leg: leg.departure_time):
+            self.departures[leg.source_id].append(leg)
+        self.departure_times = {
+            source_id: [leg.departure_time for leg in source_legs]
+            for source_id, source_legs in self.departures.items()
+        }
+        self.airports = airports
+        self.airports_by_city = defaultdict(set)
+        for airport_id, (_, city) in airports.items():
+            self.airports_by_city[city.lower()].add(airport_id)
+
+    @classmethod
+    def build(cls) -> "ItineraryIndex":
+        """
+        Builds the index from two flat queries over flights
+        and airports. Only flights departing from now until
+        `ITINERARY_INDEX_HORIZON` are indexed, served by the
+        `departure_time` index, so past flights never load.
+        """
+        now = timezone.now()
+        legs = [
+            Leg(*row)
+            for row in Flight.objects.filter(
+                departure_time__gte=now,
+                departure_time__lt=now + ITINERARY_INDEX_HORIZON,
+            )
+            .order_by()
+            .values_list(
+                "id",
+                "route__source_id",
+                "route__destination_id",
+                "departure_time",
+                "arrival_time",
+                "route__distance",
+            )
+            .iterator(chunk_size=5000)
+        ]
+        airports = {
+            airport_id: (name, city)
+            for airport_id, name, city in Airport.objects.values_list(
+                "id", "name", "closest_big_city"
+            )
+        }
+        return cls(legs, airports)
+
+    def legs_departing(self, source_id, after, before) -> list:
+        """
+        Returns the legs leaving an airport within `[after, before]`.
+        """
+        times = self.departure_times.get(source_id)
+        if not times:
+            return []
+        start = bisect_left(times, after)
+        end = bisect_right(times, before)
+        return self.departures[source_id][start:end]
+
+    def search(
+        self,
+        city_from: str,
+        city_to: str,
+        departure_after,
+        departure_before,
+        max_legs: int = 2,
+        min_connection: timedelta = timedelta(minutes=45),
+        max_connection: timedelta = timedelta(hours=24),
+        limit: int = 10,
+    ) -> list:
+        """
+        Finds itineraries of 1 to `max_legs` flights between
+        two cities.
+
+        The first flight departs within the departure window,
+        every connection leaves the arrival airport between
+        `min_connection` and `max_connection` after landing,
+        and no airport is visited twice.
+
+        Only the `limit` best itineraries found so far are kept,
+        in a heap. Extending a path only makes it arrive later,
+        so once the heap is full, paths lasting at least as long
+        as its worst itinerary and connections departing after
+        that duration are not explored.
+
+        Args:
+            city_from (str): The source city (case-insensitive).
+            city_to (str): The destination city (case-insensitive).
+            departure_after (datetime): The earliest departure.
+            departure_before (datetime): The latest departure.
+            max_legs (int): The maximum number of flights.
+            min_connection (timedelta): The minimum connection time.
+            max_connection (timedelta): The maximum connection time.
+            limit (int): The maximum number of itineraries.
+
+        Returns:
+            list: Itineraries as lists of `Leg`, ordered by total
+            duration, number of legs and distance.
+        """
+        origins = self.airports_by_city.get(city_from.lower(), set())
+        targets = self.airports_by_city.get(city_to.lower(), set())
+        # Max-heap of the best itineraries, as negated ranking keys
+        # (duration, legs, distance, discovery order) and the legs.
+        best = []
+        found = count()
+
+        def offer(path):
+            entry = (
+                path[0].departure_time - path[-1].arrival_time,
+                -len(path),
+                -sum(leg.distance for leg in path),
+                -next(found),
+                list(path),
+            )
+            if len(best) < limit:
+                heappush(best, entry)
+            elif entry > best[0]:
+                heapreplace(best, entry)
+
+        def beaten(path, moment):
+            return len(best) == limit and moment - path[0].departure_time >= -best[0][0]
+
+        def extend(path, visited):
+            last = path[-1]
+            if last.destination_id in targets:
+                offer(path)
+                return
+            if len(path) == max_legs or beaten(path, last.arrival_time):
+                return
+            for leg in self.legs_departing(
+                last.destination_id,
+                last.arrival_time + min_connection,
+                last.arrival_time + max_connection,
+            ):
+                if beaten(path, leg.departure_time):
+                    break
+                if leg.destination_id in visited:
+                    continue
+                path.append(leg)
+                visited.add(leg.destination_id)
+                extend(path, visited)
+                visited.discard(leg.destination_id)
+                path.pop()
+
+        for origin in origins - targets:
+            for leg in self.legs_departing(origin, departure_after, departure_before):
+                if leg.destination_id != origin:
+                    extend([leg], {origin, leg.destination_id})
+
+        return [entry[-1] for entry in sorted(best, reverse=True)]
+
+
+_index_lock = threading.Lock()
+_index = None
+_index_versions = None
+_index_built_at = 0.0
+_index_rebuilding = False
+
+
+def get_itinerary_index() -> ItineraryIndex:
+    """
+    Returns the process-wide itinerary index.
+
+    The index is rebuilt when the `schedule`, `route` or `airport`
+    cache namespaces changed or when it is older than
+    `ITINERARY_INDEX_MAX_AGE` seconds. Only the first build blocks
+    requests; afterwards the current index keeps being served
+    while a new one is built in a background thread.
+
+    Returns:
+        ItineraryIndex: The index.
+    """
+    global _index_rebuilding
+
+    versions = get_namespace_versions(ITINERARY_INDEX_NAMESPACES)
+    if (
+        _index is not None
+        and versions == _index_versions
+        and time.monotonic() - _index_built_at < ITINERARY_INDEX_MAX_AGE
+    ):
+        return _index
+
+    with _index_lock:
+        if _index is None:
+            publish_index(ItineraryIndex.build(), versions)
+        elif not _index_rebuilding:
+            _index_rebuilding = True
+            threading.Thread(
+                target=rebuild_index,
+                args=(versions,),
+                name="itinerary-index",
+                daemon=True,
+            ).start()
+        return _index
+
+
+def publish_index(index: ItineraryIndex, versions: dict) -> None:
+    global _index, _index_versions, _index_built_at
+
+    _index, _index_versions, _index_built_at = index, versions, time.monotonic()
+
+
+def rebuild_index(versions: dict) -> None:
+    """
+    Builds a new index in a background thread and swaps it in,
+    closing the database connection of the thread afterwards.
+    """
+    global _index_rebuilding
+
+    try:
+        index = ItineraryIndex.build()
+        with _index_lock:
+            publish_index(index, versions)
+    except Exception:
+        logger.exception("Itinerary index rebuild failed.")
+    finally:
+        _index_rebuilding = False
+        connection.close()
+
+
+def reset_itinerary_index() -> None:
+    """
+    Drops the process-wide index, so the next request builds it.
+    """
+    with _index_lock:
+        publish_index(None, None)
@@ -0,0 +1,162 @@
+import json
+import platform
+import subprocess
+from datetime import datetime
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from management.benchmarks import (
+    BENCHMARK_SIZES,
+    BenchmarkRunner,
+    benchmark_settings,
+    compare_reports,
+)
+
+
+class Command(BaseCommand):
+    """
+    Management command benchmarking the hot API endpoints.
+
+    For every size, a throwaway database (the test database of
+    the configured backend, SQLite or PostgreSQL) is created,
+    filled with a generated dataset and destroyed afterwards.
+    Flight list/retrieve with filters, order create/list, ticket
+    list and the airport catalog endpoints are then measured with
+    `BenchmarkRunner`: latency percentiles, query count and peak
+    allocations, cold (rendered from the database) and warm
+    (served from the cache). Runs use their own Redis database
+    and key prefix with metrics off (see `benchmark_settings`),
+    so services sharing the Redis server are not affected.
+
+    The report is written as JSON, so runs of different commits
+    can be compared with `--baseline`; `--max-regression` turns
+    the comparison into a check failing on slower or chattier
+    endpoints.
+    """
+
+    help = "Benchmark the hot API endpoints on generated datasets."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            nargs="+",
+            choices=list(BENCHMARK_SIZES),
+            default=["tiny", "small"],
+            help="Dataset sizes to benchmark.",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=20,
+            help="Number of timed requests per scenario.",
+        )
+        parser.add_argument("--seed", type=int, default=0, help="Dataset seed.")
+        parser.add_argument("--output", help="Path of the JSON report.")
+        parser.add_argument(
+            "--baseline", help="Path of a previous JSON report to compare with."
+        )
+        parser.add_argument(
+            "--max-regression",
+            type=float,
+            help=(
+                "Fail if a median latency grows by more than this percentage "
+                "or a query count grows compared to the baseline."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        if options["max_regression"] is not None and not options["baseline"]:
+            raise CommandError("--max-regression requires --baseline.")
+        baseline = None
+        if options["baseline"]:
+            with open(options["baseline"]) as file:
+                baseline = json.load(file)
+
+        runner = BenchmarkRunner(repeat=options["repeat"], seed=options["seed"])
+        results = []
+        setup_test_environment()
+        try:
+            with benchmark_settings():
+                for size in options["sizes"]:
+                    self.stderr.write(f"Benchmarking {size}...")
+                    old_name = connection.creation.create_test_db(
+                        verbosity=0, autoclobber=True, serialize=False
+                    )
+                    try:
+                        results.extend(runner.run_size(size, BENCHMARK_SIZES[size]))
+                    finally:
+                        connection.creation.destroy_test_db(old_name, verbosity=0)
+        finally:
+            teardown_test_environment()
+
+        report = {"meta": self.get_meta(options), "results": results}
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                json.dump(report, file, indent=2)
+        self.write_table(results)
+
+        if baseline is not None:
+            changes = compare_reports(baseline, report)
+            self.write_changes(changes)
+            if options["max_regression"] is not None:
+                regressions = [
+                    change
+                    for change in changes
+                    if change["queries_change"] > 0
+                    or change["median_change"] > options["max_regression"]
+                ]
+                if regressions:
+                    raise CommandError(
+                        f"{len(regressions)} regression(s) compared to the baseline."
+                    )
+
+    @staticmethod
+    def get_meta(options) -> dict:
+        try:
+            commit = subprocess.run(
+                ["git", "rev-parse", "HEAD"],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+        return {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "commit": commit,
+            "database": connection.vendor,
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "seed": options["seed"],
+            "repeat": options["repeat"],
+            "sizes": {size: BENCHMARK_SIZES[size] for size in options["sizes"]},
+        }
+
+    def write_table(self, results) -> None:
+        self.stdout.write(
+            f"{'size':<8}{'scenario':<24}{'mode':<6}{'status':>7}"
+            f"{'median':>10}{'p95':>10}{'queries':>9}{'alloc KB':>10}"
+        )
+        for result in results:
+            latency = result["latency_ms"]
+            self.stdout.write(
+                f"{result['size']:<8}{result['scenario']:<24}{result['mode']:<6}"
+                f"{result['status']:>7}{latency['median']:>10.2f}"
+                f"{latency['p95']:>10.2f}{result['queries']:>9}"
+                f"{result['alloc_peak_kb']:>10.1f}"
+            )
+
+    def write_changes(self, changes) -> None:
+        self.stdout.write("\nCompared to the baseline:")
+        for change in changes:
+            size, scenario, mode = change["key"]
+            line = (
+                f"{size:<8}{scenario:<24}{mode:<6}"
+                f"{change['median_change']:>+9.1f} %{change['queries_change']:>+6} queries"
+            )
+            if change["queries_change"] > 0:
+                line = self.style.WARNING(line)
+            self.stdout.write(line)
@@ -0,0 +1,126 @@
+import json
+import time
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from management.filters import FlightFilter
+from management.models import Flight
+from management.views import FlightViewSet
+
+
+SEARCH_SCENARIOS = (
+    ("no_filters", ()),
+    ("city_from", ("city_from",)),
+    ("city_to", ("city_to",)),
+    ("city_from_city_to", ("city_from", "city_to")),
+    ("departure_date", ("departure_date",)),
+    ("departure_window", ("departure_after", "departure_before")),
+    ("city_from_city_to_date", ("city_from", "city_to", "departure_date")),
+)
+
+
+class Command(BaseCommand):
+    """
+    Management command reporting query plans and timings of
+    the flight search.
+
+    Runs the canonical `FlightFilter` combinations against the
+    `FlightViewSet` queryset, limited to one page as the API
+    does, and prints `EXPLAIN ANALYZE` plans on PostgreSQL
+    (plain `EXPLAIN` on other databases) together with the
+    measured page and count query timings.
+    """
+
+    help = "Report EXPLAIN plans and timings of the flight search filters."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--city-from", help="Source city to filter by.")
+        parser.add_argument("--city-to", help="Destination city to filter by.")
+        parser.add_argument("--date", help="Departure date (YYYY-MM-DD) to filter by.")
+        parser.add_argument(
+            "--json", action="store_true", help="Print the report as JSON."
+        )
+
+    def handle(self, *args, **options):
+        values = self.get_filter_values(options)
+        report = [
+            self.explain_scenario(name, {field: values[field] for field in fields})
+            for name, fields in SEARCH_SCENARIOS
+        ]
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        for entry in report:
+            self.stdout.write(
+                self.style.MIGRATE_HEADING(f"== {entry['scenario']} {entry['params']}")
+            )
+            self.stdout.write(entry["plan"])
+            self.stdout.write(
+                f"page: {entry['page_ms']} ms ({entry['rows']} rows), "
+                f"count: {entry['count_ms']} ms ({entry['count']} flights)\n"
+            )
+
+    def get_filter_values(self, options) -> dict:
+        """
+        Returns the filter values, sampled from the latest flight
+        when they are not given on the command line.
+        """
+        flight = Flight.objects.select_related(
+            "route__source", "route__destination"
+        ).first()
+        departure_date = date.fromisoformat(
+            options["date"]
+            or (flight.departure_time.date().isoformat() if flight else "2025-01-01")
+        )
+        return {
+            "city_from": options["city_from"]
+            or (flight.route.source.closest_big_city if flight else "Kyiv"),
+            "city_to": options["city_to"]
+            or (flight.route.destination.closest_big_city if flight else "Lviv"),
+            "departure_date": departure_date.isoformat(),
+            "departure_after": departure_date.isoformat(),
+            "departure_before": (departure_date + timedelta(days=7)).isoformat(),
+        }
+
+    def explain_scenario(self, name: str, params: dict) -> dict:
+        """
+        Explains and times one filter combination.
+
+        Args:
+            name (str): The name of the scenario.
+            params (dict): The query parameters of the search.
+
+        Returns:
+            dict: The scenario report.
+        """
+        queryset = FlightFilter(params, queryset=FlightViewSet.queryset).qs
+        page = queryset[: settings.REST_FRAMEWORK["PAGE_SIZE"]]
+
+        if connection.vendor == "postgresql":
+            plan = page.explain(analyze=True, buffers=True)
+        else:
+            plan = page.explain()
+
+        started = time.perf_counter()
+        rows = len(list(page))
+        page_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        count = queryset.count()
+        count_ms = (time.perf_counter() - started) * 1000
+
+        return {
+            "scenario": name,
+            "params": params,
+            "sql": str(page.query),
+            "plan": plan,
+            "rows": rows,
+            "page_ms": round(page_ms, 3),
+            "count": count,
+            "count_ms": round(count_ms, 3),
+        }
@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime
+
+from management.exports import EXPORTS, RENDERERS, stream_export
+
+
+class Command(BaseCommand):
+    """
+    Management command streaming an export of flights, orders
+    or tickets as CSV or newline-delimited JSON to a file or
+    to the standard output, with constant memory use.
+    """
+
+    help = "Export flights, orders or tickets as CSV or NDJSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument("name", choices=sorted(EXPORTS))
+        parser.add_argument(
+            "--output",
+            choices=sorted(RENDERERS),
+            default="csv",
+            help="Output format.",
+        )
+        parser.add_argument(
+            "--since", help="Only rows at or after this date/time (ISO 8601)."
+        )
+        parser.add_argument(
+            "--until", help="Only rows before this date/time (ISO 8601)."
+        )
+        parser.add_argument(
+            "--file", help="File to write to instead of the standard output."
+        )
+
+    def handle(self, *args, **options):
+        lines = stream_export(
+            options["name"],
+            options["output"],
+            since=self.parse_moment(options["since"]),
+            until=self.parse_moment(options["until"]),
+        )
+        if not options["file"]:
+            for line in lines:
+                self.stdout.write(line, ending="")
+            return
+
+        with open(options["file"], "w", newline="") as file:
+            file.writelines(lines)
+
+    @staticmethod
+    def parse_moment(value):
+        if value is None:
+            return None
+        try:
+            moment = parse_datetime(value) or parse_datetime(f"{value}T00:00:00")
+        except ValueError:
+            # Well formatted, but out of range, e.g. `2025-02-30`.
+            moment = None
+        if moment is None:
+            raise CommandError(
+                f"Invalid date/time: {value}, expected YYYY-MM-DD[THH:MM[:SS]]."
+            )
+        return moment
@@ -0,0 +1,92 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from management.datasets import DATASET_SCALES, DatasetBuilder
+from management.schedule_import import ScheduleImporter
+
+
+class Command(BaseCommand):
+    """
+    Management command generating a realistic, reproducible
+    dataset for benchmarks and profiling.
+
+    Builds airports, routes, an airplane fleet, crews and flights
+    over the configured months with `DatasetBuilder`, inserts
+    them through the `import_schedule` bulk path, then books
+    orders and tickets at the target load factor. The same seed
+    and scale always generate the same data.
+    """
+
+    help = "Generate a reproducible dataset of flights, orders and tickets."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scale",
+            choices=sorted(DATASET_SCALES),
+            default="small",
+            help="Preset dataset dimensions.",
+        )
+        parser.add_argument("--seed", type=int, default=0, help="Random seed.")
+        for dimension in DATASET_SCALES["small"]:
+            parser.add_argument(
+                f"--{dimension.replace('_', '-')}",
+                type=int,
+                dest=dimension,
+                help=f"Override the {dimension.replace('_', ' ')} of the scale.",
+            )
+        parser.add_argument(
+            "--load-factor",
+            type=float,
+            default=0.8,
+            help="Average share of sold seats per flight.",
+        )
+        parser.add_argument(
+            "--start",
+            default="2025-01-01",
+            help="First day of the schedule (YYYY-MM-DD).",
+        )
+        parser.add_argument(
+            "--no-bookings",
+            action="store_true",
+            help="Generate the schedule only, without orders and tickets.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Number of rows per INSERT.",
+        )
+
+    def handle(self, *args, **options):
+        scale = {
+            **DATASET_SCALES[options["scale"]],
+            **{
+                dimension: options[dimension]
+                for dimension in DATASET_SCALES["small"]
+                if options[dimension] is not None
+            },
+        }
+        if not options["no_bookings"] and scale["users"] < 1:
+            raise CommandError("--users must be at least 1 to generate bookings.")
+        builder = DatasetBuilder(
+            seed=options["seed"],
+            scale=scale,
+            start=date.fromisoformat(options["start"]),
+            batch_size=options["batch_size"],
+        )
+
+        started = time.perf_counter()
+        importer = ScheduleImporter(batch_size=options["batch_size"])
+        created = importer.run(builder.build_schedule())
+        if not options["no_bookings"]:
+            created.update(
+                builder.generate_bookings(importer.flight_ids, options["load_factor"])
+            )
+
+        for section, count in created.items():
+            self.stdout.write(f"{section}: {count} created")
+        self.stdout.write(
+            self.style.SUCCESS(f"Generated in {time.perf_counter() - started:.1f} s")
+        )
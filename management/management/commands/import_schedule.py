@@ -0,0 +1,62 @@
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from management.schedule_import import (
+    ScheduleImportError,
+    ScheduleImporter,
+    read_csv_schedule,
+    read_json_schedule,
+)
+
+
+class Command(BaseCommand):
+    """
+    Management command bulk importing a schedule of airports,
+    routes, airplanes, crews and flights.
+
+    The schedule is either a JSON file with a list of records
+    per section, or a directory of `<section>.csv` files
+    (`airplane_types`, `airports`, `airplanes`, `crews`,
+    `routes`, `flights`). Records reference each other by
+    natural keys, e.g. a flight by its `source` and
+    `destination` airport names, `airplane` name and `crew`
+    full names. Unlike `loaddata`, rows are inserted in bulk
+    without per-object saves and signals, in one transaction,
+    with a single cache invalidation at the end.
+    """
+
+    help = "Bulk import a JSON or CSV schedule of airports, routes and flights."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path", help="JSON file or directory of CSV files to import."
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Number of rows per INSERT.",
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        if path.is_dir():
+            schedule = read_csv_schedule(path)
+        elif path.is_file():
+            schedule = read_json_schedule(path)
+        else:
+            raise CommandError(f"No such file or directory: {path}")
+
+        started = time.perf_counter()
+        try:
+            created = ScheduleImporter(batch_size=options["batch_size"]).run(schedule)
+        except (ScheduleImportError, KeyError, ValueError) as error:
+            raise CommandError(f"Import failed: {error}")
+
+        for section, count in created.items():
+            self.stdout.write(f"{section}: {count} created")
+        self.stdout.write(
+            self.style.SUCCESS(f"Imported in {time.perf_counter() - started:.1f} s")
+        )
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from management.models import Flight
+
+
+class Command(BaseCommand):
+    """
+    Management command recalculating the denormalized
+    `tickets_sold` counter of all flights from their tickets.
+
+    `loaddata` saves flights raw, which resets the counters of
+    flights already having tickets without the ticket signals
+    counting them again; run this command after loading data.
+    """
+
+    help = "Recalculate the sold tickets counter of all flights."
+
+    def handle(self, *args, **options):
+        updated = Flight.recount_tickets_sold()
+        self.stdout.write(
+            self.style.SUCCESS(f"Recounted sold tickets of {updated} flights.")
+        )
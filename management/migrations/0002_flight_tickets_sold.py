@@ -0,0 +1,34 @@
+# Generated by Django 5.1.4 on 2026-10-16 23:42
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_tickets_sold(apps, schema_editor):
+    Flight = apps.get_model("management", "Flight")
+    Ticket = apps.get_model("management", "Ticket")
+    tickets_count = (
+        Ticket.objects.filter(flight=OuterRef("pk"))
+        .order_by()
+        .values("flight")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    Flight.objects.update(tickets_sold=Coalesce(Subquery(tickets_count), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("management", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="flight",
+            name="tickets_sold",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_tickets_sold, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,11 @@
 from django.db import models
 from django.conf import settings
-from django.db.models import UniqueConstraint
+from django.db.models import Count, F, OuterRef, Subquery, UniqueConstraint
+from django.db.models.functions import Coalesce
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 
-from base.models import UUIDBaseModel
+from base.models import CacheInvalidatingQuerySet, UUIDBaseModel
 from airport.models import (
     Airplane,
     Crew,
@@ -39,6 +41,11 @@ class Order(UUIDBaseModel):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["user", "created_at", "id"], name="order_user_created_idx"
+            ),
+        ]
 
 
 class Ticket(UUIDBaseModel):
@@ -168,8 +175,21 @@ class Flight(UUIDBaseModel):
         and time of the flight.
         crew (ManyToManyField): A many-to-many relationship
         with crew members assigned to the flight.
+        tickets_sold (PositiveIntegerField): Denormalized number
+        of tickets sold for the flight, kept in sync on ticket
+        creation and deletion.
+
+    Properties:
+        count_available_seats (int): The number of seats
+        still available (airplane capacity - tickets sold).
 
     Methods:
+        save(): Saves the flight, never writing `tickets_sold`
+        on updates.
+        adjust_tickets_sold(deltas): Applies per-flight changes
+        to the sold tickets counter.
+        recount_tickets_sold(): Recalculates the counters of all
+        flights from their tickets.
         __str__(): Returns a string representation
         of the flight, including route details
         and timing information.
@@ -177,6 +197,10 @@ class Flight(UUIDBaseModel):
     Meta:
         ordering: Orders flights by `departure_time`
         in descending order.
+        indexes: Index on `(departure_time, id)` for ordering,
+        keyset pagination and date filtering, and on
+        `(route, departure_time)`
+        for flights of a route within a time range.
     """
 
     route = models.ForeignKey(Route, on_delete=models.CASCADE, related_name="flights")
@@ -186,12 +210,150 @@ class Flight(UUIDBaseModel):
     departure_time = models.DateTimeField()
     arrival_time = models.DateTimeField()
     crew = models.ManyToManyField(Crew, related_name="flights")
+    tickets_sold = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         ordering = ["-departure_time"]
+        indexes = [
+            models.Index(
+                fields=["departure_time", "id"], name="flight_departure_idx"
+            ),
+            models.Index(
+                fields=["route", "departure_time"],
+                name="flight_route_departure_idx",
+            ),
+        ]
+
+    @property
+    def count_available_seats(self) -> int:
+        return self.airplane.capacity - self.tickets_sold
+
+    def save(self, *args, **kwargs):
+        """
+        Saves the flight. Updates of an existing row leave
+        `tickets_sold` out, so a stale instance (e.g. loaded
+        before a booking) never overwrites the counter, which is
+        only changed by `adjust_tickets_sold`.
+        """
+        if (
+            not self._state.adding
+            and not kwargs.get("force_insert")
+            and kwargs.get("update_fields") is None
+        ):
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != "tickets_sold"
+            ]
+        super().save(*args, **kwargs)
+
+    @staticmethod
+    def adjust_tickets_sold(deltas: dict) -> None:
+        """
+        Applies changes to the `tickets_sold` counter of
+        several flights with atomic `F()` updates.
+
+        Args:
+            deltas (dict): Mapping of flight id to the number
+            of tickets added (positive) or removed (negative).
+        """
+        for flight_id, delta in deltas.items():
+            if delta:
+                Flight.objects.filter(pk=flight_id).update(
+                    tickets_sold=F("tickets_sold") + delta
+                )
+
+    @staticmethod
+    def recount_tickets_sold() -> int:
+        """
+        Recalculates the `tickets_sold` counter of every flight
+        from its tickets in a single `UPDATE`, e.g. after raw
+        saves (`loaddata`) reset the counters.
+
+        Returns:
+            int: The number of flights updated.
+        """
+        counts = (
+            Ticket.objects.filter(flight=OuterRef("pk"))
+            .order_by()
+            .values("flight")
+            .annotate(count=Count("id"))
+            .values("count")
+        )
+        return Flight.objects.update(tickets_sold=Coalesce(Subquery(counts), 0))
 
     def __str__(self):
         return (
             f"{str(self.route)}, departure time: {self.departure_time}"
             f"arrival time: {self.arrival_time}"
         )
+
+
+class SeatHoldQuerySet(CacheInvalidatingQuerySet):
+    """
+    QuerySet of seat holds.
+
+    Methods:
+        active(): Returns the holds that have not expired yet.
+    """
+
+    def active(self):
+        return self.filter(expires_at__gt=timezone.now())
+
+
+class SeatHold(UUIDBaseModel):
+    """
+    Represents a temporary hold of a seat on a flight,
+    reserving it for a user until it expires or is turned
+    into a ticket.
+
+    Attributes:
+        row (PositiveIntegerField): The row number on the airplane.
+        seat (PositiveIntegerField): The seat number in the row.
+        flight (ForeignKey): A reference to the flight.
+        user (ForeignKey): A reference to the user holding the seat.
+        expires_at (DateTimeField): The moment the hold expires.
+
+    Meta:
+        UniqueConstraint: Ensures a seat is held at most once;
+        expired holds are purged before a seat is held again.
+        indexes: Index on `(user, expires_at)` for the active
+        holds of a user.
+    """
+
+    row = models.PositiveIntegerField()
+    seat = models.PositiveIntegerField()
+    flight = models.ForeignKey(
+        Flight, on_delete=models.CASCADE, related_name="seat_holds"
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="seat_holds",
+    )
+    expires_at = models.DateTimeField()
+
+    objects = SeatHoldQuerySet.as_manager()
+
+    class Meta:
+        ordering = ["expires_at"]
+        constraints = [
+            UniqueConstraint(
+                fields=["row", "seat", "flight"], name="unique_seat_hold"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["user", "expires_at"], name="seat_hold_user_expires_idx"
+            ),
+        ]
+
+    @property
+    def is_active(self) -> bool:
+        return self.expires_at > timezone.now()
+
+    def __str__(self):
+        return (
+            f"{str(self.flight)}, row: {self.row}, seat: {self.seat}, "
+            f"held until: {self.expires_at}"
+        )
@@ -0,0 +1,292 @@
+import csv
+import json
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from airport.models import Airplane, AirplaneType, Airport, Crew, Route
+from base.cache import batched_invalidation, invalidate_namespaces
+from management.models import Flight
+
+
+SCHEDULE_SECTIONS = (
+    "airplane_types",
+    "airports",
+    "airplanes",
+    "crews",
+    "routes",
+    "flights",
+)
+
+
+class ScheduleImportError(Exception):
+    """
+    Raised when a schedule record is invalid or references
+    an unknown airport, airplane, route or crew member.
+    """
+
+
+def read_json_schedule(path) -> dict:
+    """
+    Reads a JSON schedule, an object with a list of records
+    per section (see `SCHEDULE_SECTIONS`).
+    """
+    with open(path) as file:
+        data = json.load(file)
+    return {section: data.get(section, []) for section in SCHEDULE_SECTIONS}
+
+
+def read_csv_schedule(directory) -> dict:
+    """
+    Reads a CSV schedule, a directory with one `<section>.csv`
+    file per section. Records are read lazily, so flights are
+    streamed rather than loaded at once. The `crew` column of
+    flights lists full names separated by `;`.
+    """
+
+    def records(path):
+        with open(path, newline="") as file:
+            for record in csv.DictReader(file):
+                if "crew" in record:
+                    record["crew"] = [
+                        name.strip() for name in record["crew"].split(";") if name
+                    ]
+                yield record
+
+    schedule = {}
+    for section in SCHEDULE_SECTIONS:
+        path = Path(directory) / f"{section}.csv"
+        schedule[section] = records(path) if path.exists() else []
+    return schedule
+
+
+class ScheduleImporter:
+    """
+    Bulk importer of airports, routes, airplanes, crews and
+    flights.
+
+    Records reference each other by natural keys (airport and
+    airplane type names, airplane names, crew full names and
+    routes by source/destination airport names), resolved with
+    in-memory maps preloaded from the database, so no query is
+    made per record. Catalog records that already exist are
+    reused, flights already scheduled (same route, airplane and
+    departure time) are skipped, so re-importing a schedule is
+    idempotent.
+
+    Rows are inserted with `bulk_create` in batches, crews are
+    assigned through bulk inserts into the `Flight.crew`
+    through table, and the cache is invalidated once when the
+    import commits.
+
+    Attributes:
+        batch_size (int): The number of rows per `INSERT`.
+        created (dict): The number of created rows per section.
+        flight_ids (list): The IDs of the created flights, in the
+        order of their records.
+    """
+
+    def __init__(self, batch_size: int = 5000) -> None:
+        self.batch_size = batch_size
+        self.created = dict.fromkeys(SCHEDULE_SECTIONS, 0)
+        self.flight_ids = []
+        self.airplane_types = dict(AirplaneType.objects.values_list("name", "id"))
+        self.airports = dict(Airport.objects.values_list("name", "id"))
+        self.airplanes = dict(Airplane.objects.values_list("name", "id"))
+        self.crews = {
+            f"{first_name} {last_name}": crew_id
+            for crew_id, first_name, last_name in Crew.objects.values_list(
+                "id", "first_name", "last_name"
+            )
+        }
+        self.routes = {
+            (source_id, destination_id): route_id
+            for route_id, source_id, destination_id in Route.objects.values_list(
+                "id", "source_id", "destination_id"
+            )
+        }
+
+    def run(self, schedule: dict) -> dict:
+        """
+        Imports all sections of a schedule in one transaction.
+
+        Args:
+            schedule (dict): Records per section.
+
+        Returns:
+            dict: The number of created rows per section.
+        """
+        with batched_invalidation(), transaction.atomic():
+            self.import_airplane_types(schedule["airplane_types"])
+            self.import_airports(schedule["airports"])
+            self.import_airplanes(schedule["airplanes"])
+            self.import_crews(schedule["crews"])
+            self.import_routes(schedule["routes"])
+            self.import_flights(schedule["flights"])
+        return self.created
+
+    def resolve(self, mapping: dict, key, kind: str, index: int):
+        try:
+            return mapping[key]
+        except KeyError:
+            raise ScheduleImportError(f"{kind} #{index}: unknown {key!r}")
+
+    def insert(self, model, section: str, objs) -> None:
+        model.objects.bulk_create(objs, batch_size=self.batch_size)
+        self.created[section] += len(objs)
+
+    def import_airplane_types(self, records) -> None:
+        objs = []
+        for record in records:
+            if record["name"] not in self.airplane_types:
+                obj = AirplaneType(name=record["name"])
+                self.airplane_types[obj.name] = obj.id
+                objs.append(obj)
+        self.insert(AirplaneType, "airplane_types", objs)
+
+    def import_airports(self, records) -> None:
+        objs = []
+        for record in records:
+            if record["name"] not in self.airports:
+                obj = Airport(
+                    name=record["name"], closest_big_city=record["closest_big_city"]
+                )
+                self.airports[obj.name] = obj.id
+                objs.append(obj)
+        self.insert(Airport, "airports", objs)
+
+    def import_airplanes(self, records) -> None:
+        objs = []
+        for index, record in enumerate(records):
+            if record["name"] in self.airplanes:
+                continue
+            obj = Airplane(
+                name=record["name"],
+                rows=int(record["rows"]),
+                seats_in_row=int(record["seats_in_row"]),
+                airplane_type_id=self.resolve(
+                    self.airplane_types, record["airplane_type"], "airplane", index
+                ),
+            )
+            self.airplanes[obj.name] = obj.id
+            objs.append(obj)
+        self.insert(Airplane, "airplanes", objs)
+
+    def import_crews(self, records) -> None:
+        objs = []
+        for record in records:
+            full_name = f"{record['first_name']} {record['last_name']}"
+            if full_name not in self.crews:
+                obj = Crew(
+                    first_name=record["first_name"], last_name=record["last_name"]
+                )
+                self.crews[full_name] = obj.id
+                objs.append(obj)
+        self.insert(Crew, "crews", objs)
+
+    def import_routes(self, records) -> None:
+        objs = []
+        for index, record in enumerate(records):
+            key = (
+                self.resolve(self.airports, record["source"], "route", index),
+                self.resolve(self.airports, record["destination"], "route", index),
+            )
+            if key[0] == key[1]:
+                raise ScheduleImportError(
+                    f"route #{index}: source and destination are the same"
+                )
+            if key in self.routes:
+                continue
+            obj = Route(
+                source_id=key[0],
+                destination_id=key[1],
+                distance=int(record["distance"]),
+            )
+            self.routes[key] = obj.id
+            objs.append(obj)
+        self.insert(Route, "routes", objs)
+
+    def import_flights(self, records) -> None:
+        """
+        Imports flights batch by batch, so the records may be
+        a lazily read stream of any length.
+        """
+        records = iter(records)
+        offset = 0
+        while batch := list(islice(records, self.batch_size)):
+            self.import_flight_batch(batch, offset)
+            offset += len(batch)
+
+        if self.created["flights"]:
+            invalidate_namespaces("flight", "schedule")
+
+    def import_flight_batch(self, records: list, offset: int) -> None:
+        flights, crew_links = [], []
+        for index, record in enumerate(records, start=offset):
+            route_id = self.resolve(
+                self.routes,
+                (
+                    self.resolve(self.airports, record["source"], "flight", index),
+                    self.resolve(self.airports, record["destination"], "flight", index),
+                ),
+                "flight",
+                index,
+            )
+            flight = Flight(
+                route_id=route_id,
+                airplane_id=self.resolve(
+                    self.airplanes, record["airplane"], "flight", index
+                ),
+                departure_time=self.parse_moment(record["departure_time"], index),
+                arrival_time=self.parse_moment(record["arrival_time"], index),
+            )
+            flights.append(flight)
+            crew_links.extend(
+                Flight.crew.through(
+                    flight_id=flight.id,
+                    crew_id=self.resolve(self.crews, name, "flight", index),
+                )
+                for name in record.get("crew") or ()
+            )
+
+        existing = set(
+            Flight.objects.filter(
+                route_id__in={flight.route_id for flight in flights},
+                departure_time__gte=min(flight.departure_time for flight in flights),
+                departure_time__lte=max(flight.departure_time for flight in flights),
+            ).values_list("route_id", "airplane_id", "departure_time")
+        )
+        new_flights = []
+        for flight in flights:
+            key = (flight.route_id, flight.airplane_id, flight.departure_time)
+            if key not in existing:
+                existing.add(key)
+                new_flights.append(flight)
+        new_ids = {flight.id for flight in new_flights}
+        self.insert(Flight, "flights", new_flights)
+        self.flight_ids.extend(flight.id for flight in new_flights)
+        Flight.crew.through.objects.bulk_create(
+            [link for link in crew_links if link.flight_id in new_ids],
+            batch_size=self.batch_size,
+        )
+
+    @staticmethod
+    def parse_moment(value, index: int) -> datetime:
+        """
+        Parses an ISO 8601 date/time, converting it to the
+        timezone handling of the project (naive UTC with
+        `USE_TZ = False`).
+        """
+        moment = parse_datetime(value) if isinstance(value, str) else value
+        if moment is None:
+            raise ScheduleImportError(f"flight #{index}: invalid date/time {value!r}")
+        if settings.USE_TZ and timezone.is_naive(moment):
+            return timezone.make_aware(moment)
+        if not settings.USE_TZ and timezone.is_aware(moment):
+            return timezone.make_naive(moment)
+        return moment
@@ -0,0 +1,315 @@
+import base64
+import uuid
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db import transaction
+from django_redis import get_redis_connection
+
+from management.models import Ticket
+
+
+SEAT_MAP_TIMEOUT = 60 * 60
+
+
+class SeatMap:
+    """
+    Bitmap of sold seats for a flight.
+
+    Seats are laid out row by row, so the seat `(row, seat)`
+    is stored in bit `(row - 1) * seats_in_row + (seat - 1)`.
+    Bits are numbered from the most significant bit of the
+    first byte, which matches the Redis `SETBIT` layout and
+    lets the bitmap be cached and updated in Redis as is.
+
+    Attributes:
+        rows (int): The number of rows in the airplane.
+        seats_in_row (int): The number of seats in each row.
+        bits (bytearray): The packed bitmap, one bit per seat
+        (1 - sold, 0 - free).
+
+    Methods:
+        from_seats(rows, seats_in_row, seats): Builds a seat map
+        from `(row, seat)` pairs of sold tickets.
+        offset(row, seat): Returns the bit offset of a seat.
+        is_sold(row, seat): Checks whether a seat is sold.
+        mark_sold(row, seat): Marks a seat as sold.
+        release(row, seat): Marks a seat as free.
+        to_bitset(): Returns the bitmap as a base64 string.
+        to_rle(): Returns the bitmap as a run-length string.
+        sections(): Returns the seat ranges between aisles.
+        seat_kinds(seat): Returns whether a seat is at a window
+        or an aisle.
+        find_seats(party_size, together, preference): Finds
+        free seats for a party.
+    """
+
+    def __init__(self, rows: int, seats_in_row: int, bits: bytes = b"") -> None:
+        self.rows = rows
+        self.seats_in_row = seats_in_row
+        self.bits = bytearray(bits[: self.size_in_bytes(self.capacity)])
+        self.bits.extend(bytes(self.size_in_bytes(self.capacity) - len(self.bits)))
+
+    @classmethod
+    def from_seats(cls, rows: int, seats_in_row: int, seats) -> "SeatMap":
+        seat_map = cls(rows, seats_in_row)
+        for row, seat in seats:
+            seat_map.mark_sold(row, seat)
+        return seat_map
+
+    @staticmethod
+    def size_in_bytes(bits_count: int) -> int:
+        return (bits_count + 7) // 8
+
+    @property
+    def capacity(self) -> int:
+        return self.rows * self.seats_in_row
+
+    def offset(self, row: int, seat: int) -> int:
+        return (row - 1) * self.seats_in_row + (seat - 1)
+
+    def is_sold(self, row: int, seat: int) -> bool:
+        offset = self.offset(row, seat)
+        return bool(self.bits[offset >> 3] & (0x80 >> (offset & 7)))
+
+    def mark_sold(self, row: int, seat: int) -> None:
+        offset = self.offset(row, seat)
+        self.bits[offset >> 3] |= 0x80 >> (offset & 7)
+
+    def release(self, row: int, seat: int) -> None:
+        offset = self.offset(row, seat)
+        self.bits[offset >> 3] &= ~(0x80 >> (offset & 7)) & 0xFF
+
+    def to_bitset(self) -> str:
+        return base64.b64encode(bytes(self.bits)).decode()
+
+    def to_rle(self) -> str:
+        """
+        Encodes the bitmap as alternating runs of free (`F`)
+        and sold (`S`) seats, e.g. `F12S3F135`.
+
+        Returns:
+            str: The run-length encoded seat map.
+        """
+        runs = []
+        current, length = None, 0
+        for offset in range(self.capacity):
+            sold = bool(self.bits[offset >> 3] & (0x80 >> (offset & 7)))
+            if sold is current:
+                length += 1
+                continue
+            if current is not None:
+                runs.append(f"{'S' if current else 'F'}{length}")
+            current, length = sold, 1
+        if current is not None:
+            runs.append(f"{'S' if current else 'F'}{length}")
+        return "".join(runs)
+
+    def sections(self) -> list:
+        """
+        Derives the cabin layout from `seats_in_row`: up to six
+        seats form two sections around one aisle (e.g. 3-3),
+        seven or eight seats three sections with 2-seat sides
+        (e.g. 2-4-2), and wider rows three sections with 3-seat
+        sides (e.g. 3-4-3).
+
+        Returns:
+            list: `(first, last)` seat numbers of each section.
+        """
+        width = self.seats_in_row
+        if width <= 2:
+            sizes = [width]
+        elif width <= 6:
+            sizes = [width // 2, width - width // 2]
+        elif width <= 8:
+            sizes = [2, width - 4, 2]
+        else:
+            sizes = [3, width - 6, 3]
+
+        sections, first = [], 1
+        for size in sizes:
+            sections.append((first, first + size - 1))
+            first += size
+        return sections
+
+    def seat_kinds(self, seat: int) -> set:
+        kinds = set()
+        if seat in (1, self.seats_in_row):
+            kinds.add("window")
+        for first, last in self.sections():
+            if seat in (first, last) and seat not in (1, self.seats_in_row):
+                kinds.add("aisle")
+        return kinds
+
+    def find_seats(
+        self, party_size: int, together: bool = True, preference: str = None
+    ):
+        """
+        Finds the best available seats for a party, front rows first.
+
+        Seats together are adjacent free seats in one row, within
+        a section when the party fits one, so the party is not
+        split by an aisle. A `window` or `aisle` preference picks
+        blocks (or single seats) including such a seat when
+        there are any.
+
+        Args:
+            party_size (int): The number of seats.
+            together (bool): Whether the seats must be adjacent.
+            preference (str): `window`, `aisle` or None.
+
+        Returns:
+            list: The `(row, seat)` pairs, or None if there are
+            not enough free seats.
+        """
+        if not together:
+            free = [
+                (row, seat)
+                for row in range(1, self.rows + 1)
+                for seat in range(1, self.seats_in_row + 1)
+                if not self.is_sold(row, seat)
+            ]
+            free.sort(
+                key=lambda item: (preference not in self.seat_kinds(item[1]), item)
+            )
+            return free[:party_size] if len(free) >= party_size else None
+
+        spans = self.sections()
+        if party_size > max(last - first + 1 for first, last in spans):
+            spans = [(1, self.seats_in_row)]
+
+        fallback = None
+        for row in range(1, self.rows + 1):
+            for first, last in spans:
+                for start in range(first, last - party_size + 2):
+                    block = range(start, start + party_size)
+                    if any(self.is_sold(row, seat) for seat in block):
+                        continue
+                    seats = [(row, seat) for seat in block]
+                    if preference is None or any(
+                        preference in self.seat_kinds(seat) for seat in block
+                    ):
+                        return seats
+                    fallback = fallback or seats
+        return fallback
+
+
+def seat_map_key(flight_id) -> str:
+    return cache.make_key(f"seat_map:{flight_id}")
+
+
+def seat_map_releases_key(flight_id) -> str:
+    return cache.make_key(f"seat_map:{flight_id}:releases")
+
+
+def get_seat_map(flight) -> SeatMap:
+    """
+    Returns the seat map of a flight from the Redis cache,
+    building it from the flight tickets when it is missing.
+
+    The cached bitmap has one extra "complete" bit right after
+    the last seat. Sales set seat bits with `SETBIT` even when
+    the map is not cached, so a map without the complete bit is
+    partial and is merged (`BITOP OR`) with the bitmap built
+    from the database. Merging only ever adds sold seats, so a
+    concurrent sale is never lost.
+
+    A release committed during the rebuild may have been merged
+    back from the tickets read before it, so the rebuild checks
+    the release counter of the flight (see `release_seat_maps`)
+    and drops the merged map again when it changed.
+
+    Args:
+        flight (Flight): The flight, with its airplane loaded.
+
+    Returns:
+        SeatMap: The seat map of the flight.
+    """
+    rows = flight.airplane.rows
+    seats_in_row = flight.airplane.seats_in_row
+    capacity = rows * seats_in_row
+    key = seat_map_key(flight.id)
+    client = get_redis_connection("default")
+
+    raw = client.get(key)
+    if raw is None or not _is_complete(raw, capacity):
+        releases_key = seat_map_releases_key(flight.id)
+        releases = client.get(releases_key)
+        seats = Ticket.objects.filter(flight=flight).values_list("row", "seat")
+        built = SeatMap.from_seats(rows, seats_in_row, seats)
+        bits = built.bits + bytes(SeatMap.size_in_bytes(capacity + 1) - len(built.bits))
+        bits[capacity >> 3] |= 0x80 >> (capacity & 7)
+
+        build_key = f"{key}:build:{uuid.uuid4().hex}"
+        pipeline = client.pipeline()
+        pipeline.set(build_key, bytes(bits), ex=SEAT_MAP_TIMEOUT)
+        pipeline.bitop("OR", key, key, build_key)
+        pipeline.delete(build_key)
+        pipeline.expire(key, SEAT_MAP_TIMEOUT)
+        pipeline.get(key)
+        pipeline.get(releases_key)
+        raw, current_releases = pipeline.execute()[-2:]
+        if current_releases != releases:
+            client.delete(key)
+
+    return SeatMap(rows, seats_in_row, raw)
+
+
+def _is_complete(raw: bytes, capacity: int) -> bool:
+    if len(raw) <= capacity >> 3:
+        return False
+    return bool(raw[capacity >> 3] & (0x80 >> (capacity & 7)))
+
+
+def mark_seats_sold(tickets) -> None:
+    """
+    Sets the bits of newly sold seats in the cached seat maps
+    once the surrounding transaction commits.
+
+    Args:
+        tickets (Iterable[Ticket]): The created tickets, with
+        their flights and airplanes loaded.
+    """
+    offsets = defaultdict(list)
+    for ticket in tickets:
+        seats_in_row = ticket.flight.airplane.seats_in_row
+        offsets[ticket.flight_id].append(
+            (ticket.row - 1) * seats_in_row + (ticket.seat - 1)
+        )
+    if offsets:
+        transaction.on_commit(lambda: _set_seat_bits(offsets))
+
+
+def _set_seat_bits(offsets: dict) -> None:
+    pipeline = get_redis_connection("default").pipeline(transaction=False)
+    for flight_id, flight_offsets in offsets.items():
+        key = seat_map_key(flight_id)
+        for offset in flight_offsets:
+            pipeline.setbit(key, offset, 1)
+        pipeline.expire(key, SEAT_MAP_TIMEOUT)
+    pipeline.execute()
+
+
+def release_seat_maps(flight_ids) -> None:
+    """
+    Drops the cached seat maps of flights once the surrounding
+    transaction commits, so they are rebuilt on the next read,
+    and increments their release counters, so rebuilds running
+    meanwhile drop their maps as well.
+
+    Args:
+        flight_ids (Iterable): The ids of the affected flights.
+    """
+    flight_ids = set(flight_ids)
+    if flight_ids:
+        transaction.on_commit(lambda: _release_seat_maps(flight_ids))
+
+
+def _release_seat_maps(flight_ids) -> None:
+    pipeline = get_redis_connection("default").pipeline()
+    for flight_id in flight_ids:
+        releases_key = seat_map_releases_key(flight_id)
+        pipeline.incr(releases_key)
+        pipeline.expire(releases_key, SEAT_MAP_TIMEOUT)
+    pipeline.delete(*(seat_map_key(flight_id) for flight_id in flight_ids))
+    pipeline.execute()
@@ -1,12 +1,29 @@
+import uuid
+from collections import Counter
+from datetime import timedelta
+
 from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 from rest_framework.validators import UniqueTogetherValidator
 
+from base.instrumentation import SerializerTimingMixin
+from base.metrics import increment
 from management.models import (
     Ticket,
     Flight,
-    Order
+    Order,
+    SeatHold,
+)
+from management.booking import (
+    allocate_seats,
+    book_tickets,
+    filter_seats,
+    hold_seats,
+    update_order_tickets,
 )
+from management.itinerary import ITINERARY_INDEX_HORIZON
 from airport.serializers import (
     RouteListDetailSerializer,
     CrewSerializer,
@@ -22,13 +39,14 @@ class AvailableSeatsMixin:
     Methods:
         get_count_available_seats(obj): Returns the
         number of available seats on a flight by subtracting
-        the count of booked tickets from the airplane's capacity.
+        the sold tickets counter from the airplane's capacity.
     """
 
     def get_count_available_seats(self, obj):
         """
         Returns the number of available seats on
-        a flight by calculating the remaining seats.
+        a flight from the denormalized `tickets_sold`
+        counter, without loading the flight tickets.
 
         Args:
             obj (Flight): The flight object to calculate
@@ -38,13 +56,10 @@ class AvailableSeatsMixin:
             int: The number of available seats on the flight.
         """
 
-        tickets_count = obj.tickets.count()
-        capacity = obj.airplane.capacity
-
-        return capacity - tickets_count
+        return obj.count_available_seats
 
 
-class TicketFlightSerializer(serializers.ModelSerializer):
+class TicketFlightSerializer(SerializerTimingMixin, serializers.ModelSerializer):
     """
     Serializer for the Ticket model used in flight details.
 
@@ -65,7 +80,7 @@ class TicketFlightSerializer(serializers.ModelSerializer):
         read_only_fields = ("id",)
 
 
-class FlightSerializer(serializers.ModelSerializer):
+class FlightSerializer(SerializerTimingMixin, serializers.ModelSerializer):
     """
     Serializer for the Flight model used in basic
     flight data representation.
@@ -99,7 +114,9 @@ class FlightSerializer(serializers.ModelSerializer):
         read_only_fields = ("id",)
 
 
-class FlightDetailSerializer(AvailableSeatsMixin, serializers.ModelSerializer):
+class FlightDetailSerializer(
+    AvailableSeatsMixin, SerializerTimingMixin, serializers.ModelSerializer
+):
     """
     Serializer for detailed flight information,
     including available seats and purchased tickets.
@@ -163,7 +180,9 @@ class FlightDetailSerializer(AvailableSeatsMixin, serializers.ModelSerializer):
         return serializer.data
 
 
-class FlightListSerializer(AvailableSeatsMixin, serializers.ModelSerializer):
+class FlightListSerializer(
+    AvailableSeatsMixin, SerializerTimingMixin, serializers.ModelSerializer
+):
     """
     Serializer for listing flights with basic flight
     information and available seats.
@@ -210,7 +229,7 @@ class FlightListSerializer(AvailableSeatsMixin, serializers.ModelSerializer):
         read_only_fields = fields
 
 
-class TicketSerializer(serializers.ModelSerializer):
+class TicketSerializer(SerializerTimingMixin, serializers.ModelSerializer):
     """
     Serializer for the Ticket model, used to create and manage ticket data.
 
@@ -268,7 +287,120 @@ class TicketSerializer(serializers.ModelSerializer):
         return data
 
 
-class OrderSerializer(serializers.ModelSerializer):
+class PrefetchedFlightField(serializers.PrimaryKeyRelatedField):
+    """
+    Flight primary key field resolving flights from those loaded
+    in bulk by `OrderTicketListSerializer`, and querying only
+    for flights that were not loaded (e.g. unknown ones).
+    """
+
+    def to_internal_value(self, data):
+        flights = getattr(self.parent, "prefetched_flights", None) or {}
+        try:
+            flight = flights.get(uuid.UUID(str(data)))
+        except ValueError:
+            flight = None
+        if flight is not None:
+            return flight
+        return super().to_internal_value(data)
+
+
+class OrderTicketListSerializer(serializers.ListSerializer):
+    """
+    List serializer validating the tickets of an order in batch.
+
+    All referenced flights are loaded with their airplanes in one
+    query, seats are checked against the airplane dimensions in
+    memory, and sold seats are found with a single
+    `(flight, row, seat) IN (...)` query (see `filter_seats`).
+    Errors keep the per-ticket shape of `TicketSerializer`
+    validation. When an order is updated, its own tickets do
+    not count as sold.
+    """
+
+    def to_internal_value(self, data):
+        self.child.prefetched_flights = self.get_flights(data)
+        try:
+            tickets = super().to_internal_value(data)
+        finally:
+            self.child.prefetched_flights = None
+        self.validate_unique_seats(tickets)
+        return tickets
+
+    @staticmethod
+    def get_flights(data) -> dict:
+        """
+        Loads the flights referenced by the raw tickets data.
+
+        Args:
+            data (list): The raw tickets data.
+
+        Returns:
+            dict: Flights with their airplanes by ID.
+        """
+        flight_ids = set()
+        if isinstance(data, list):
+            for item in data:
+                try:
+                    flight_ids.add(uuid.UUID(str(item["flight"])))
+                except (KeyError, TypeError, ValueError):
+                    continue
+        return Flight.objects.select_related("airplane").in_bulk(flight_ids)
+
+    def validate_unique_seats(self, tickets) -> None:
+        """
+        Checks that none of the seats is sold with one query.
+
+        Args:
+            tickets (list): The validated tickets data.
+
+        Raises:
+            ValidationError: Per-ticket errors for the sold seats.
+        """
+        seats = [
+            (ticket["flight"].id, ticket["row"], ticket["seat"]) for ticket in tickets
+        ]
+        sold = filter_seats(Ticket.objects.all(), seats)
+        order = getattr(self.parent, "instance", None)
+        if order is not None:
+            sold = sold.exclude(order=order)
+        sold = set(seats).intersection(sold.values_list("flight_id", "row", "seat"))
+        if not sold:
+            return
+
+        increment("airport_booking_conflicts_total")
+        message = UniqueTogetherValidator.message.format(
+            field_names="flight, row, seat"
+        )
+        raise serializers.ValidationError(
+            [
+                {api_settings.NON_FIELD_ERRORS_KEY: [message]} if seat in sold else {}
+                for seat in seats
+            ],
+            code="unique",
+        )
+
+
+class OrderTicketSerializer(TicketSerializer):
+    """
+    Serializer for the tickets of an order, validated in batch
+    by `OrderTicketListSerializer` instead of per ticket.
+
+    Meta:
+        validators: Empty, seat uniqueness is checked for
+        all tickets at once by the list serializer.
+    """
+
+    flight = PrefetchedFlightField(
+        queryset=Flight.objects.select_related("airplane")
+    )
+
+    class Meta(TicketSerializer.Meta):
+        validators = []
+        list_serializer_class = OrderTicketListSerializer
+
+
+class OrderSerializer(SerializerTimingMixin, serializers.ModelSerializer):
     """
     Serializer for the Order model, used to create and manage
     orders for tickets.
@@ -283,7 +415,7 @@ class OrderSerializer(serializers.ModelSerializer):
         tickets in a transaction.
     """
 
-    tickets = TicketSerializer(many=True, read_only=False, allow_empty=False)
+    tickets = OrderTicketSerializer(many=True, read_only=False, allow_empty=False)
 
     class Meta:
         model = Order
@@ -315,10 +447,8 @@ class OrderSerializer(serializers.ModelSerializer):
                 )
                 for ticket in tickets_data
             ]
-            for ticket in tickets:
-                ticket.full_clean()
 
-            Ticket.objects.bulk_create(tickets)
+            book_tickets(tickets, order.user)
 
             return order
 
@@ -329,10 +459,13 @@ class OrderSerializer(serializers.ModelSerializer):
 
         This method first updates the main fields of the Order
         instance with the provided validated data.
-        If the validated data contains tickets, the existing
-        tickets associated with the Order are deleted and replaced
-        with the new tickets. This ensures that only the
-        tickets provided in the update request are kept.
+        If the validated data contains tickets, the tickets of
+        the Order are updated to match them: only tickets of
+        seats that are no longer requested are deleted and only
+        new seats are booked, in one transaction under seat
+        locks. This ensures that only the tickets provided in
+        the update request are kept, while unchanged tickets
+        keep their IDs.
 
         Parameters:
         - instance (Order): The Order instance to be updated.
@@ -343,30 +476,23 @@ class OrderSerializer(serializers.ModelSerializer):
         Returns:
         - Order: The updated Order instance.
 
-        If tickets data is provided, the existing tickets
-        associated with the Order are deleted and replaced
-        with the new tickets
-        passed in the validated data. Otherwise, only the
-        other fields of the Order instance are updated.
+        If tickets data is not provided, only the other
+        fields of the Order instance are updated.
         """
 
         tickets_data = validated_data.pop("tickets", None)
-        instance = super().update(instance, validated_data)
-
-        if tickets_data is not None:
-            instance.tickets.all().delete()
 
-            tickets = [
-                Ticket(
-                    row=ticket.get("row"),
-                    seat=ticket.get("seat"),
-                    flight=ticket.get("flight"),
-                    order=instance,
+        with transaction.atomic():
+            instance = super().update(instance, validated_data)
+
+            if tickets_data is not None:
+                update_order_tickets(
+                    instance,
+                    [
+                        (ticket["flight"].id, ticket["row"], ticket["seat"])
+                        for ticket in tickets_data
+                    ],
                 )
-                for ticket in tickets_data
-            ]
-
-            Ticket.objects.bulk_create(tickets)
 
         return instance
 
@@ -385,3 +511,328 @@ class OrderListSerializer(OrderSerializer):
     """
 
     tickets = TicketSerializer(many=True, read_only=True)
+
+
+class BulkFlightSeatsSerializer(serializers.Serializer):
+    """
+    Serializer for the seats booked on one flight in a bulk
+    booking.
+
+    Seats are given as compact `[row, seat]` pairs and checked
+    in one pass against the airplane dimensions, without
+    a serializer per seat.
+
+    Fields:
+        flight (UUID): The primary key of the flight.
+        seats (list): The `[row, seat]` pairs to book.
+    """
+
+    flight = serializers.PrimaryKeyRelatedField(
+        queryset=Flight.objects.select_related("airplane")
+    )
+    seats = serializers.ListField(allow_empty=False)
+
+    max_errors = 10
+
+    def validate(self, attrs):
+        """
+        Validates that every seat is a `[row, seat]` pair within
+        the airplane dimensions, reporting the first invalid seats
+        by their index.
+        """
+        airplane = attrs["flight"].airplane
+        seats = []
+        errors = {}
+        for index, pair in enumerate(attrs["seats"]):
+            if not self.is_seat_pair(pair):
+                errors[index] = ["Must be a [row, seat] pair of integers."]
+            else:
+                row, seat = pair
+                try:
+                    Ticket.validate_seat(
+                        row,
+                        seat,
+                        airplane.rows,
+                        airplane.seats_in_row,
+                        serializers.ValidationError,
+                    )
+                except serializers.ValidationError as error:
+                    errors[index] = error.detail
+                else:
+                    seats.append((row, seat))
+            if len(errors) == self.max_errors:
+                break
+        if errors:
+            raise serializers.ValidationError({"seats": errors})
+        attrs["seats"] = seats
+        return attrs
+
+    @staticmethod
+    def is_seat_pair(pair) -> bool:
+        """
+        Returns whether a value is a `[row, seat]` pair of
+        integers; strings, floats and booleans are rejected
+        rather than coerced.
+        """
+        return (
+            isinstance(pair, (list, tuple))
+            and len(pair) == 2
+            and all(
+                isinstance(number, int) and not isinstance(number, bool)
+                for number in pair
+            )
+        )
+
+
+class BulkBookingSerializer(serializers.Serializer):
+    """
+    Serializer for block bookings of many seats across one
+    or more flights, e.g. charter or B2B cabin sales.
+
+    All seats are booked in one order with `book_tickets`,
+    inserted in batches of `batch_size` rows, and the response
+    is a summary of the booked seats per flight instead of
+    the tickets.
+
+    Fields:
+        flights (list): The seats to book, grouped by flight.
+
+    Attributes:
+        max_seats (int): The maximum number of seats per booking.
+        batch_size (int): The number of tickets per `INSERT`.
+    """
+
+    flights = BulkFlightSeatsSerializer(many=True, allow_empty=False)
+
+    max_seats = 10000
+    batch_size = 1000
+
+    def validate_flights(self, value):
+        """
+        Validates that the booking is not larger than `max_seats`.
+        """
+        if sum(len(group["seats"]) for group in value) > self.max_seats:
+            raise serializers.ValidationError(
+                f"At most {self.max_seats} seats can be booked at once."
+            )
+        return value
+
+    def create(self, validated_data):
+        """
+        Creates an order with the tickets of all the seats.
+        """
+        with transaction.atomic():
+            order = Order.objects.create(user=validated_data["user"])
+            tickets = [
+                Ticket(flight=group["flight"], row=row, seat=seat, order=order)
+                for group in validated_data["flights"]
+                for row, seat in group["seats"]
+            ]
+            book_tickets(tickets, order.user, batch_size=self.batch_size)
+        return order
+
+    def to_representation(self, instance):
+        booked = Counter()
+        for group in self.validated_data["flights"]:
+            booked[group["flight"].id] += len(group["seats"])
+        return {
+            "order": instance.id,
+            "created_at": instance.created_at,
+            "booked": sum(booked.values()),
+            "flights": [
+                {"flight": flight_id, "booked": count}
+                for flight_id, count in booked.items()
+            ],
+        }
+
+
+class SeatAllocationSerializer(serializers.Serializer):
+    """
+    Serializer for booking the best available seats of a flight
+    without choosing them.
+
+    Fields:
+        party_size (int): The number of seats to book.
+        together (bool): Whether the seats must be adjacent
+        in one row (default).
+        preference (str): Optional `window` or `aisle` preference.
+    """
+
+    party_size = serializers.IntegerField(min_value=1, max_value=20)
+    together = serializers.BooleanField(default=True)
+    preference = serializers.ChoiceField(
+        choices=("window", "aisle"), required=False, allow_null=True
+    )
+
+    def create(self, validated_data):
+        """
+        Creates an order with the allocated tickets.
+        """
+        with transaction.atomic():
+            order = Order.objects.create(user=validated_data["user"])
+            allocate_seats(
+                order,
+                validated_data["flight"],
+                validated_data["party_size"],
+                together=validated_data["together"],
+                preference=validated_data.get("preference"),
+            )
+        return order
+
+    def to_representation(self, instance):
+        return OrderListSerializer(instance, context=self.context).data
+
+
+class SeatHoldListSerializer(serializers.ListSerializer):
+    """
+    List serializer holding several seats at once, so a group
+    of seats is held all together or not at all.
+    """
+
+    def create(self, validated_data):
+        return hold_seats(
+            validated_data[0]["user"],
+            [
+                (attrs["flight"].id, attrs["row"], attrs["seat"])
+                for attrs in validated_data
+            ],
+        )
+
+
+class SeatHoldSerializer(SerializerTimingMixin, serializers.ModelSerializer):
+    """
+    Serializer for the SeatHold model, used to hold seats
+    before buying them.
+
+    Fields:
+        id (UUID): The unique identifier of the hold.
+        row (int): The row number of the seat on the airplane.
+        seat (int): The seat number within the row.
+        flight (UUID): The primary key of the flight.
+        expires_at (datetime): The moment the hold expires.
+
+    Meta:
+        validators: Empty, as the `unique_seat_hold` constraint
+        is checked under lock by `hold_seats`, where expired
+        holds and the user's own holds do not conflict.
+
+    Methods:
+        validate(attrs): Validates the seat information for the hold.
+        create(validated_data): Holds the seat, raising
+        `SeatsUnavailable` if it is taken.
+    """
+
+    flight = serializers.PrimaryKeyRelatedField(
+        queryset=Flight.objects.select_related("airplane")
+    )
+
+    class Meta:
+        model = SeatHold
+        fields = ("id", "row", "seat", "flight", "expires_at")
+        read_only_fields = ("id", "expires_at")
+        list_serializer_class = SeatHoldListSerializer
+        validators = []
+
+    def validate(self, attrs):
+        """
+        Validates that the seat is within the allowable range.
+        """
+        data = super().validate(attrs=attrs)
+        Ticket.validate_seat(
+            attrs["row"],
+            attrs["seat"],
+            attrs["flight"].airplane.rows,
+            attrs["flight"].airplane.seats_in_row,
+            serializers.ValidationError,
+        )
+        return data
+
+    def create(self, validated_data):
+        return hold_seats(
+            validated_data["user"],
+            [
+                (
+                    validated_data["flight"].id,
+                    validated_data["row"],
+                    validated_data["seat"],
+                )
+            ],
+        )[0]
+
+
+class ItinerarySearchSerializer(serializers.Serializer):
+    """
+    Serializer validating the query parameters of
+    the itinerary search.
+
+    Fields:
+        city_from (str): The source city.
+        city_to (str): The destination city.
+        departure_after (datetime): The earliest departure
+        of the first flight.
+        departure_before (datetime): The latest departure of
+        the first flight, one day after `departure_after`
+        by default.
+        max_legs (int): The maximum number of flights (1-3).
+        min_connection (int): The minimum connection time
+        in minutes.
+        max_connection (int): The maximum connection time
+        in minutes.
+        limit (int): The maximum number of itineraries.
+    """
+
+    city_from = serializers.CharField()
+    city_to = serializers.CharField()
+    departure_after = serializers.DateTimeField()
+    departure_before = serializers.DateTimeField(required=False)
+    max_legs = serializers.IntegerField(min_value=1, max_value=3, default=2)
+    min_connection = serializers.IntegerField(min_value=0, default=45)
+    max_connection = serializers.IntegerField(min_value=1, default=24 * 60)
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=10)
+
+    def validate(self, attrs):
+        """
+        Defaults the departure window to one day and checks
+        that the window and connection bounds are ordered and
+        that the window overlaps the flights held by the index,
+        from now until `ITINERARY_INDEX_HORIZON`.
+        """
+        attrs.setdefault(
+            "departure_before", attrs["departure_after"] + timedelta(days=1)
+        )
+        if attrs["departure_before"] < attrs["departure_after"]:
+            raise serializers.ValidationError(
+                {"departure_before": "Must not be before departure_after."}
+            )
+        now = timezone.now()
+        if attrs["departure_before"] < now:
+            raise serializers.ValidationError(
+                {"departure_before": "Must not be in the past."}
+            )
+        if attrs["departure_after"] >= now + ITINERARY_INDEX_HORIZON:
+            raise serializers.ValidationError(
+                {
+                    "departure_after": "Must be less than "
+                    f"{ITINERARY_INDEX_HORIZON.days} days from now."
+                }
+            )
+        if attrs["max_connection"] < attrs["min_connection"]:
+            raise serializers.ValidationError(
+                {"max_connection": "Must not be less than min_connection."}
+            )
+        return attrs
+
+
+class ExportSerializer(serializers.Serializer):
+    """
+    Serializer validating the query parameters of exports.
+
+    Fields:
+        output (str): `csv` (default) or `ndjson`.
+        since (datetime): Only rows at or after this moment.
+        until (datetime): Only rows before this moment.
+    """
+
+    output = serializers.ChoiceField(choices=("csv", "ndjson"), default="csv")
+    since = serializers.DateTimeField(required=False)
+    until = serializers.DateTimeField(required=False)
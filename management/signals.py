@@ -1,15 +1,101 @@
+import threading
+import weakref
+from collections import Counter
+
 from django.dispatch import receiver
 from django.db.models.signals import (
+    pre_save,
     post_save,
-    post_delete
+    pre_delete,
+    post_delete,
+    m2m_changed
 )
-from django.core.cache import cache
 
+from base.cache import (
+    get_instance_namespaces,
+    invalidate_namespaces,
+    register_cache_namespaces,
+    user_namespace,
+)
+from airport.models import Airplane
 from management.models import (
     Flight,
     Ticket,
     Order
 )
+from management.seat_map import (
+    mark_seats_sold,
+    release_seat_maps
+)
+
+
+class _TicketDeletion:
+    """
+    Tickets and orders collected by one `delete()` call.
+
+    Attributes:
+        tickets (dict): The tickets being deleted, by primary key.
+        orders (dict): The orders being deleted, by primary key.
+    """
+
+    def __init__(self) -> None:
+        self.tickets = {}
+        self.orders = {}
+
+
+class _TicketDeletions(threading.local):
+    """
+    Per-thread `_TicketDeletion` of each running `delete()` call.
+
+    Attributes:
+        by_origin (WeakKeyDictionary): Mapping of the instance or
+        queryset whose `delete()` collected the objects (the
+        `origin` of the delete signals) to its `_TicketDeletion`.
+    """
+
+    def __init__(self) -> None:
+        self.by_origin = weakref.WeakKeyDictionary()
+
+
+_deletions = _TicketDeletions()
+
+
+def get_ticket_user_namespaces(ticket) -> tuple:
+    """
+    Returns the cache namespace of the user owning the ticket order.
+
+    Args:
+        ticket (Ticket): The changed ticket.
+
+    Returns:
+        tuple: The user namespace, or nothing for tickets
+        without an order.
+    """
+    if ticket.order_id is None:
+        return ()
+    if Ticket.order.is_cached(ticket):
+        user_id = ticket.order.user_id
+    else:
+        user_id = (
+            Order.objects.filter(pk=ticket.order_id)
+            .values_list("user_id", flat=True)
+            .first()
+        )
+    return (user_namespace(user_id),) if user_id else ()
+
+
+register_cache_namespaces(Flight, "flight")
+register_cache_namespaces(
+    Ticket,
+    "flight",
+    per_instance=get_ticket_user_namespaces,
+    fallback=("ticket",),
+)
+register_cache_namespaces(
+    Order,
+    per_instance=lambda order: (user_namespace(order.user_id),),
+    fallback=("order",),
+)
 
 
 @receiver([post_save, post_delete], sender=Flight)
@@ -22,9 +108,10 @@ def invalidate_flight_cache(sender, instance, **kwargs):
     This receiver listens for `post_save` and `post_delete`
     signals on the `Flight` model.
     Whenever a Flight instance is saved or deleted, it will
-    clear the cache for all
-    flight views by deleting cache patterns that
-    match `*flight_view*`.
+    mark the `flight` cache namespace as dirty, making
+    all cached flight views stale once the transaction commits,
+    together with the `schedule` one the itinerary index is
+    rebuilt on (ticket sales only touch `flight`).
 
     Args:
         sender (Model): The model class that triggered
@@ -34,22 +121,23 @@ def invalidate_flight_cache(sender, instance, **kwargs):
         **kwargs: Additional keyword arguments passed
         by the signal dispatcher.
     """
-    cache.delete_pattern("*flight_view*")
+    invalidate_namespaces("flight", "schedule")
 
 
-@receiver([post_save, post_delete], sender=Ticket)
+@receiver(post_save, sender=Ticket)
 def invalidate_ticket_cache(sender, instance, **kwargs):
     """
     Signal receiver that invalidates the cache for
     ticket views when a Ticket instance
-    is created, updated, or deleted.
+    is created or updated.
 
-    This receiver listens for `post_save` and `post_delete`
-    signals on the `Ticket` model.
-    Whenever a Ticket instance is saved or deleted, it will
-    clear the cache for all
-    ticket views by deleting cache patterns that match
-    `*ticket_view*`.
+    This receiver listens for `post_save` signals on
+    the `Ticket` model.
+    Whenever a Ticket instance is saved, it will
+    mark the cache namespace of the user owning the ticket
+    and the `flight` one as dirty, as flight views show
+    seat availability. Deleted tickets are handled by
+    `uncount_deleted_tickets`.
 
     Args:
         sender (Model): The model class that triggered
@@ -59,7 +147,7 @@ def invalidate_ticket_cache(sender, instance, **kwargs):
         **kwargs: Additional keyword arguments passed by
         the signal dispatcher.
     """
-    cache.delete_pattern("*ticket_view*")
+    invalidate_namespaces(*get_instance_namespaces(instance))
 
 
 @receiver([post_save, post_delete], sender=Order)
@@ -72,9 +160,8 @@ def invalidate_order_cache(sender, instance, **kwargs):
     This receiver listens for `post_save` and `post_delete`
     signals on the `Order` model.
     Whenever an Order instance is saved or deleted, it
-    will clear the cache for all
-    order views by deleting cache patterns that match
-    `*order_view*`.
+    will mark the cache namespace of the order user as dirty,
+    leaving cached orders of other users untouched.
 
     Args:
         sender (Model): The model class that triggered
@@ -84,4 +171,215 @@ def invalidate_order_cache(sender, instance, **kwargs):
         **kwargs: Additional keyword arguments passed
         by the signal dispatcher.
     """
-    cache.delete_pattern("*order_view*")
+    invalidate_namespaces(*get_instance_namespaces(instance))
+
+
+@receiver(m2m_changed, sender=Flight.crew.through)
+def invalidate_flight_crew_cache(sender, instance, action, **kwargs):
+    """
+    Signal receiver that invalidates the cache for flight
+    views when the crew of a flight changes, as crew
+    assignments do not send `post_save` for the flight.
+
+    Args:
+        sender (Model): The intermediate model of
+        the `Flight.crew` relation.
+        instance (Model): The flight or crew member whose
+        relation changed.
+        action (str): The kind of change, e.g. `post_add`.
+        **kwargs: Additional keyword arguments passed
+        by the signal dispatcher.
+    """
+    if action in ("post_add", "post_remove", "post_clear"):
+        invalidate_namespaces("flight")
+
+
+@receiver(pre_save, sender=Ticket)
+def remember_ticket_flight(sender, instance, **kwargs):
+    """
+    Signal receiver that stores the flight an existing ticket
+    belonged to before it is saved, so that moving a ticket
+    to another flight keeps both `tickets_sold` counters in sync.
+
+    Args:
+        sender (Model): The model class that triggered
+        the signal (in this case, `Ticket`).
+        instance (Ticket): The instance of the `Ticket` model
+        that is about to be saved.
+        **kwargs: Additional keyword arguments passed by
+        the signal dispatcher.
+    """
+    instance._previous_flight_id = None
+    if not instance._state.adding:
+        instance._previous_flight_id = (
+            Ticket.objects.filter(pk=instance.pk)
+            .values_list("flight_id", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Ticket)
+def count_saved_ticket(sender, instance, created, **kwargs):
+    """
+    Signal receiver that increments the `tickets_sold` counter
+    of the ticket flight and marks the seat in the cached seat
+    map when a Ticket instance is created, or moves the count
+    and drops the cached seat maps when the ticket changed.
+
+    Bulk creation bypasses this receiver, so callers using
+    `bulk_create` adjust the counter with
+    `Flight.adjust_tickets_sold` themselves.
+
+    Args:
+        sender (Model): The model class that triggered
+        the signal (in this case, `Ticket`).
+        instance (Ticket): The instance of the `Ticket` model
+        that was saved.
+        created (bool): Whether a new row was inserted.
+        **kwargs: Additional keyword arguments passed by
+        the signal dispatcher.
+    """
+    previous_flight_id = getattr(instance, "_previous_flight_id", None)
+    if created:
+        Flight.adjust_tickets_sold({instance.flight_id: 1})
+        mark_seats_sold([instance])
+    elif previous_flight_id and previous_flight_id != instance.flight_id:
+        Flight.adjust_tickets_sold(
+            {previous_flight_id: -1, instance.flight_id: 1}
+        )
+        release_seat_maps([previous_flight_id, instance.flight_id])
+    else:
+        release_seat_maps([instance.flight_id])
+
+
+@receiver(pre_delete, sender=Ticket)
+@receiver(pre_delete, sender=Order)
+def collect_deleted_ticket(sender, instance, origin=None, **kwargs):
+    """
+    Signal receiver that remembers the tickets and orders
+    collected by a `delete()` call, so that
+    `uncount_deleted_tickets` handles them all at once.
+
+    Django sends `pre_delete` for every collected object before
+    deleting any of them, so the collection is complete when
+    the first `post_delete` of a ticket arrives.
+
+    Args:
+        sender (Model): The model class that triggered
+        the signal (`Ticket` or `Order`).
+        instance (Model): The ticket or order about to be deleted.
+        origin (Model | QuerySet, optional): The instance or
+        queryset whose `delete()` collected the objects.
+        **kwargs: Additional keyword arguments passed by
+        the signal dispatcher.
+    """
+    if origin is None:
+        return
+    deletion = _deletions.by_origin.get(origin)
+    if deletion is None:
+        deletion = _deletions.by_origin[origin] = _TicketDeletion()
+    if sender is Ticket:
+        deletion.tickets[instance.pk] = instance
+    else:
+        deletion.orders[instance.pk] = instance
+
+
+@receiver(post_delete, sender=Ticket)
+def uncount_deleted_tickets(sender, instance, origin=None, **kwargs):
+    """
+    Signal receiver that decrements the `tickets_sold` counters
+    of the ticket flights, drops their cached seat maps and
+    invalidates the cache namespaces of the tickets when
+    Ticket instances are deleted, including cascade deletes
+    of orders.
+
+    The first `post_delete` of a `delete()` call handles all
+    the tickets collected by `collect_deleted_ticket`, with one
+    `UPDATE` per flight, and reads the owners of the tickets from
+    the collected orders, so deleting an order costs the same
+    number of queries whatever the number of its tickets.
+
+    Args:
+        sender (Model): The model class that triggered
+        the signal (in this case, `Ticket`).
+        instance (Ticket): The instance of the `Ticket` model
+        that was deleted.
+        origin (Model | QuerySet, optional): The instance or
+        queryset whose `delete()` collected the tickets.
+        **kwargs: Additional keyword arguments passed by
+        the signal dispatcher.
+    """
+    if origin is None:
+        deletion = _TicketDeletion()
+        deletion.tickets[instance.pk] = instance
+    else:
+        deletion = _deletions.by_origin.pop(origin, None)
+        if deletion is None:
+            return
+    tickets = list(deletion.tickets.values())
+    orders = deletion.orders
+    missing = {
+        ticket.order_id
+        for ticket in tickets
+        if ticket.order_id is not None
+        and ticket.order_id not in orders
+        and not Ticket.order.is_cached(ticket)
+    }
+    if missing:
+        orders = {**orders, **Order.objects.in_bulk(missing)}
+    for ticket in tickets:
+        if ticket.order_id in orders:
+            ticket.order = orders[ticket.order_id]
+
+    removed = Counter(ticket.flight_id for ticket in tickets)
+    Flight.adjust_tickets_sold(
+        {flight_id: -count for flight_id, count in removed.items()}
+    )
+    release_seat_maps(removed)
+    invalidate_namespaces(
+        *{
+            namespace
+            for ticket in tickets
+            for namespace in get_instance_namespaces(ticket)
+        }
+    )
+
+
+@receiver(post_save, sender=Flight)
+def release_flight_seat_map(sender, instance, created, **kwargs):
+    """
+    Signal receiver that drops the cached seat map of an updated
+    flight, since its airplane (and so the seat layout) may
+    have changed.
+
+    Args:
+        sender (Model): The model class that triggered
+        the signal (in this case, `Flight`).
+        instance (Flight): The instance of the `Flight` model
+        that was saved.
+        created (bool): Whether a new row was inserted.
+        **kwargs: Additional keyword arguments passed by
+        the signal dispatcher.
+    """
+    if not created:
+        release_seat_maps([instance.id])
+
+
+@receiver(post_save, sender=Airplane)
+def release_airplane_seat_maps(sender, instance, created, **kwargs):
+    """
+    Signal receiver that drops the cached seat maps of all
+    flights of an updated airplane, as its `rows` or
+    `seats_in_row` may have changed.
+
+    Args:
+        sender (Model): The model class that triggered
+        the signal (in this case, `Airplane`).
+        instance (Airplane): The instance of the `Airplane` model
+        that was saved.
+        created (bool): Whether a new row was inserted.
+        **kwargs: Additional keyword arguments passed by
+        the signal dispatcher.
+    """
+    if not created:
+        release_seat_maps(instance.flights.values_list("id", flat=True))
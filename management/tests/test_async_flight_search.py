@@ -0,0 +1,129 @@
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.test import AsyncClient, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+
+from airport.models import Airplane, AirplaneType, Airport, Crew, Route
+from airport.tests.base_test_class import BaseApiTest
+from base.cache import bump_namespace_versions
+from base.query_budget import QueryBudgetTestMixin
+from management.models import Flight
+from management.serializers import FlightListSerializer
+
+
+ASYNC_FLIGHT_URL = reverse("management:async-flights")
+FLIGHT_URL = reverse("management:flights-list")
+
+
+class AsyncFlightSearchTests(QueryBudgetTestMixin, BaseApiTest):
+    """
+    Test suite for the async flight search endpoint.
+    """
+
+    def setUp(self):
+        """
+        Set up two flights and authenticate with a JWT, as the
+        async views do not go through DRF test authentication.
+        """
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com", password="test1234"
+        )
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+        airplane = Airplane.objects.create(
+            name="Boeing",
+            airplane_type=AirplaneType.objects.create(name="commercial"),
+            rows=20,
+            seats_in_row=10,
+        )
+        kyiv = Airport.objects.create(name="Boryspil", closest_big_city="Kyiv")
+        lviv = Airport.objects.create(name="Danylo Halytskyi", closest_big_city="Lviv")
+        self.flight = Flight.objects.create(
+            route=Route.objects.create(source=kyiv, destination=lviv, distance=450),
+            airplane=airplane,
+            departure_time=datetime(2024, 12, 24, 16, 0, 0),
+            arrival_time=datetime(2024, 12, 24, 22, 0, 0),
+        )
+        self.flight.crew.add(Crew.objects.create(first_name="John", last_name="Doe"))
+        Flight.objects.create(
+            route=Route.objects.create(source=lviv, destination=kyiv, distance=450),
+            airplane=airplane,
+            departure_time=datetime(2024, 12, 26, 18, 0, 0),
+            arrival_time=datetime(2024, 12, 26, 20, 0, 0),
+        )
+
+    def test_auth_required(self):
+        self.client.credentials()
+        response = self.client.get(ASYNC_FLIGHT_URL)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn("Bearer", response["WWW-Authenticate"])
+
+    def test_matches_sync_flight_list(self):
+        """
+        Test that the async search returns the page of the sync
+        flight list.
+        """
+        response = self.client.get(ASYNC_FLIGHT_URL, {"limit": 1, "offset": 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.client.force_authenticate(self.user)
+        expected = self.client.get(FLIGHT_URL, {"limit": 1, "offset": 1})
+        self.assertEqual(response.json()["results"], expected.json()["results"])
+        self.assertEqual(response.json()["count"], 2)
+        self.assertEqual(
+            response.json()["previous"],
+            f"http://testserver{ASYNC_FLIGHT_URL}?limit=1",
+        )
+
+    def test_filters(self):
+        response = self.client.get(
+            ASYNC_FLIGHT_URL, {"city_from": "kyiv", "departure_date": "2024-12-24"}
+        )
+        flights = Flight.objects.filter(id=self.flight.id)
+        self.assertEqual(
+            response.json()["results"],
+            FlightListSerializer(flights, many=True).data,
+        )
+
+    def test_invalid_filter(self):
+        response = self.client.get(ASYNC_FLIGHT_URL, {"departure_date": "tomorrow"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("departure_date", response.json())
+
+    def test_responses_are_cached_until_invalidated(self):
+        """
+        Test that responses are served from Redis until a namespace
+        the flights depend on is invalidated.
+        """
+        self.client.get(ASYNC_FLIGHT_URL)
+        Flight.objects.filter(id=self.flight.id).delete()
+        self.assertEqual(self.client.get(ASYNC_FLIGHT_URL).json()["count"], 2)
+
+        bump_namespace_versions("flight")
+        self.assertEqual(self.client.get(ASYNC_FLIGHT_URL).json()["count"], 1)
+
+    def test_query_budget(self):
+        self.assertQueryBudget(ASYNC_FLIGHT_URL)
+
+    @override_settings(QUERY_BUDGET_MODE="warn", INSTRUMENTATION_SAMPLE_RATE=1)
+    async def test_queries_are_measured_under_asgi(self):
+        """
+        Test that the queries the async view runs in its
+        `sync_to_async` worker thread are counted by the query
+        budget and instrumentation middlewares.
+        """
+        token = AccessToken.for_user(self.user)
+        with self.assertLogs("base.query_budget", "DEBUG") as logs:
+            response = await AsyncClient().get(
+                ASYNC_FLIGHT_URL, headers={"Authorization": f"Bearer {token}"}
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn(
+            "GET AsyncFlightSearchView.get: 4 queries", "\n".join(logs.output)
+        )
+        self.assertIn('desc="4 queries"', response["Server-Timing"])
@@ -0,0 +1,108 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from management.benchmarks import (
+    BENCHMARK_CACHE_DB,
+    BenchmarkRunner,
+    benchmark_settings,
+    compare_reports,
+)
+
+
+SCALE = {
+    "airports": 3,
+    "routes_per_airport": 1,
+    "airplanes": 2,
+    "crews": 3,
+    "months": 1,
+    "flights_per_week": 1,
+    "users": 5,
+}
+
+
+class BenchmarkTests(TestCase):
+    """
+    Test suite for the API benchmark runner.
+    """
+
+    def test_run_size_measures_all_scenarios(self):
+        """
+        Test that every scenario is measured, cold and (for GET
+        requests) warm, with successful responses.
+        """
+        results = BenchmarkRunner(repeat=2).run_size("test", SCALE)
+
+        modes = {(result["scenario"], result["mode"]) for result in results}
+        self.assertIn(("flights_list_filtered", "warm"), modes)
+        self.assertIn(("orders_create", "cold"), modes)
+        self.assertNotIn(("orders_create", "warm"), modes)
+        self.assertEqual(len(modes), len(results))
+        for result in results:
+            self.assertIn(result["status"], (200, 201), result["scenario"])
+            self.assertGreater(result["alloc_peak_kb"], 0)
+            self.assertLessEqual(
+                result["latency_ms"]["min"], result["latency_ms"]["p95"]
+            )
+
+        by_key = {(result["scenario"], result["mode"]): result for result in results}
+        self.assertGreater(by_key["flights_list", "cold"]["queries"], 0)
+        self.assertLess(
+            by_key["flights_list", "warm"]["queries"],
+            by_key["flights_list", "cold"]["queries"],
+        )
+
+    @override_settings(DEBUG=True)
+    def test_benchmark_settings_are_isolated(self):
+        """
+        Test that benchmarks use their own cache database and key
+        prefix without metrics, and the settings are restored
+        even when a run fails.
+        """
+        cache.set("shared", 1)
+        with self.assertRaises(RuntimeError), benchmark_settings():
+            self.assertFalse(settings.DEBUG)
+            self.assertFalse(settings.METRICS_ENABLED)
+            self.assertTrue(
+                settings.CACHES["default"]["LOCATION"].endswith(
+                    f"/{BENCHMARK_CACHE_DB}"
+                )
+            )
+            self.assertIsNone(cache.get("shared"))
+            cache.set("benchmark", 1)
+            raise RuntimeError
+
+        self.assertTrue(settings.DEBUG)
+        self.assertEqual(cache.get("shared"), 1)
+        self.assertIsNone(cache.get("benchmark"))
+
+    def test_compare_reports(self):
+        """
+        Test that results are compared with the baseline by size,
+        scenario and mode.
+        """
+
+        def report(median, queries):
+            return {
+                "results": [
+                    {
+                        "size": "small",
+                        "scenario": "flights_list",
+                        "mode": "cold",
+                        "latency_ms": {"median": median},
+                        "queries": queries,
+                    }
+                ]
+            }
+
+        self.assertEqual(
+            compare_reports(report(10.0, 3), report(12.0, 4)),
+            [
+                {
+                    "key": ("small", "flights_list", "cold"),
+                    "median_change": 20.0,
+                    "queries_change": 1,
+                }
+            ],
+        )
+        self.assertEqual(compare_reports({"results": []}, report(12.0, 4)), [])
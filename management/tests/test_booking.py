@@ -0,0 +1,273 @@
+from datetime import datetime, timedelta
+from unittest import mock
+
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework import status
+
+from airport.tests.base_test_class import BaseApiTest
+from airport.models import (
+    AirplaneType,
+    Airplane,
+    Airport,
+    Route,
+)
+from management.models import Flight, SeatHold, Ticket
+
+
+ORDER_URL = reverse("management:orders-list")
+HOLD_URL = reverse("management:holds-list")
+BULK_URL = reverse("management:orders-bulk")
+
+
+def allocate_url(flight_id):
+    """
+    Returns the URL allocating seats on a flight.
+
+    Args:
+        flight_id (UUID): The ID of the flight.
+
+    Returns:
+        str: The URL for the seat allocation view.
+    """
+    return reverse("management:flights-allocate", args=(flight_id,))
+
+
+class SeatReservationApiTests(BaseApiTest):
+    """
+    Test suite for seat holds and conflict handling of bookings.
+    """
+
+    def setUp(self):
+        """
+        Sets up two users and a flight to hold seats on.
+        """
+        self.user = get_user_model().objects.create_user(
+            email="test@mail.com", password="test1234"
+        )
+        self.other_user = get_user_model().objects.create_user(
+            email="other@mail.com", password="test1234"
+        )
+        airplane = Airplane.objects.create(
+            name="test_airplane",
+            airplane_type=AirplaneType.objects.create(name="test_air_type"),
+            rows=10,
+            seats_in_row=6,
+        )
+        route = Route.objects.create(
+            source=Airport.objects.create(name="kbp", closest_big_city="Kyiv"),
+            destination=Airport.objects.create(name="lwo", closest_big_city="Lviv"),
+            distance=450,
+        )
+        self.flight = Flight.objects.create(
+            route=route,
+            airplane=airplane,
+            departure_time=datetime(2024, 12, 24, 16, 0, 0),
+            arrival_time=datetime(2024, 12, 24, 22, 0, 0),
+        )
+
+    def seat(self, row, seat):
+        return {"flight": self.flight.id, "row": row, "seat": seat}
+
+    def test_hold_seats(self):
+        """
+        Test that a list of seats is held for the user.
+        """
+        self.client.force_authenticate(self.user)
+        response = self.client.post(
+            HOLD_URL, [self.seat(1, 1), self.seat(1, 2)], format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(SeatHold.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(self.client.get(HOLD_URL).data["count"], 2)
+
+    def test_seat_held_by_other_user_conflicts(self):
+        """
+        Test that ordering a seat held by another user returns 409
+        with the taken seats.
+        """
+        self.client.force_authenticate(self.other_user)
+        self.client.post(HOLD_URL, self.seat(1, 1), format="json")
+
+        self.client.force_authenticate(self.user)
+        response = self.client.post(
+            ORDER_URL,
+            {"tickets": [self.seat(1, 1), self.seat(1, 2)]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(
+            response.data["seats"], [{"flight": self.flight.id, "row": 1, "seat": 1}]
+        )
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_expired_hold_does_not_conflict(self):
+        """
+        Test that an expired hold of another user can be taken over.
+        """
+        SeatHold.objects.create(
+            flight=self.flight,
+            row=1,
+            seat=1,
+            user=self.other_user,
+            expires_at=timezone.now() - timedelta(seconds=1),
+        )
+        self.client.force_authenticate(self.user)
+        response = self.client.post(HOLD_URL, self.seat(1, 1), format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_order_consumes_own_hold(self):
+        """
+        Test that ordering a held seat releases the hold.
+        """
+        self.client.force_authenticate(self.user)
+        self.client.post(HOLD_URL, self.seat(2, 3), format="json")
+        response = self.client.post(
+            ORDER_URL, {"tickets": [self.seat(2, 3)]}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(SeatHold.objects.exists())
+
+    def test_duplicate_seats_in_order_conflict(self):
+        """
+        Test that requesting the same seat twice returns 409
+        instead of a database error.
+        """
+        self.client.force_authenticate(self.user)
+        response = self.client.post(
+            ORDER_URL,
+            {"tickets": [self.seat(1, 1), self.seat(1, 1)]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+    def test_bulk_booking_books_whole_rows(self):
+        """
+        Test that a block of seats is booked in one order with a summary.
+        """
+        self.client.force_authenticate(self.user)
+        seats = [[row, seat] for row in range(1, 6) for seat in range(1, 7)]
+        response = self.client.post(
+            BULK_URL,
+            {"flights": [{"flight": self.flight.id, "seats": seats}]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["booked"], 30)
+        self.assertEqual(
+            response.data["flights"], [{"flight": self.flight.id, "booked": 30}]
+        )
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.tickets_sold, 30)
+        self.assertEqual(
+            Ticket.objects.filter(order_id=response.data["order"]).count(), 30
+        )
+
+    def test_bulk_booking_conflict_books_nothing(self):
+        """
+        Test that a block containing a sold seat is rejected as a whole,
+        also when seats are matched per flight rather than one by one.
+        """
+        Ticket.objects.create(flight=self.flight, row=3, seat=3)
+        self.client.force_authenticate(self.user)
+        seats = [[row, seat] for row in range(1, 6) for seat in range(1, 7)]
+        with mock.patch("management.booking.SEATS_FILTER_LIMIT", 10):
+            response = self.client.post(
+                BULK_URL,
+                {"flights": [{"flight": self.flight.id, "seats": seats}]},
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(
+            response.data["seats"], [{"flight": self.flight.id, "row": 3, "seat": 3}]
+        )
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    def test_bulk_booking_reports_invalid_seats_by_index(self):
+        """
+        Test that seats outside the airplane are reported by their index.
+        """
+        self.client.force_authenticate(self.user)
+        response = self.client.post(
+            BULK_URL,
+            {"flights": [{"flight": self.flight.id, "seats": [[1, 1], [11, 1]]}]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn(1, response.data["flights"][0]["seats"])
+
+    def test_bulk_booking_rejects_non_integer_pairs(self):
+        """
+        Test that strings, floats, booleans and pairs of the wrong
+        length are rejected instead of being coerced to seats.
+        """
+        self.client.force_authenticate(self.user)
+        seats = ["12", [3.9, 1], [1, True], [1, "2"], [1, 2, 3]]
+        response = self.client.post(
+            BULK_URL,
+            {"flights": [{"flight": self.flight.id, "seats": seats}]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            sorted(response.data["flights"][0]["seats"]), list(range(len(seats)))
+        )
+        self.assertEqual(Ticket.objects.count(), 0)
+
+    def test_allocate_adjacent_seats(self):
+        """
+        Test that the best available adjacent seats are booked.
+        """
+        Ticket.objects.create(flight=self.flight, row=1, seat=2)
+        self.client.force_authenticate(self.user)
+        response = self.client.post(
+            allocate_url(self.flight.id),
+            {"party_size": 3, "preference": "window"},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            sorted(
+                (ticket["row"], ticket["seat"]) for ticket in response.data["tickets"]
+            ),
+            [(1, 4), (1, 5), (1, 6)],
+        )
+
+    def test_allocate_skips_seats_held_by_others(self):
+        """
+        Test that seats held by another user are not allocated.
+        """
+        SeatHold.objects.create(
+            flight=self.flight,
+            row=1,
+            seat=1,
+            user=self.other_user,
+            expires_at=timezone.now() + timedelta(minutes=5),
+        )
+        self.client.force_authenticate(self.user)
+        response = self.client.post(
+            allocate_url(self.flight.id), {"party_size": 3}, format="json"
+        )
+        self.assertEqual(
+            sorted(
+                (ticket["row"], ticket["seat"]) for ticket in response.data["tickets"]
+            ),
+            [(1, 4), (1, 5), (1, 6)],
+        )
+
+    def test_allocate_without_enough_seats_conflicts(self):
+        """
+        Test that a party larger than the free seats gets 409.
+        """
+        self.client.force_authenticate(self.user)
+        response = self.client.post(
+            allocate_url(self.flight.id),
+            {"party_size": 7},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
@@ -0,0 +1,56 @@
+import json
+from datetime import datetime
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from airport.models import (
+    AirplaneType,
+    Airplane,
+    Airport,
+    Route,
+)
+from management.models import Flight
+
+
+class ExplainFlightSearchCommandTests(TestCase):
+    """
+    Test suite for the `explain_flight_search` management command.
+    """
+
+    def setUp(self):
+        """
+        Set up a flight to sample the filter values from.
+        """
+        Flight.objects.create(
+            route=Route.objects.create(
+                source=Airport.objects.create(name="kbp", closest_big_city="Kyiv"),
+                destination=Airport.objects.create(name="lwo", closest_big_city="Lviv"),
+                distance=450,
+            ),
+            airplane=Airplane.objects.create(
+                name="test_airplane",
+                airplane_type=AirplaneType.objects.create(name="test_air_type"),
+                rows=10,
+                seats_in_row=6,
+            ),
+            departure_time=datetime(2024, 12, 24, 16, 0, 0),
+            arrival_time=datetime(2024, 12, 24, 22, 0, 0),
+        )
+
+    def test_report_covers_all_scenarios(self):
+        """
+        Test that every scenario is explained with sampled filter values.
+        """
+        out = StringIO()
+        call_command("explain_flight_search", "--json", stdout=out)
+        report = {entry["scenario"]: entry for entry in json.loads(out.getvalue())}
+
+        self.assertEqual(report["no_filters"]["count"], 1)
+        self.assertEqual(
+            report["city_from_city_to_date"]["params"],
+            {"city_from": "Kyiv", "city_to": "Lviv", "departure_date": "2024-12-24"},
+        )
+        self.assertEqual(report["city_from_city_to_date"]["rows"], 1)
+        self.assertTrue(report["city_from"]["plan"])
@@ -0,0 +1,131 @@
+import csv
+import json
+from datetime import datetime
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from rest_framework import status
+
+from airport.tests.base_test_class import BaseApiTest
+from airport.models import (
+    AirplaneType,
+    Airplane,
+    Airport,
+    Route,
+)
+from management.models import Flight, Order, Ticket
+
+
+def export_url(name):
+    """
+    Returns the URL of an export.
+
+    Args:
+        name (str): The name of the export.
+
+    Returns:
+        str: The URL for the export view.
+    """
+    return reverse("management:exports", args=(name,))
+
+
+class ExportTests(BaseApiTest):
+    """
+    Test suite for streaming exports.
+    """
+
+    def setUp(self):
+        """
+        Sets up an admin user and an order with two tickets.
+        """
+        self.admin = get_user_model().objects.create_superuser(
+            email="admin@mail.com", password="test1234"
+        )
+        self.client.force_authenticate(self.admin)
+        self.flight = Flight.objects.create(
+            route=Route.objects.create(
+                source=Airport.objects.create(name="kbp", closest_big_city="Kyiv"),
+                destination=Airport.objects.create(name="lwo", closest_big_city="Lviv"),
+                distance=450,
+            ),
+            airplane=Airplane.objects.create(
+                name="test_airplane",
+                airplane_type=AirplaneType.objects.create(name="test_air_type"),
+                rows=10,
+                seats_in_row=6,
+            ),
+            departure_time=datetime(2024, 12, 24, 16, 0, 0),
+            arrival_time=datetime(2024, 12, 24, 22, 0, 0),
+        )
+        order = Order.objects.create(user=self.admin)
+        for seat in (1, 2):
+            Ticket.objects.create(flight=self.flight, row=1, seat=seat, order=order)
+
+    def test_csv_export(self):
+        """
+        Test that tickets are streamed as CSV with a header row.
+        """
+        response = self.client.get(export_url("tickets"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        rows = list(
+            csv.reader(b"".join(response.streaming_content).decode().splitlines())
+        )
+        self.assertEqual(rows[0][-2:], ["row", "seat"])
+        self.assertEqual(len(rows), 3)
+
+    def test_ndjson_export(self):
+        """
+        Test that flights are streamed as newline-delimited JSON.
+        """
+        response = self.client.get(export_url("flights"), {"output": "ndjson"})
+
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        flight = json.loads(lines[0])
+        self.assertEqual(flight["id"], str(self.flight.id))
+        self.assertEqual(flight["tickets_sold"], 2)
+        self.assertEqual(flight["departure_time"], "2024-12-24T16:00:00")
+
+    def test_export_time_range(self):
+        """
+        Test that since/until limit the exported rows.
+        """
+        response = self.client.get(
+            export_url("flights"), {"output": "ndjson", "since": "2025-01-01"}
+        )
+        self.assertEqual(b"".join(response.streaming_content), b"")
+
+    def test_export_requires_admin(self):
+        """
+        Test that regular users cannot export data.
+        """
+        user = get_user_model().objects.create_user(
+            email="test@mail.com", password="test1234"
+        )
+        self.client.force_authenticate(user)
+        response = self.client.get(export_url("orders"))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_export_command(self):
+        """
+        Test that the export command writes the same rows.
+        """
+        out = StringIO()
+        call_command("export_data", "orders", "--output", "ndjson", stdout=out)
+        order = json.loads(out.getvalue())
+        self.assertEqual(order["user"], "admin@mail.com")
+        self.assertEqual(order["tickets"], 2)
+
+    def test_export_command_invalid_moment(self):
+        """
+        Test that malformed and out of range dates are rejected
+        with a command error.
+        """
+        for value in ("yesterday", "2025-02-30", "2025-01-01T25:00"):
+            with self.subTest(value=value), self.assertRaisesMessage(
+                CommandError, f"Invalid date/time: {value}"
+            ):
+                call_command("export_data", "orders", "--since", value)
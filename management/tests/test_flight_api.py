@@ -1,5 +1,9 @@
+import base64
+import json
+import unittest
 from datetime import datetime
 
+from django.db import connection
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from rest_framework import status
@@ -12,7 +16,9 @@ from airport.models import (
     Airport,
     Crew
 )
-from management.models import Flight
+from base.pagination import KeysetPagination
+from management.models import Flight, Ticket
+from management.views import FlightViewSet
 from management.serializers import (
     FlightListSerializer,
     FlightDetailSerializer
@@ -126,6 +132,20 @@ class AuthenticatedFlightApiTest(BaseApiTest):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["results"], serializer.data)
 
+    def test_flight_list_available_seats_from_counter(self):
+        """
+        Test that available seats are read from the sold tickets counter.
+        """
+        Ticket.objects.create(row=1, seat=1, flight=self.flight)
+        response = self.client.get(FLIGHT_URL)
+        flights = {
+            flight["id"]: flight for flight in response.data["results"]
+        }
+        self.assertEqual(
+            flights[str(self.flight.id)]["count_available_seats"],
+            self.airplane.capacity - 1,
+        )
+
     def test_filter_flight_by_city_from(self):
         """
         Test filtering flights by the source city.
@@ -157,6 +177,126 @@ class AuthenticatedFlightApiTest(BaseApiTest):
         serializer = FlightListSerializer(flights, many=True)
         self.assertEqual(response.data["results"], serializer.data)
 
+    def test_filter_flight_by_departure_date(self):
+        """
+        Test filtering flights departing on a date.
+        """
+        response = self.client.get(FLIGHT_URL, {"departure_date": "2024-12-26"})
+        self.assertEqual(
+            [flight["id"] for flight in response.data["results"]],
+            [str(self.second_flight.id)],
+        )
+
+    def test_filter_flight_by_departure_range(self):
+        """
+        Test filtering flights by a half-open departure time range.
+        """
+        response = self.client.get(
+            FLIGHT_URL,
+            {
+                "departure_after": "2024-12-24T16:00:00",
+                "departure_before": "2024-12-26T18:00:00",
+            },
+        )
+        self.assertEqual(
+            [flight["id"] for flight in response.data["results"]],
+            [str(self.flight.id)],
+        )
+
+    def test_filter_flight_by_arrival_window(self):
+        """
+        Test filtering flights by an inclusive arrival time window.
+        """
+        response = self.client.get(
+            FLIGHT_URL,
+            {
+                "arrival_window_after": "2024-12-24T00:00:00",
+                "arrival_window_before": "2024-12-26T20:00:00",
+            },
+        )
+        self.assertEqual(response.data["count"], 2)
+
+    def test_flight_list_cursor_pagination(self):
+        """
+        Test walking the flight list with keyset (cursor) pagination.
+        """
+        response = self.client.get(
+            FLIGHT_URL, {"pagination": "cursor", "limit": 1}
+        )
+        self.assertNotIn("count", response.data)
+        self.assertEqual(
+            response.data["results"][0]["id"], str(self.second_flight.id)
+        )
+
+        response = self.client.get(response.data["next"])
+
+        self.assertEqual(response.data["results"][0]["id"], str(self.flight.id))
+        self.assertIsNone(response.data["next"])
+
+    def test_flight_list_cursor_pagination_with_count(self):
+        """
+        Test that the total count is returned only when requested.
+        """
+        response = self.client.get(
+            FLIGHT_URL, {"pagination": "cursor", "with_count": "true"}
+        )
+        self.assertEqual(response.data["count"], 2)
+
+    def test_flight_list_invalid_cursor(self):
+        """
+        Test that a malformed cursor is rejected.
+        """
+        response = self.client.get(FLIGHT_URL, {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_flight_list_tampered_cursor(self):
+        """
+        Test that a well-formed cursor holding values invalid for
+        the ordering fields is rejected instead of failing the query.
+        """
+        for position in (
+            ["2024-12-24T16:00:00", "not-a-uuid"],
+            ["yesterday", str(self.flight.id)],
+            [1, 2],
+        ):
+            cursor = base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+            response = self.client.get(FLIGHT_URL, {"cursor": cursor})
+            self.assertEqual(
+                response.status_code, status.HTTP_404_NOT_FOUND, position
+            )
+
+    @unittest.skipUnless(connection.vendor == "sqlite", "SQLite plan format")
+    def test_flight_list_cursor_seeks_departure_index(self):
+        """
+        Test that the seek filter of a cursor page bounds the
+        leading ordering column, so the departure index is
+        searched as a range instead of scanned.
+        """
+        paginator = KeysetPagination()
+        paginator.ordering = FlightViewSet.keyset_ordering
+        queryset = Flight.objects.order_by(*paginator.ordering).filter(
+            paginator.get_seek_filter([self.flight.departure_time, self.flight.id])
+        )
+        plan = queryset.explain()
+        self.assertIn("USING INDEX flight_departure_idx (departure_time<?)", plan)
+        self.assertEqual(list(queryset), [])
+
+    def test_flight_list_offset_pagination_without_count(self):
+        """
+        Test limit/offset pagination skipping the count query.
+        """
+        response = self.client.get(
+            FLIGHT_URL, {"limit": 1, "with_count": "false"}
+        )
+        self.assertNotIn("count", response.data)
+        self.assertIsNotNone(response.data["next"])
+        self.assertIsNone(response.data["previous"])
+
+        response = self.client.get(response.data["next"])
+
+        self.assertEqual(response.data["results"][0]["id"], str(self.flight.id))
+        self.assertIsNone(response.data["next"])
+
     def test_retrieve_flight(self):
         """
         Test retrieving a specific flight's details.
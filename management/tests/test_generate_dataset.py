@@ -0,0 +1,91 @@
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.db.models import Count, F, Sum
+from django.test import TestCase
+
+from airport.models import Airport, Route
+from management.datasets import DatasetBuilder
+from management.schedule_import import ScheduleImporter
+from management.models import Flight, Ticket
+
+
+SCALE = {
+    "airports": 6,
+    "routes_per_airport": 2,
+    "airplanes": 3,
+    "crews": 5,
+    "months": 1,
+    "flights_per_week": 2,
+    "users": 10,
+}
+
+
+class GenerateDatasetTests(TestCase):
+    """
+    Test suite for the dataset generator.
+    """
+
+    def test_schedule_is_deterministic_by_seed(self):
+        """
+        Test that the same seed builds the same schedule.
+        """
+        self.assertEqual(
+            DatasetBuilder(seed=7, scale=SCALE).build_schedule(),
+            DatasetBuilder(seed=7, scale=SCALE).build_schedule(),
+        )
+        self.assertNotEqual(
+            DatasetBuilder(seed=7, scale=SCALE).build_schedule()["flights"],
+            DatasetBuilder(seed=8, scale=SCALE).build_schedule()["flights"],
+        )
+
+    def test_generate_dataset_command(self):
+        """
+        Test that the command inserts the schedule and bookings
+        with consistent sold tickets counters.
+        """
+        call_command(
+            "generate_dataset",
+            *(f"--{key.replace('_', '-')}={value}" for key, value in SCALE.items()),
+            "--load-factor=0.5",
+            stdout=StringIO(),
+        )
+
+        self.assertEqual(Airport.objects.count(), 6)
+        self.assertTrue(Route.objects.exists())
+        self.assertTrue(Flight.objects.exists())
+        self.assertEqual(
+            Flight.objects.aggregate(sold=Sum("tickets_sold"))["sold"],
+            Ticket.objects.count(),
+        )
+        mismatched = (
+            Flight.objects.annotate(count=Count("tickets"))
+            .exclude(count=F("tickets_sold"))
+            .count()
+        )
+        self.assertEqual(mismatched, 0)
+
+    def test_bookings_only_on_generated_flights(self):
+        """
+        Test that bookings are generated for the flights of the
+        run only, not for other flights without tickets.
+        """
+        ScheduleImporter().run(DatasetBuilder(seed=1, scale=SCALE).build_schedule())
+        existing = set(Flight.objects.values_list("id", flat=True))
+
+        builder = DatasetBuilder(seed=2, scale=SCALE)
+        importer = ScheduleImporter()
+        importer.run(builder.build_schedule())
+        builder.generate_bookings(importer.flight_ids)
+
+        self.assertTrue(importer.flight_ids)
+        self.assertFalse(Ticket.objects.filter(flight_id__in=existing).exists())
+        self.assertEqual(
+            set(Ticket.objects.values_list("flight_id", flat=True)),
+            set(importer.flight_ids),
+        )
+
+    def test_bookings_require_users(self):
+        with self.assertRaisesMessage(CommandError, "--users must be at least 1"):
+            call_command("generate_dataset", "--users=0", stdout=StringIO())
+        self.assertFalse(Flight.objects.exists())
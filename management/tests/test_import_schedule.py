@@ -0,0 +1,116 @@
+import json
+import tempfile
+from datetime import datetime
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from airport.models import Airport, Route
+from management.models import Flight
+
+
+SCHEDULE = {
+    "airplane_types": [{"name": "Airbus A320"}],
+    "airports": [
+        {"name": "kbp", "closest_big_city": "Kyiv"},
+        {"name": "lwo", "closest_big_city": "Lviv"},
+    ],
+    "airplanes": [
+        {
+            "name": "UR-001",
+            "rows": 30,
+            "seats_in_row": 6,
+            "airplane_type": "Airbus A320",
+        }
+    ],
+    "crews": [{"first_name": "John", "last_name": "Doe"}],
+    "routes": [{"source": "kbp", "destination": "lwo", "distance": 450}],
+    "flights": [
+        {
+            "source": "kbp",
+            "destination": "lwo",
+            "airplane": "UR-001",
+            "departure_time": f"2024-12-{day:02}T16:00:00Z",
+            "arrival_time": f"2024-12-{day:02}T17:30:00Z",
+            "crew": ["John Doe"],
+        }
+        for day in range(1, 11)
+    ],
+}
+
+
+class ImportScheduleCommandTests(TestCase):
+    """
+    Test suite for the `import_schedule` management command.
+    """
+
+    def import_schedule(self, schedule):
+        """
+        Writes the schedule to a JSON file and imports it.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "schedule.json"
+            path.write_text(json.dumps(schedule))
+            call_command(
+                "import_schedule", str(path), "--batch-size", "4", stdout=StringIO()
+            )
+
+    def test_import_json_schedule(self):
+        """
+        Test that all sections are imported with crews assigned.
+        """
+        self.import_schedule(SCHEDULE)
+
+        self.assertEqual(Route.objects.count(), 1)
+        self.assertEqual(Flight.objects.count(), 10)
+        flight = Flight.objects.order_by("departure_time").first()
+        self.assertEqual(flight.departure_time, datetime(2024, 12, 1, 16, 0))
+        self.assertEqual([crew.full_name for crew in flight.crew.all()], ["John Doe"])
+
+    def test_reimport_is_idempotent(self):
+        """
+        Test that importing the same schedule twice creates nothing new.
+        """
+        self.import_schedule(SCHEDULE)
+        self.import_schedule(SCHEDULE)
+
+        self.assertEqual(Airport.objects.count(), 2)
+        self.assertEqual(Flight.objects.count(), 10)
+
+    def test_import_csv_schedule(self):
+        """
+        Test that a directory of CSV files is imported.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            files = {
+                "airplane_types.csv": "name\nBoeing 737\n",
+                "airports.csv": "name,closest_big_city\nkbp,Kyiv\nods,Odesa\n",
+                "airplanes.csv": (
+                    "name,rows,seats_in_row,airplane_type\nUR-002,20,6,Boeing 737\n"
+                ),
+                "routes.csv": "source,destination,distance\nkbp,ods,440\n",
+                "flights.csv": (
+                    "source,destination,airplane,departure_time,arrival_time,crew\n"
+                    "kbp,ods,UR-002,2024-12-01T08:00:00,2024-12-01T09:10:00,\n"
+                ),
+            }
+            for name, content in files.items():
+                (Path(directory) / name).write_text(content)
+            call_command("import_schedule", directory, stdout=StringIO())
+
+        self.assertEqual(Flight.objects.get().route.destination.name, "ods")
+
+    def test_unknown_reference_rolls_back(self):
+        """
+        Test that an unknown airplane aborts the whole import.
+        """
+        schedule = {
+            **SCHEDULE,
+            "flights": [{**SCHEDULE["flights"][0], "airplane": "UR-999"}],
+        }
+        with self.assertRaises(CommandError):
+            self.import_schedule(schedule)
+        self.assertFalse(Airport.objects.exists())
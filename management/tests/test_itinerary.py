@@ -0,0 +1,300 @@
+from datetime import datetime, timedelta
+from unittest import mock
+
+from django.test import SimpleTestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework import status
+
+from airport.tests.base_test_class import BaseApiTest
+from airport.models import (
+    AirplaneType,
+    Airplane,
+    Airport,
+    Route,
+)
+from management import itinerary
+from management.itinerary import (
+    ITINERARY_INDEX_HORIZON,
+    ItineraryIndex,
+    Leg,
+    get_itinerary_index,
+    reset_itinerary_index,
+)
+from management.models import Flight
+
+
+ITINERARY_URL = reverse("management:itineraries")
+DAY = datetime(2024, 12, 24)
+
+
+def leg(flight_id, source, destination, departure_hour, arrival_hour, distance=100):
+    """
+    Returns an index leg departing and arriving at the given hours.
+    """
+    return Leg(
+        flight_id,
+        source,
+        destination,
+        DAY + timedelta(hours=departure_hour),
+        DAY + timedelta(hours=arrival_hour),
+        distance,
+    )
+
+
+class ItineraryIndexTests(SimpleTestCase):
+    """
+    Test suite for the in-memory itinerary index.
+    """
+
+    def setUp(self):
+        """
+        Sets up an index of four airports in four cities.
+        """
+        self.airports = {
+            "kbp": ("kbp", "Kyiv"),
+            "waw": ("waw", "Warsaw"),
+            "muc": ("muc", "Munich"),
+            "lis": ("lis", "Lisbon"),
+        }
+
+    def search(self, legs, **kwargs):
+        """
+        Searches itineraries from Kyiv to Lisbon.
+        """
+        index = ItineraryIndex(legs, self.airports)
+        return index.search("kyiv", "Lisbon", DAY, DAY + timedelta(days=1), **kwargs)
+
+    def test_direct_and_connecting_itineraries_ranked_by_duration(self):
+        """
+        Test that itineraries are ordered by total duration.
+        """
+        itineraries = self.search(
+            [
+                leg("direct", "kbp", "lis", 8, 14),
+                leg("first", "kbp", "waw", 6, 8),
+                leg("second", "waw", "lis", 9, 13),
+            ]
+        )
+        self.assertEqual(
+            [[item.flight_id for item in legs] for legs in itineraries],
+            [["direct"], ["first", "second"]],
+        )
+
+    def test_minimum_connection_time(self):
+        """
+        Test that too short connections are skipped.
+        """
+        legs = [leg("first", "kbp", "waw", 6, 8), leg("second", "waw", "lis", 8.5, 13)]
+        self.assertEqual(self.search(legs), [])
+        self.assertEqual(
+            len(self.search(legs, min_connection=timedelta(minutes=30))), 1
+        )
+
+    def test_max_legs(self):
+        """
+        Test that itineraries longer than max_legs are not returned.
+        """
+        legs = [
+            leg("first", "kbp", "waw", 6, 8),
+            leg("second", "waw", "muc", 9, 10),
+            leg("third", "muc", "lis", 11, 14),
+        ]
+        self.assertEqual(self.search(legs, max_legs=2), [])
+        self.assertEqual(len(self.search(legs, max_legs=3)), 1)
+
+    def test_departure_window(self):
+        """
+        Test that first flights outside the departure window are skipped.
+        """
+        legs = [leg("late", "kbp", "lis", 30, 38)]
+        self.assertEqual(self.search(legs), [])
+
+    def test_limit_keeps_best_itineraries(self):
+        """
+        Test that pruning the search to the best `limit` itineraries
+        returns the head of the complete ranking.
+        """
+        legs = [
+            leg(f"{source}-{destination}-{hour}", source, destination, hour, hour + 2)
+            for source, destination in (
+                ("kbp", "waw"),
+                ("kbp", "muc"),
+                ("waw", "muc"),
+                ("waw", "lis"),
+                ("muc", "lis"),
+            )
+            for hour in range(0, 24, 3)
+        ]
+        everything = self.search(legs, max_legs=3, limit=1000)
+        self.assertGreater(len(everything), 3)
+        self.assertEqual(self.search(legs, max_legs=3, limit=3), everything[:3])
+
+    def test_limit_prunes_slower_connections(self):
+        """
+        Test that connections which cannot beat the itineraries
+        found already are not explored.
+        """
+        legs = [
+            leg("direct", "kbp", "lis", 6, 8),
+            leg("first", "kbp", "waw", 6, 7),
+            leg("second", "waw", "muc", 8, 9),
+            leg("third", "muc", "lis", 10, 12),
+        ]
+        index = ItineraryIndex(legs, self.airports)
+        with mock.patch.object(
+            index, "legs_departing", wraps=index.legs_departing
+        ) as legs_departing:
+            itineraries = index.search(
+                "kyiv", "lisbon", DAY, DAY + timedelta(days=1), max_legs=3, limit=1
+            )
+        self.assertEqual(
+            [[item.flight_id for item in legs] for legs in itineraries], [["direct"]]
+        )
+        self.assertEqual(legs_departing.call_count, 2)
+
+
+class ItinerarySearchApiTests(BaseApiTest):
+    """
+    Test suite for the itinerary search endpoint.
+    """
+
+    def setUp(self):
+        """
+        Sets up an authenticated user and a Kyiv - Warsaw - Lisbon
+        connection departing tomorrow.
+        """
+        reset_itinerary_index()
+        self.addCleanup(reset_itinerary_index)
+        self.day = timezone.now().replace(
+            hour=0, minute=0, second=0, microsecond=0
+        ) + timedelta(days=1)
+        self.user = get_user_model().objects.create_user(
+            email="test@mail.com", password="test1234"
+        )
+        self.client.force_authenticate(self.user)
+        self.airplane = airplane = Airplane.objects.create(
+            name="test_airplane",
+            airplane_type=AirplaneType.objects.create(name="test_air_type"),
+            rows=10,
+            seats_in_row=6,
+        )
+        kyiv = Airport.objects.create(name="kbp", closest_big_city="Kyiv")
+        warsaw = Airport.objects.create(name="waw", closest_big_city="Warsaw")
+        lisbon = Airport.objects.create(name="lis", closest_big_city="Lisbon")
+        for source, destination, distance, departure_hour, arrival_hour in (
+            (kyiv, warsaw, 700, 6, 8),
+            (warsaw, lisbon, 2700, 10, 14),
+        ):
+            Flight.objects.create(
+                route=Route.objects.create(
+                    source=source, destination=destination, distance=distance
+                ),
+                airplane=airplane,
+                departure_time=self.day + timedelta(hours=departure_hour),
+                arrival_time=self.day + timedelta(hours=arrival_hour),
+            )
+        self.route = Route.objects.get(source=kyiv, destination=warsaw)
+
+    def test_search_connecting_itinerary(self):
+        """
+        Test that a one-stop itinerary is found with its totals.
+        """
+        response = self.client.get(
+            ITINERARY_URL,
+            {
+                "city_from": "Kyiv",
+                "city_to": "Lisbon",
+                "departure_after": self.day.isoformat(),
+            },
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 1)
+        itinerary = response.data["results"][0]
+        self.assertEqual(itinerary["connections"], 1)
+        self.assertEqual(itinerary["distance"], 3400)
+        self.assertEqual(itinerary["duration_minutes"], 8 * 60)
+        self.assertEqual(
+            [item["destination_city"] for item in itinerary["legs"]],
+            ["Warsaw", "Lisbon"],
+        )
+
+    def test_invalid_max_legs(self):
+        """
+        Test that more than three legs are rejected.
+        """
+        response = self.client.get(
+            ITINERARY_URL,
+            {
+                "city_from": "Kyiv",
+                "city_to": "Lisbon",
+                "departure_after": self.day.isoformat(),
+                "max_legs": 4,
+            },
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_departure_window_outside_index_horizon(self):
+        """
+        Test that departure windows the index holds no flights
+        for are rejected.
+        """
+        now = timezone.now()
+        for departure_after, departure_before in (
+            (now - timedelta(days=3), now - timedelta(days=2)),
+            (now + ITINERARY_INDEX_HORIZON + timedelta(days=1), None),
+        ):
+            params = {
+                "city_from": "Kyiv",
+                "city_to": "Lisbon",
+                "departure_after": departure_after.isoformat(),
+            }
+            if departure_before is not None:
+                params["departure_before"] = departure_before.isoformat()
+            response = self.client.get(ITINERARY_URL, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_index_holds_upcoming_flights_only(self):
+        """
+        Test that flights departed already or beyond the horizon
+        are not indexed.
+        """
+        now = timezone.now()
+        for departure_time in (
+            now - timedelta(hours=2),
+            now + ITINERARY_INDEX_HORIZON + timedelta(days=1),
+        ):
+            Flight.objects.create(
+                route=self.route,
+                airplane=self.airplane,
+                departure_time=departure_time,
+                arrival_time=departure_time + timedelta(hours=2),
+            )
+
+        index = ItineraryIndex.build()
+        self.assertEqual(
+            [leg.departure_time for legs in index.departures.values() for leg in legs],
+            [self.day + timedelta(hours=6), self.day + timedelta(hours=10)],
+        )
+
+    def test_stale_index_served_while_rebuilding(self):
+        """
+        Test that once an index exists, a rebuild runs in the
+        background and requests keep getting the current index.
+        """
+        index = get_itinerary_index()
+        with mock.patch.object(itinerary, "ITINERARY_INDEX_MAX_AGE", 0), mock.patch(
+            "management.itinerary.threading.Thread"
+        ) as thread:
+            self.assertIs(get_itinerary_index(), index)
+            self.assertIs(get_itinerary_index(), index)
+        thread.assert_called_once()
+        thread.return_value.start.assert_called_once()
+
+        warsaw = self.route.destination
+        Flight.objects.filter(route=self.route).delete()
+        with mock.patch("management.itinerary.connection.close"):
+            thread.call_args.kwargs["target"](*thread.call_args.kwargs["args"])
+        self.assertIsNot(get_itinerary_index(), index)
+        self.assertEqual(list(get_itinerary_index().departures), [warsaw.id])
@@ -1,5 +1,7 @@
 from datetime import datetime
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from rest_framework import status
@@ -187,3 +189,150 @@ class AuthenticatedOrderApiTests(BaseApiTest):
         serializer = OrderListSerializer(self.order)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data, serializer.data)
+
+    def test_create_order_increments_tickets_sold(self):
+        """
+        Test that creating an order updates the flight sold tickets counter.
+        """
+        self.client.post(ORDER_URL, self.update_payload, format="json")
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.tickets_sold, 3)
+
+    def test_update_order_keeps_tickets_sold_in_sync(self):
+        """
+        Test that replacing order tickets keeps the sold tickets counter exact.
+        """
+        url = get_retrieve_order_url(self.order.id)
+        self.client.put(url, self.update_payload, format="json")
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.tickets_sold, self.flight.tickets.count())
+
+    def test_delete_order_decrements_tickets_sold(self):
+        """
+        Test that deleting an order releases its seats in the counter.
+        """
+        self.client.delete(get_retrieve_order_url(self.order.id))
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.tickets_sold, 0)
+
+    def test_saving_stale_flight_keeps_tickets_sold(self):
+        """
+        Test that saving a flight loaded before a booking does not
+        overwrite the sold tickets counter.
+        """
+        stale_flight = Flight.objects.get(pk=self.flight.pk)
+        self.client.post(ORDER_URL, self.update_payload, format="json")
+        stale_flight.departure_time = datetime(2024, 12, 24, 17, 0, 0)
+        stale_flight.save()
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.tickets_sold, self.flight.tickets.count())
+        self.assertEqual(self.flight.departure_time, stale_flight.departure_time)
+
+    def test_create_order_query_count_does_not_grow_with_tickets(self):
+        """
+        Test that tickets of an order are validated and saved in batch.
+        """
+        def count_queries(seats):
+            payload = {
+                "tickets": [
+                    {"row": row, "seat": seat, "flight": self.flight.id}
+                    for row, seat in seats
+                ]
+            }
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(ORDER_URL, payload, format="json")
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            return len(queries)
+
+        self.assertEqual(
+            count_queries([(1, 1)]),
+            count_queries([(2, seat) for seat in range(1, 10)]),
+        )
+
+    def test_update_order_query_count_does_not_grow_with_removed_tickets(self):
+        """
+        Test that the removed tickets of an order are deleted and
+        uncounted in batch.
+        """
+        def count_queries(seats):
+            order = Order.objects.create(user=self.user)
+            for row, seat in seats:
+                Ticket.objects.create(
+                    row=row, seat=seat, flight=self.flight, order=order
+                )
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.put(
+                    get_retrieve_order_url(order.id),
+                    self.payload_with_tickets,
+                    format="json",
+                )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            order.delete()
+            return len(queries)
+
+        self.assertEqual(
+            count_queries([(1, 1)]),
+            count_queries([(2, seat) for seat in range(1, 10)]),
+        )
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.tickets_sold, self.flight.tickets.count())
+
+    def test_delete_order_query_count_does_not_grow_with_tickets(self):
+        """
+        Test that the tickets of a deleted order are uncounted in
+        batch, without looking up their order one by one.
+        """
+        def count_queries(seats):
+            order = Order.objects.create(user=self.user)
+            for row, seat in seats:
+                Ticket.objects.create(
+                    row=row, seat=seat, flight=self.flight, order=order
+                )
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.delete(get_retrieve_order_url(order.id))
+            self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+            return len(queries)
+
+        self.assertEqual(
+            count_queries([(1, 1)]),
+            count_queries([(2, seat) for seat in range(1, 10)]),
+        )
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.tickets_sold, self.flight.tickets.count())
+
+    def test_create_order_with_sold_seat_returns_per_ticket_errors(self):
+        """
+        Test that a sold seat is reported on the ticket that requested it.
+        """
+        response = self.client.post(
+            ORDER_URL,
+            {
+                "tickets": [
+                    {"row": 1, "seat": 1, "flight": self.flight.id},
+                    {"row": 7, "seat": 9, "flight": self.flight.id},
+                ]
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["tickets"][0], {})
+        self.assertIn("non_field_errors", response.data["tickets"][1])
+
+    def test_update_order_keeps_unchanged_tickets(self):
+        """
+        Test that updating an order only replaces the changed seats.
+        """
+        url = get_retrieve_order_url(self.order.id)
+        payload = {
+            "tickets": [
+                {"row": 7, "seat": 9, "flight": self.flight.id},
+                {"row": 3, "seat": 4, "flight": self.flight.id},
+            ]
+        }
+        response = self.client.put(url, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(Ticket.objects.filter(pk=self.ticket.pk).exists())
+        self.assertEqual(self.order.tickets.count(), 2)
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.tickets_sold, 2)
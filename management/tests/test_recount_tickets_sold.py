@@ -0,0 +1,64 @@
+from datetime import datetime
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from airport.models import AirplaneType, Airplane, Airport, Route
+from management.models import Flight, Order, Ticket
+
+
+class RecountTicketsSoldCommandTests(TestCase):
+    """
+    Test suite for the `recount_tickets_sold` management command.
+    """
+
+    def setUp(self):
+        """
+        Set up a flight with two tickets and one without tickets.
+        """
+        airplane = Airplane.objects.create(
+            name="test_airplane",
+            airplane_type=AirplaneType.objects.create(name="test_air_type"),
+            rows=10,
+            seats_in_row=6,
+        )
+        route = Route.objects.create(
+            source=Airport.objects.create(name="kbp", closest_big_city="Kyiv"),
+            destination=Airport.objects.create(name="lwo", closest_big_city="Lviv"),
+            distance=450,
+        )
+        self.flight, self.empty_flight = (
+            Flight.objects.create(
+                route=route,
+                airplane=airplane,
+                departure_time=datetime(2024, 12, day, 16, 0, 0),
+                arrival_time=datetime(2024, 12, day, 18, 0, 0),
+            )
+            for day in (24, 25)
+        )
+        order = Order.objects.create(
+            user=get_user_model().objects.create_user(
+                email="test@test.com", password="test1234"
+            )
+        )
+        for seat in (1, 2):
+            Ticket.objects.create(order=order, flight=self.flight, row=1, seat=seat)
+
+    def test_recount_restores_reset_counters(self):
+        """
+        Test that counters reset by raw saves (as `loaddata` does)
+        are recalculated from the tickets.
+        """
+        Flight.objects.update(tickets_sold=0)
+        Flight.objects.filter(pk=self.empty_flight.pk).update(tickets_sold=5)
+
+        out = StringIO()
+        call_command("recount_tickets_sold", stdout=out)
+
+        self.flight.refresh_from_db()
+        self.empty_flight.refresh_from_db()
+        self.assertEqual(self.flight.tickets_sold, 2)
+        self.assertEqual(self.empty_flight.tickets_sold, 0)
+        self.assertIn("2 flights", out.getvalue())
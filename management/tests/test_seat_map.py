@@ -0,0 +1,192 @@
+import base64
+from datetime import datetime
+from unittest import mock
+
+from django.test import SimpleTestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from django_redis import get_redis_connection
+from rest_framework import status
+
+from airport.tests.base_test_class import BaseApiTest
+from airport.models import (
+    AirplaneType,
+    Airplane,
+    Airport,
+    Route,
+)
+from management.models import Flight, Ticket
+from management import seat_map
+from management.seat_map import SeatMap, get_seat_map, seat_map_key
+
+
+ORDER_URL = reverse("management:orders-list")
+
+
+def seat_map_url(flight_id):
+    """
+    Returns the URL of the seat map of a flight.
+
+    Args:
+        flight_id (UUID): The ID of the flight.
+
+    Returns:
+        str: The URL for the flight seat map view.
+    """
+    return reverse("management:flights-seat-map", args=(flight_id,))
+
+
+class SeatMapTests(SimpleTestCase):
+    """
+    Test suite for the seat map bitmap.
+    """
+
+    def test_mark_and_release_seat(self):
+        """
+        Test marking a seat as sold and releasing it.
+        """
+        seat_map = SeatMap(rows=3, seats_in_row=4)
+        seat_map.mark_sold(2, 3)
+        self.assertTrue(seat_map.is_sold(2, 3))
+        self.assertFalse(seat_map.is_sold(2, 4))
+        seat_map.release(2, 3)
+        self.assertFalse(seat_map.is_sold(2, 3))
+
+    def test_bitset_layout(self):
+        """
+        Test that seats are packed row by row from the most significant bit.
+        """
+        seat_map = SeatMap.from_seats(2, 6, [(1, 1), (2, 6)])
+        self.assertEqual(base64.b64decode(seat_map.to_bitset()), bytes([0x80, 0x10]))
+
+    def test_rle(self):
+        """
+        Test run-length encoding of free and sold seats.
+        """
+        seat_map = SeatMap.from_seats(2, 3, [(1, 2), (1, 3)])
+        self.assertEqual(seat_map.to_rle(), "F1S2F3")
+
+
+class FlightSeatMapApiTests(BaseApiTest):
+    """
+    Test suite for the flight seat map API.
+    """
+
+    def setUp(self):
+        """
+        Set up a flight with a sold ticket and authenticate the user.
+        """
+        self.user = get_user_model().objects.create_user(
+            email="test@test.com", password="test1234"
+        )
+        self.client.force_authenticate(self.user)
+        airplane = Airplane.objects.create(
+            name="test_airplane",
+            airplane_type=AirplaneType.objects.create(name="test_air_type"),
+            rows=3,
+            seats_in_row=4,
+        )
+        route = Route.objects.create(
+            source=Airport.objects.create(name="kbp", closest_big_city="Kyiv"),
+            destination=Airport.objects.create(name="lwo", closest_big_city="Lviv"),
+            distance=450,
+        )
+        self.flight = Flight.objects.create(
+            route=route,
+            airplane=airplane,
+            departure_time=datetime(2024, 12, 24, 16, 0, 0),
+            arrival_time=datetime(2024, 12, 24, 22, 0, 0),
+        )
+        Ticket.objects.create(row=1, seat=2, flight=self.flight)
+
+    def test_seat_map_rle(self):
+        """
+        Test retrieving the seat map as a run-length string.
+        """
+        response = self.client.get(seat_map_url(self.flight.id), {"encoding": "rle"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["seat_map"], "F1S1F10")
+        self.assertEqual(response.data["rows"], 3)
+        self.assertEqual(response.data["seats_in_row"], 4)
+
+    def test_seat_map_updated_on_sale(self):
+        """
+        Test that a cached seat map is updated when tickets are sold.
+        """
+        self.client.get(seat_map_url(self.flight.id))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                ORDER_URL,
+                {"tickets": [{"row": 3, "seat": 4, "flight": self.flight.id}]},
+                format="json",
+            )
+        response = self.client.get(seat_map_url(self.flight.id), {"encoding": "rle"})
+        self.assertEqual(response.data["seat_map"], "F1S1F9S1")
+
+    def test_release_during_rebuild_is_not_merged_back(self):
+        """
+        Test that a seat released while the seat map is rebuilt
+        from the tickets read before the release is not cached
+        as sold.
+        """
+        from_seats = SeatMap.from_seats
+
+        def release_during_build(rows, seats_in_row, seats):
+            built = from_seats(rows, seats_in_row, list(seats))
+            with self.captureOnCommitCallbacks(execute=True):
+                Ticket.objects.filter(flight=self.flight).delete()
+            return built
+
+        with mock.patch.object(
+            seat_map.SeatMap, "from_seats", side_effect=release_during_build
+        ):
+            get_seat_map(self.flight)
+
+        self.assertIsNone(
+            get_redis_connection("default").get(seat_map_key(self.flight.id))
+        )
+        self.assertFalse(get_seat_map(self.flight).is_sold(1, 2))
+
+    def test_seat_map_invalid_encoding(self):
+        """
+        Test that an unknown encoding is rejected.
+        """
+        response = self.client.get(seat_map_url(self.flight.id), {"encoding": "png"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class SeatAllocationTests(SimpleTestCase):
+    """
+    Test suite for finding free seats in the seat map.
+    """
+
+    def test_sections_derived_from_row_width(self):
+        """
+        Test that the cabin layout is derived from seats_in_row.
+        """
+        self.assertEqual(SeatMap(1, 6).sections(), [(1, 3), (4, 6)])
+        self.assertEqual(SeatMap(1, 8).sections(), [(1, 2), (3, 6), (7, 8)])
+        self.assertEqual(SeatMap(1, 6).seat_kinds(3), {"aisle"})
+        self.assertEqual(SeatMap(1, 6).seat_kinds(6), {"window"})
+
+    def test_party_is_not_split_by_aisle(self):
+        """
+        Test that adjacent seats are found within one section.
+        """
+        seat_map = SeatMap.from_seats(2, 6, [(1, 1), (1, 5)])
+        self.assertEqual(seat_map.find_seats(3), [(2, 1), (2, 2), (2, 3)])
+
+    def test_window_preference(self):
+        """
+        Test that a block with a window seat is preferred.
+        """
+        seat_map = SeatMap.from_seats(2, 6, [(1, 1)])
+        self.assertEqual(seat_map.find_seats(2, preference="window"), [(1, 5), (1, 6)])
+
+    def test_no_adjacent_seats(self):
+        """
+        Test that no seats are returned when no block is free.
+        """
+        seat_map = SeatMap.from_seats(1, 4, [(1, 2), (1, 3)])
+        self.assertIsNone(seat_map.find_seats(2))
+        self.assertEqual(seat_map.find_seats(2, together=False), [(1, 1), (1, 4)])
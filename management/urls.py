@@ -1,9 +1,17 @@
+from django.urls import path
 from rest_framework import routers
 
+from management.async_views import AsyncFlightSearchView
 from management.views import (
     OrderViewSet,
     TicketViewSet,
-    FlightViewSet
+    FlightViewSet,
+    FlightSeatMapView,
+    SeatHoldViewSet,
+    BulkBookingView,
+    FlightSeatAllocationView,
+    ExportView,
+    ItinerarySearchView,
 )
 
 
@@ -14,5 +22,34 @@ router = routers.DefaultRouter()
 router.register("orders", OrderViewSet, basename="orders")
 router.register("tickets", TicketViewSet, basename="tickets")
 router.register("flights", FlightViewSet, basename="flights")
+router.register("holds", SeatHoldViewSet, basename="holds")
 
-urlpatterns = router.urls
+urlpatterns = [
+    path("orders/bulk/", BulkBookingView.as_view(), name="orders-bulk"),
+] + router.urls + [
+    path(
+        "flights/<uuid:pk>/seat-map/",
+        FlightSeatMapView.as_view(),
+        name="flights-seat-map",
+    ),
+    path(
+        "flights/<uuid:pk>/allocate/",
+        FlightSeatAllocationView.as_view(),
+        name="flights-allocate",
+    ),
+    path(
+        "exports/<str:name>/",
+        ExportView.as_view(),
+        name="exports",
+    ),
+    path(
+        "itineraries/",
+        ItinerarySearchView.as_view(),
+        name="itineraries",
+    ),
+    path(
+        "async/flights/",
+        AsyncFlightSearchView.as_view(),
+        name="async-flights",
+    ),
+]
@@ -1,8 +1,12 @@
+from datetime import timedelta
+
+from django.http import Http404, StreamingHttpResponse
 from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
-from rest_framework import viewsets
+from rest_framework import mixins, status, viewsets, generics
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
 from django_filters import rest_framework as filters
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 
 from management.serializers import (
     TicketSerializer,
@@ -11,17 +15,29 @@ from management.serializers import (
     FlightSerializer,
     FlightDetailSerializer,
     FlightListSerializer,
+    ItinerarySearchSerializer,
+    SeatHoldSerializer,
+    BulkBookingSerializer,
+    SeatAllocationSerializer,
+    ExportSerializer,
 )
 from management.filters import FlightFilter
+from management.exports import EXPORTS, RENDERERS, stream_export
+from management.itinerary import get_itinerary_index
+from management.seat_map import get_seat_map
 from management.models import (
     Order,
     Flight,
-    Ticket
+    Ticket,
+    SeatHold,
 )
 from airport.permissions import IsAdminOrIfAuthenticatedReadOnly
+from base.cache import UserScopedCacheMixin, versioned_cache_page
+from base.db_routers import ReplicaReadMixin
+from base.pagination import SelectablePagination
 
 
-class OrderViewSet(viewsets.ModelViewSet):
+class OrderViewSet(ReplicaReadMixin, UserScopedCacheMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing `Order` instances.
 
@@ -39,11 +55,32 @@ class OrderViewSet(viewsets.ModelViewSet):
         can access their orders.
 
     Caching:
-        - `cache_page`: Caches the response for 5 minutes
-        to improve performance for orders views.
+        - `UserScopedCacheMixin`: Caches list and retrieve
+        responses for 5 minutes per user; only changes of
+        the user's own orders and tickets invalidate them.
+
+    Pagination:
+        - `SelectablePagination`: Limit/offset by default,
+        keyset pagination on `(created_at, id)` with
+        `?pagination=cursor`.
+
+    Query budgets:
+        - `query_budgets`: Queries allowed per action, including
+        the user lookup of the authentication; the prefetches
+        keep them independent of the page size.
+
+    Replicas:
+        - `ReplicaReadMixin`: Reads come from a replica, except
+        for users who wrote in the last `REPLICA_PIN_SECONDS`,
+        so new orders are always visible to their owner.
     """
 
     permission_classes = (IsAuthenticated,)
+    pagination_class = SelectablePagination
+    keyset_ordering = ("-created_at", "-id")
+    cache_namespace = "order"
+    cache_depends_on = ("ticket",)
+    query_budgets = {"list": 10, "retrieve": 9}
 
     def get_queryset(self):
         """
@@ -82,17 +119,8 @@ class OrderViewSet(viewsets.ModelViewSet):
         """
         serializer.save(user=self.request.user)
 
-    @method_decorator(cache_page(60 * 5, key_prefix="order_view"))
-    def dispatch(self, request, *args, **kwargs):
-        """
-        Applies caching to the viewset actions, caching
-        the response for 5 minutes
-        using a key prefix of `order_view`.
-        """
-        return super().dispatch(request, *args, **kwargs)
-
 
-class TicketViewSet(viewsets.ReadOnlyModelViewSet):
+class TicketViewSet(UserScopedCacheMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for viewing `Ticket` instances.
 
@@ -105,12 +133,25 @@ class TicketViewSet(viewsets.ReadOnlyModelViewSet):
         tickets related to their orders.
 
     Caching:
-        - `cache_page`: Caches the response for 5 minutes
-        to improve performance for ticket views.
+        - `UserScopedCacheMixin`: Caches list and retrieve
+        responses for 5 minutes per user; only changes of
+        the user's own orders and tickets invalidate them.
+
+    Pagination:
+        - `SelectablePagination`: Limit/offset by default,
+        keyset pagination on `id` with `?pagination=cursor`.
+
+    Query budgets:
+        - `query_budgets`: Queries allowed per action, including
+        the user lookup of the authentication.
     """
 
     serializer_class = TicketSerializer
     permission_classes = (IsAuthenticated,)
+    pagination_class = SelectablePagination
+    keyset_ordering = ("id",)
+    cache_namespace = "ticket"
+    query_budgets = {"list": 4, "retrieve": 3}
 
     def get_queryset(self):
         """
@@ -129,17 +170,78 @@ class TicketViewSet(viewsets.ReadOnlyModelViewSet):
         ).prefetch_related("flight__crew")
         return queryset.filter(order__user=self.request.user)
 
-    @method_decorator(cache_page(60 * 5, key_prefix="ticket_view"))
-    def dispatch(self, request, *args, **kwargs):
+
+class BulkBookingView(generics.CreateAPIView):
+    """
+    View booking many seats across one or more flights at once.
+
+    Accepts `{"flights": [{"flight": <id>, "seats": [[row, seat],
+    ...]}, ...]}`, books all seats in one order (all or none)
+    and answers with a summary of the booked seats per flight.
+    Seats sold or held by someone else are answered with
+    `409 Conflict` listing the taken seats.
+
+    Permissions:
+        - `IsAuthenticated`: Only authenticated users can
+        book seats.
+    """
+
+    serializer_class = BulkBookingSerializer
+    permission_classes = (IsAuthenticated,)
+
+    def perform_create(self, serializer):
         """
-        Applies caching to the viewset actions,
-        caching the response for 5 minutes
-        using a key prefix of `ticket_view`.
+        Books the seats for the authenticated user.
         """
-        return super().dispatch(request, *args, **kwargs)
+        serializer.save(user=self.request.user)
+
+
+class SeatHoldViewSet(
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    ViewSet for holding seats before buying them.
+
+    A hold reserves a seat for the user for `SEAT_HOLD_TIMEOUT`
+    seconds; ordering the seat turns the hold into a ticket.
+    Posting a list of seats holds them all together or none.
+    Seats sold or held by another user are answered with
+    `409 Conflict` listing the taken seats.
+
+    Permissions:
+        - `IsAuthenticated`: Only authenticated users can
+        hold seats and see or release their active holds.
+    """
+
+    serializer_class = SeatHoldSerializer
+    permission_classes = (IsAuthenticated,)
+    query_budgets = {"list": 2}
+
+    def get_queryset(self):
+        """
+        Returns the active holds of the authenticated user.
+        """
+        return SeatHold.objects.active().filter(user=self.request.user)
+
+    def get_serializer(self, *args, **kwargs):
+        """
+        Accepts either one seat or a list of seats to hold.
+        """
+        if isinstance(kwargs.get("data"), list):
+            kwargs["many"] = True
+        return super().get_serializer(*args, **kwargs)
 
+    def perform_create(self, serializer):
+        """
+        Holds the seats for the authenticated user.
+        """
+        serializer.save(user=self.request.user)
 
-class FlightViewSet(viewsets.ModelViewSet):
+
+class FlightViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing `Flight` instances.
 
@@ -157,16 +259,33 @@ class FlightViewSet(viewsets.ModelViewSet):
           users have read-only access.
 
     Caching:
-        - `cache_page`: Caches the response for 5 minutes
+        - `versioned_cache_page`: Caches the response for 5 minutes
         to improve performance for flight views.
+
+    Pagination:
+        - `SelectablePagination`: Limit/offset by default,
+        keyset pagination on `(departure_time, id)` with
+        `?pagination=cursor`.
+
+    Query budgets:
+        - `query_budgets`: Queries allowed per action, including
+        the user lookup of the authentication.
+
+    Replicas:
+        - `ReplicaReadMixin`: The flight search (`list`) reads
+        from a replica.
     """
 
     filter_backends = (filters.DjangoFilterBackend,)
     filterset_class = FlightFilter
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    pagination_class = SelectablePagination
+    keyset_ordering = ("-departure_time", "-id")
+    query_budgets = {"list": 4, "retrieve": 4}
+    replica_actions = ("list",)
     queryset = Flight.objects.select_related(
         "route__source", "route__destination", "airplane__airplane_type"
-    ).prefetch_related("crew", "tickets")
+    ).prefetch_related("crew")
 
     def get_serializer_class(self):
         """
@@ -183,11 +302,221 @@ class FlightViewSet(viewsets.ModelViewSet):
             return FlightDetailSerializer
         return FlightSerializer
 
-    @method_decorator(cache_page(60 * 5, key_prefix="flight_view"))
+    @method_decorator(
+        versioned_cache_page(
+            60 * 5,
+            "flight",
+            depends_on=("route", "airport", "airplane", "airplane_type", "crew"),
+        )
+    )
     def dispatch(self, request, *args, **kwargs):
         """
         Applies caching to the viewset actions, caching
         the response for 5 minutes
-        using a key prefix of `flight_view`.
+        using versioned keys of the `flight` namespace.
         """
         return super().dispatch(request, *args, **kwargs)
+
+
+class FlightSeatMapView(generics.RetrieveAPIView):
+    """
+    View returning a compact seat map of a flight.
+
+    Instead of one object per purchased ticket, the sold seats
+    are returned as a bitmap of `rows * seats_in_row` bits
+    (row by row, 1 - sold), encoded either as a base64 packed
+    bitset (`?encoding=bitset`, default) or as a run-length
+    string of free/sold seats (`?encoding=rle`).
+
+    The seat map is cached in Redis and updated incrementally
+    as tickets are sold, so the view is not wrapped in
+    `cache_page`.
+
+    Permissions:
+        - `IsAdminOrIfAuthenticatedReadOnly`: Authenticated
+        users have read-only access.
+    """
+
+    permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+    queryset = Flight.objects.select_related("airplane")
+    encoders = {
+        "bitset": "to_bitset",
+        "rle": "to_rle",
+    }
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Returns the seat map of the flight in the
+        requested encoding.
+        """
+        encoding = request.query_params.get("encoding", "bitset")
+        if encoding not in self.encoders:
+            raise ValidationError(
+                {"encoding": [f"Must be one of: {', '.join(self.encoders)}."]}
+            )
+        flight = self.get_object()
+        seat_map = get_seat_map(flight)
+        return Response(
+            {
+                "id": flight.id,
+                "rows": seat_map.rows,
+                "seats_in_row": seat_map.seats_in_row,
+                "encoding": encoding,
+                "seat_map": getattr(seat_map, self.encoders[encoding])(),
+            }
+        )
+
+
+class FlightSeatAllocationView(generics.GenericAPIView):
+    """
+    View booking the best available seats of a flight.
+
+    Given a party size and optional preferences (adjacent seats,
+    window or aisle), the seats are picked server-side from the
+    cached seat map and booked atomically in a new order, so
+    clients neither download the seat map nor retry on races.
+    When no matching seats are left, `409 Conflict` is returned.
+
+    Permissions:
+        - `IsAuthenticated`: Only authenticated users can
+        book seats.
+    """
+
+    permission_classes = (IsAuthenticated,)
+    serializer_class = SeatAllocationSerializer
+    queryset = Flight.objects.select_related("airplane")
+
+    def post(self, request, *args, **kwargs):
+        """
+        Allocates and books the seats, returning the new order.
+        """
+        flight = self.get_object()
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save(user=request.user, flight=flight)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class ItinerarySearchView(generics.GenericAPIView):
+    """
+    View searching connecting itineraries between two cities.
+
+    Airports are treated as nodes and flights as time-dependent
+    edges. The search runs over the in-memory itinerary index
+    (see `management.itinerary`), so a request does not query
+    the flights at all; the index is rebuilt when flights,
+    routes or airports change.
+
+    Query parameters are validated with
+    `ItinerarySearchSerializer`. Itineraries are ordered by
+    total duration, number of legs and total distance.
+
+    Permissions:
+        - `IsAuthenticated`: Only authenticated users can
+        search itineraries.
+    """
+
+    permission_classes = (IsAuthenticated,)
+    serializer_class = ItinerarySearchSerializer
+
+    def get(self, request, *args, **kwargs):
+        """
+        Returns the best itineraries for the search parameters.
+        """
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+
+        index = get_itinerary_index()
+        itineraries = index.search(
+            params["city_from"],
+            params["city_to"],
+            params["departure_after"],
+            params["departure_before"],
+            max_legs=params["max_legs"],
+            min_connection=timedelta(minutes=params["min_connection"]),
+            max_connection=timedelta(minutes=params["max_connection"]),
+            limit=params["limit"],
+        )
+        results = [self.format_itinerary(index, legs) for legs in itineraries]
+        return Response({"count": len(results), "results": results})
+
+    @staticmethod
+    def format_itinerary(index, legs) -> dict:
+        """
+        Formats an itinerary with its totals and legs.
+
+        Args:
+            index (ItineraryIndex): The index the itinerary
+            was found in.
+            legs (list): The legs of the itinerary.
+
+        Returns:
+            dict: The itinerary representation.
+        """
+        duration = legs[-1].arrival_time - legs[0].departure_time
+        return {
+            "departure_time": legs[0].departure_time,
+            "arrival_time": legs[-1].arrival_time,
+            "duration_minutes": int(duration.total_seconds() // 60),
+            "distance": sum(leg.distance for leg in legs),
+            "connections": len(legs) - 1,
+            "legs": [
+                {
+                    "flight": leg.flight_id,
+                    "source": index.airports[leg.source_id][0],
+                    "source_city": index.airports[leg.source_id][1],
+                    "destination": index.airports[leg.destination_id][0],
+                    "destination_city": index.airports[leg.destination_id][1],
+                    "departure_time": leg.departure_time,
+                    "arrival_time": leg.arrival_time,
+                    "distance": leg.distance,
+                }
+                for leg in legs
+            ],
+        }
+
+
+class ExportView(generics.GenericAPIView):
+    """
+    View streaming an export of flights, orders or tickets.
+
+    Rows are read with a server-side cursor in chunks and
+    written to a `StreamingHttpResponse` as CSV
+    (`?output=csv`, default) or newline-delimited JSON
+    (`?output=ndjson`), so memory use is constant regardless
+    of the size of the export. `since` and `until` limit the
+    rows to a time range (departure time of flights, creation
+    time of orders and of the orders of tickets).
+
+    Permissions:
+        - `IsAdminUser`: Only staff users can export data.
+    """
+
+    permission_classes = (IsAdminUser,)
+    serializer_class = ExportSerializer
+
+    def get(self, request, name, *args, **kwargs):
+        """
+        Streams the export with the given name.
+        """
+        if name not in EXPORTS:
+            raise Http404
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+
+        output = params["output"]
+        response = StreamingHttpResponse(
+            stream_export(
+                name,
+                output,
+                since=params.get("since"),
+                until=params.get("until"),
+            ),
+            content_type=RENDERERS[output][1],
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="{name}.{output}"'
+        )
+        return response